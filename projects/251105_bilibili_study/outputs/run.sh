@@ -19,17 +19,8 @@ pip install -r outputs/scripts/requirements.txt
 # 运行分析流程
 cd outputs/scripts
 
-echo "1️⃣ 收集分区信息..."
-python bilibili_categories.py
-
-echo "2️⃣ 收集创作者数据..."
-python creator_scraper.py
-
-echo "3️⃣ 分析脚本依赖指数..."
-python sdi_analyzer.py
-
-echo "4️⃣ 生成综合报告..."
-python report_generator.py
+echo "▶️ 单进程运行分析流水线（分区 → 创作者 → 热度 → SDI → 汇总 → 报告/挑战分析）..."
+python pipeline.py
 
 cd ../..
 echo "✅ 分析完成! 查看 outputs/ 目录获取结果"
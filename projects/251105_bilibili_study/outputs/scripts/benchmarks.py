@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Analysis Benchmarks
+分析环节性能基准：在大规模合成数据上对比逐分区循环实现与向量化实现，并校验结果一致
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import logging
+
+import numpy as np
+import pandas as pd
+
+from challenge_analyzer import ChallengeAnalyzer
+from creator_scraper import BilibiliCreatorScraper
+from data_validator import DataValidator
+from report_generator import BilibiliReportGenerator
+from report_renderer import table_rows
+from window_index import DateWindowIndex, window_bounds
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s', force=True)
+
+
+def make_videos(n_videos, n_categories, seed=0):
+    """只包含指标计算所需列的大规模视频数据"""
+    rng = np.random.default_rng(seed)
+    tids = rng.integers(0, n_categories, size=n_videos)
+    names = np.array([f"分区{tid}" for tid in range(n_categories)], dtype=object)
+    return pd.DataFrame({
+        'category_tid': tids,
+        'category_name': names[tids],
+        'play_count': rng.integers(10000, 5000000, size=n_videos, endpoint=True),
+        'interaction_rate': rng.uniform(0.03, 0.2, size=n_videos).round(4),
+    })
+
+
+def make_creators(n_creators, n_categories, seed=0):
+    """只包含分区汇总所需列的大规模创作者数据，以及对应的热度排名"""
+    rng = np.random.default_rng(seed)
+    tids = rng.integers(0, n_categories, size=n_creators)
+    names = np.array([f"分区{tid}" for tid in range(n_categories)], dtype=object)
+    creators_df = pd.DataFrame({
+        'category_tid': tids,
+        'category_name': names[tids],
+        'followers_count': np.maximum(1000, rng.lognormal(11.0, 1.2, size=n_creators).astype(np.int64)),
+        'video_count_12m': rng.integers(1, 200, size=n_creators, endpoint=True),
+    })
+    # 约九成分区有热度排名，其余走默认值
+    ranked = rng.permutation(n_categories)[:max(1, n_categories * 9 // 10)]
+    popularity_df = pd.DataFrame({
+        'category_tid': ranked,
+        'rank': np.arange(1, len(ranked) + 1),
+        'popularity_index': rng.uniform(0, 1, size=len(ranked)),
+    })
+    return creators_df, popularity_df
+
+
+def make_weight_scenarios(n_scenarios, seed=0):
+    """随机的爱看程度权重组合（Dirichlet 抽样，权重和为1），第一个为基准权重"""
+    rng = np.random.default_rng(seed)
+    samples = rng.dirichlet([5.0, 3.0, 2.0], size=n_scenarios - 1)
+    scenarios = {'baseline': {'play': 0.5, 'interaction': 0.3, 'ranking': 0.2}}
+    for i, (play, interaction, ranking) in enumerate(samples):
+        scenarios[f'random_{i}'] = {'play': play, 'interaction': interaction, 'ranking': ranking}
+    return scenarios
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def legacy_popularity_metrics(videos_df):
+    """原 calculate_popularity_metrics 的逐分区循环实现（仅用于对照）"""
+    category_metrics = []
+
+    for tid in videos_df['category_tid'].unique():
+        category_videos = videos_df[videos_df['category_tid'] == tid]
+        category_name = category_videos.iloc[0]['category_name']
+
+        avg_play_count = category_videos['play_count'].mean()
+        avg_interaction_rate = category_videos['interaction_rate'].mean()
+        total_videos = len(category_videos)
+
+        play_percentile = videos_df[videos_df['category_tid'] == tid]['play_count'].mean()
+        interaction_percentile = videos_df[videos_df['category_tid'] == tid]['interaction_rate'].mean()
+
+        category_metrics.append({
+            'category_tid': tid,
+            'category_name': category_name,
+            'avg_play_count': int(avg_play_count),
+            'avg_interaction_rate': round(avg_interaction_rate, 4),
+            'total_hot_videos': total_videos,
+            'play_score': play_percentile,
+            'interaction_score': interaction_percentile,
+            'ranking_score': total_videos
+        })
+
+    metrics_df = pd.DataFrame(category_metrics)
+    metrics_df['play_percentile'] = metrics_df['play_score'].rank(pct=True)
+    metrics_df['interaction_percentile'] = metrics_df['interaction_score'].rank(pct=True)
+    metrics_df['ranking_percentile'] = metrics_df['ranking_score'].rank(pct=True)
+    metrics_df['popularity_index'] = (
+        0.5 * metrics_df['play_percentile'] +
+        0.3 * metrics_df['interaction_percentile'] +
+        0.2 * metrics_df['ranking_percentile']
+    )
+    metrics_df = metrics_df.sort_values('popularity_index', ascending=False).reset_index(drop=True)
+    metrics_df['rank'] = range(1, len(metrics_df) + 1)
+    metrics_df['is_top5'] = metrics_df['rank'] <= 5
+    return metrics_df
+
+
+def legacy_category_rollups(creators_df, popularity_df):
+    """原 calculate_category_rollups 的逐分区循环实现（仅用于对照）"""
+    rollups = []
+
+    for tid in creators_df['category_tid'].unique():
+        category_creators = creators_df[creators_df['category_tid'] == tid]
+        category_name = category_creators.iloc[0]['category_name']
+
+        creator_count = len(category_creators)
+        total_followers_a = category_creators['followers_count'].sum()
+        avg_followers = int(category_creators['followers_count'].mean())
+        median_followers = int(category_creators['followers_count'].median())
+
+        top10_followers = category_creators.nlargest(10, 'followers_count')['followers_count'].sum()
+        top10_ratio = top10_followers / total_followers_a if total_followers_a > 0 else 0
+
+        p80_threshold = category_creators['followers_count'].quantile(0.8)
+        p90_threshold = category_creators['followers_count'].quantile(0.9)
+        p80_creators = len(category_creators[category_creators['followers_count'] >= p80_threshold])
+        p90_creators = len(category_creators[category_creators['followers_count'] >= p90_threshold])
+
+        avg_videos_12m = category_creators['video_count_12m'].mean()
+
+        popularity_info = popularity_df[popularity_df['category_tid'] == tid]
+        popularity_rank = popularity_info.iloc[0]['rank'] if len(popularity_info) > 0 else 999
+        popularity_index = popularity_info.iloc[0]['popularity_index'] if len(popularity_info) > 0 else 0
+
+        rollups.append({
+            'category_tid': tid,
+            'category_name': category_name,
+            'creator_count': creator_count,
+            'total_followers_a': total_followers_a,
+            'total_followers_b_conservative': int(total_followers_a * 0.7),
+            'total_followers_b_aggressive': int(total_followers_a * 0.85),
+            'avg_followers': avg_followers,
+            'median_followers': median_followers,
+            'top10_ratio': round(top10_ratio, 3),
+            'p80_creators': p80_creators,
+            'p90_creators': p90_creators,
+            'avg_videos_12m': round(avg_videos_12m, 1),
+            'popularity_rank': popularity_rank,
+            'popularity_index': round(popularity_index, 3)
+        })
+
+    rollups_df = pd.DataFrame(rollups)
+    rollups_df['creator_count_pct'] = rollups_df['creator_count'] / rollups_df['creator_count'].sum()
+    rollups_df['followers_a_pct'] = rollups_df['total_followers_a'] / rollups_df['total_followers_a'].sum()
+    return rollups_df.sort_values('creator_count', ascending=False).reset_index(drop=True)
+
+
+def legacy_weight_sensitivity(popularity_df, weight_scenarios):
+    """原逐场景实现：每个场景复制DataFrame、重算指数并排序"""
+    weight_rankings = {}
+    for scenario_name, weights in weight_scenarios.items():
+        recalc_popularity = popularity_df.copy()
+        recalc_popularity['new_popularity_index'] = (
+            weights['play'] * recalc_popularity['play_percentile'] +
+            weights['interaction'] * recalc_popularity['interaction_percentile'] +
+            weights['ranking'] * recalc_popularity['ranking_percentile']
+        )
+        recalc_popularity = recalc_popularity.sort_values('new_popularity_index', ascending=False, kind='stable')
+        recalc_popularity['new_rank'] = range(1, len(recalc_popularity) + 1)
+        weight_rankings[scenario_name] = recalc_popularity.set_index('category_name')['new_rank'].to_dict()
+
+    base_top5 = set(cat for cat, rank in weight_rankings['baseline'].items() if rank <= 5)
+    weight_stability = {}
+    for scenario, ranking in weight_rankings.items():
+        if scenario != 'baseline':
+            scenario_top5 = set(cat for cat, rank in ranking.items() if rank <= 5)
+            weight_stability[scenario] = len(base_top5 & scenario_top5) / 5
+    return weight_stability
+
+
+def bench_popularity(args):
+    """爱看程度指标：groupby 实现 vs 逐分区循环"""
+    videos_df, build_time = timed(make_videos, args.videos, args.categories, args.seed)
+    print(f"📦 合成数据: {len(videos_df):,} 个视频 / {args.categories} 个分区 ({build_time:.2f}s)")
+
+    scraper = BilibiliCreatorScraper(simulate=True)
+    metrics_df, new_time = timed(scraper.calculate_popularity_metrics, videos_df, None)
+    print(f"⚡ groupby 实现: {new_time:.3f}s")
+
+    if args.skip_legacy:
+        return
+
+    legacy_df, legacy_time = timed(legacy_popularity_metrics, videos_df)
+    print(f"🐢 循环实现: {legacy_time:.3f}s (加速 {legacy_time / new_time:.1f}x)")
+
+    pd.testing.assert_frame_equal(metrics_df, legacy_df, check_dtype=False)
+    print("✅ 两种实现输出一致 (popularity_index / rank / is_top5)")
+
+
+def bench_rollups(args):
+    """分区汇总指标：单次分组聚合 vs 逐分区循环"""
+    (creators_df, popularity_df), build_time = timed(make_creators, args.creators, args.categories, args.seed)
+    print(f"📦 合成数据: {len(creators_df):,} 个创作者 / {args.categories} 个分区 ({build_time:.2f}s)")
+
+    generator = BilibiliReportGenerator("../")
+    rollups_df, new_time = timed(generator.calculate_category_rollups, creators_df, popularity_df)
+    print(f"⚡ groupby 实现: {new_time:.3f}s")
+
+    if args.skip_legacy:
+        return
+
+    legacy_df, legacy_time = timed(legacy_category_rollups, creators_df, popularity_df)
+    print(f"🐢 循环实现: {legacy_time:.3f}s (加速 {legacy_time / new_time:.1f}x)")
+
+    # 创作者数相同的分区在不稳定排序下先后不定，按分区号对齐后再比较
+    key = ['creator_count', 'category_tid']
+    pd.testing.assert_frame_equal(
+        rollups_df.sort_values(key, ascending=[False, True]).reset_index(drop=True),
+        legacy_df.sort_values(key, ascending=[False, True]).reset_index(drop=True),
+        check_dtype=False,
+    )
+    print("✅ 两种实现输出一致 (Top10占比 / P80 / P90 / 热度排名)")
+
+
+def bench_scenarios(args):
+    """权重敏感性：分区 × 场景 矩阵 vs 逐场景循环"""
+    rng = np.random.default_rng(args.seed)
+    popularity_df = pd.DataFrame({
+        'category_name': [f"分区{tid}" for tid in range(args.categories)],
+        'play_percentile': rng.uniform(0, 1, size=args.categories),
+        'interaction_percentile': rng.uniform(0, 1, size=args.categories),
+        'ranking_percentile': rng.uniform(0, 1, size=args.categories),
+    })
+    weight_scenarios = make_weight_scenarios(args.scenarios, args.seed)
+    print(f"📦 合成数据: {args.categories} 个分区 / {len(weight_scenarios):,} 个权重场景")
+
+    analyzer = ChallengeAnalyzer(tempfile.mkdtemp(), monte_carlo_samples=0)
+    results, new_time = timed(analyzer.challenge_4_weight_sensitivity, popularity_df, weight_scenarios)
+    print(f"⚡ 矩阵实现: {new_time:.3f}s")
+
+    if args.skip_legacy:
+        return
+
+    legacy_stability, legacy_time = timed(legacy_weight_sensitivity, popularity_df, weight_scenarios)
+    print(f"🐢 循环实现: {legacy_time:.3f}s (加速 {legacy_time / new_time:.1f}x)")
+
+    assert results['weight_stability'] == legacy_stability
+    print("✅ 两种实现输出一致 (各场景Top5重叠度)")
+
+
+def legacy_window_activity(creators_df, reference_date, windows):
+    """逐窗口过滤DataFrame再分组求和（对照实现）"""
+    reference = pd.Timestamp(reference_date)
+    activity = {}
+    for window in windows:
+        start = reference - pd.Timedelta(days=round(window * 365.25 / 12))
+        active = creators_df[(creators_df['last_video_date'] >= start) & (creators_df['last_video_date'] <= reference)]
+        activity[window] = active.groupby('category_tid', sort=False)['video_count_12m'].sum()
+    return pd.DataFrame(activity).reindex(creators_df['category_tid'].unique()).fillna(0).astype('int64')
+
+
+def bench_windows(args):
+    """时间窗口扫描：排序日期索引 + 二分查找 vs 逐窗口过滤"""
+    creators_df, _ = make_creators(args.creators, args.categories, args.seed)
+    rng = np.random.default_rng(args.seed)
+    reference_date = '2025-11-05'
+    creators_df['last_video_date'] = pd.Timestamp(reference_date) - pd.to_timedelta(
+        rng.integers(0, 730, size=len(creators_df)), unit='D')
+    windows = list(np.linspace(1, 24, args.windows).round(2))
+    print(f"📦 合成数据: {len(creators_df):,} 个创作者 / {args.categories} 个分区 / {len(windows)} 个时间窗口")
+
+    def indexed():
+        index = DateWindowIndex(creators_df['category_tid'], creators_df['last_video_date'],
+                                weights={'videos': creators_df['video_count_12m'].to_numpy(dtype=np.int64)})
+        return index.frame(index.sums('videos', *window_bounds(reference_date, windows)), windows)
+
+    activity, new_time = timed(indexed)
+    print(f"⚡ 日期索引实现: {new_time:.3f}s")
+
+    if args.skip_legacy:
+        return
+
+    legacy, legacy_time = timed(legacy_window_activity, creators_df, reference_date, windows)
+    print(f"🐢 循环实现: {legacy_time:.3f}s (加速 {legacy_time / new_time:.1f}x)")
+
+    pd.testing.assert_frame_equal(activity, legacy, check_names=False, check_column_type=False)
+    print("✅ 两种实现输出一致 (各分区各窗口的活跃创作者投稿量)")
+
+
+def legacy_rollup_table(rollups_df):
+    """逐行 iterrows + f-string 写表A（对照实现）"""
+    lines = []
+    for _, row in rollups_df.iterrows():
+        lines.append(f"| {row['category_name']} | {row['creator_count']:,} | {row['creator_count_pct']:.1%} | "
+                     f"{row['total_followers_a']:,} | {row['followers_a_pct']:.1%} | "
+                     f"{row['total_followers_b_conservative']:,} | {row['total_followers_b_aggressive']:,} | "
+                     f"{row['avg_followers']:,} | {row['top10_ratio']:.1%} |\n")
+    return ''.join(lines)
+
+
+def make_report_data(creators_df, popularity_df, rollups_df, seed=0):
+    """综合报告所需的 data_dict：热度与SDI表按合成分区生成"""
+    rng = np.random.default_rng(seed)
+    names = rollups_df.set_index('category_tid')['category_name']
+    popularity = popularity_df.assign(
+        category_name=popularity_df['category_tid'].map(names),
+        avg_play_count=rng.integers(10000, 5000000, size=len(popularity_df)),
+        avg_interaction_rate=rng.uniform(0.03, 0.2, size=len(popularity_df)),
+        total_hot_videos=rng.integers(10, 500, size=len(popularity_df)),
+    )
+    sdi = pd.DataFrame({'category_tid': names.index, 'category_name': names.to_numpy(),
+                        'sdi_score': rng.uniform(1, 5, size=len(names)).round(2)})
+    top5_sdi = popularity.head(5).merge(sdi[['category_tid', 'sdi_score']], on='category_tid')
+    levels = np.digitize(top5_sdi['sdi_score'], [2.5, 4.0])
+    top5_sdi['dependency_level'] = np.array(["低依赖", "中等依赖", "高依赖"])[levels]
+    top5_sdi['improvement_priority'] = np.array(["低优先级", "中优先级", "高优先级"])[levels]
+    top5_sdi['script_growth_potential'] = np.array(["低", "中等", "高"])[levels]
+    top5_sdi['growth_mechanism'] = "合成数据"
+    top5_sdi['improvement_advice'] = "合成数据"
+    return {
+        'categories': pd.DataFrame({'tid': names.index}),
+        'creators': creators_df.assign(uid=np.arange(len(creators_df))),
+        'popularity': popularity,
+        'sdi': sdi,
+        'top5_sdi': top5_sdi,
+    }
+
+
+def bench_report(args):
+    """报告渲染：模板 + 按列格式化 vs 逐行 iterrows"""
+    creators_df, popularity_df = make_creators(args.creators, args.categories, args.seed)
+    generator = BilibiliReportGenerator(tempfile.mkdtemp())
+    rollups_df = generator.calculate_category_rollups(creators_df, popularity_df)
+    data_dict = make_report_data(creators_df, popularity_df, rollups_df, args.seed)
+    print(f"📦 合成数据: {len(creators_df):,} 个创作者 / {args.categories} 个分区")
+
+    report_file, report_time = timed(generator.create_comprehensive_report, data_dict, rollups_df)
+    print(f"⚡ 综合报告: {report_time:.3f}s ({os.path.getsize(report_file):,} 字节)")
+
+    videos_df = make_videos(args.videos, args.categories, args.seed)
+    data_dict['videos'] = videos_df.assign(bv_id=[f"BV{i}" for i in range(len(videos_df))])
+    generator.workers = args.workers
+    report_files, category_time = timed(generator.create_category_reports, data_dict, rollups_df)
+    print(f"⚡ 分区明细报告: {len(report_files)} 份 {category_time:.3f}s ({args.workers} 个进程)")
+
+    table, new_time = timed(lambda: ''.join(table_rows(rollups_df, generator.ROLLUP_TABLE_COLUMNS)))
+    print(f"⚡ 按列格式化 ({len(rollups_df)} 行全表): {new_time:.4f}s")
+
+    if args.skip_legacy:
+        return
+
+    legacy, legacy_time = timed(legacy_rollup_table, rollups_df)
+    print(f"🐢 iterrows 实现: {legacy_time:.4f}s (加速 {legacy_time / new_time:.1f}x)")
+
+    assert table == legacy
+    print("✅ 两种实现输出一致 (表A全部分区)")
+
+
+def make_validation_data(n_creators, n_videos, n_categories, n_anomalies, seed=0):
+    """完整列结构的创作者/视频数据，并在各检查上注入 n_anomalies 行已知异常"""
+    rng = np.random.default_rng(seed)
+    collected_at = pd.Timestamp('2025-11-05 15:19:23')
+    names = np.array([f"分区{tid}" for tid in range(n_categories)], dtype=object)
+
+    creator_tids = rng.integers(0, n_categories, size=n_creators)
+    creators_df = pd.DataFrame({
+        'uid': np.arange(100001, 100001 + n_creators),
+        'username': 'UP',
+        'followers_count': np.maximum(1000, rng.lognormal(11.0, 1.2, size=n_creators).astype(np.int64)),
+        'category_tid': creator_tids,
+        'category_name': names[creator_tids],
+        'last_video_date': collected_at.normalize() - pd.to_timedelta(rng.integers(1, 365, size=n_creators), unit='D'),
+        'video_count_12m': rng.integers(1, 200, size=n_creators, endpoint=True),
+        'content_type': '模拟',
+        'collected_at': collected_at,
+        'source': '模拟数据',
+        'data_quality': 'simulated',
+    })
+
+    video_tids = rng.integers(0, n_categories, size=n_videos)
+    play_count = rng.integers(10000, 5000000, size=n_videos, endpoint=True)
+    interactions = {column: (play_count * rng.uniform(low, high, n_videos)).astype(np.int64)
+                    for column, low, high in [('like_count', 0.02, 0.15), ('coin_count', 0.005, 0.03),
+                                              ('favorite_count', 0.008, 0.025), ('share_count', 0.001, 0.008)]}
+    videos_df = pd.DataFrame({
+        'bv_id': 'BV' + pd.Series(np.arange(1000001, 1000001 + n_videos)).astype(str),
+        'title': '热门视频',
+        'creator_uid': creators_df['uid'].to_numpy()[rng.integers(0, n_creators, size=n_videos)],
+        'creator_name': 'UP',
+        'category_tid': video_tids,
+        'category_name': names[video_tids],
+        'play_count': play_count.astype(float),
+        **interactions,
+        'interaction_rate': np.round(sum(interactions.values()) / play_count, 4),
+        'publish_date': collected_at.normalize() - pd.to_timedelta(rng.integers(1, 365, size=n_videos), unit='D'),
+        'collected_at': collected_at,
+        'source': '模拟数据',
+        'ranking_position': 1,
+    })
+
+    # 注入异常：重复uid、负粉丝数、点赞超过播放、播放量缺失、发布日期晚于采集
+    rows = rng.choice(n_creators // 2, size=n_anomalies, replace=False)
+    creators_df.loc[creators_df.index[rows + n_creators // 2], 'uid'] = creators_df['uid'].to_numpy()[rows]
+    creators_df.loc[creators_df.index[rows], 'followers_count'] = -1
+    rows = rng.choice(n_videos, size=3 * n_anomalies, replace=False).reshape(3, -1)
+    videos_df.loc[rows[0], 'like_count'] = videos_df.loc[rows[0], 'play_count'].astype(np.int64) + 1
+    videos_df.loc[rows[1], 'play_count'] = np.nan
+    videos_df.loc[rows[2], 'publish_date'] = collected_at + pd.Timedelta(days=30)
+    return creators_df, videos_df
+
+
+def bench_validation(args):
+    """数据校验：全部检查在整列上向量化执行，并确认注入的异常全部检出"""
+    n_anomalies = 100
+    creators_df, videos_df = make_validation_data(args.creators, args.videos, args.categories, n_anomalies, args.seed)
+    print(f"📦 合成数据: {len(creators_df):,} 个创作者 / {len(videos_df):,} 个视频 / {args.categories} 个分区")
+
+    (checks_df, flags_df), new_time = timed(DataValidator().validate, creators_df, videos_df)
+    print(f"⚡ 向量化校验: {new_time:.3f}s ({len(checks_df)} 项检查，标记 {len(flags_df):,} 行)")
+
+    failed = checks_df.set_index(['dataset', 'check', 'column'])['failed']
+    expected = {
+        ('creators_by_category', 'unique_key', 'uid'): n_anomalies,
+        ('creators_by_category', 'non_negative', 'followers_count'): n_anomalies,
+        ('videos_by_category', 'play_bound', 'like_count'): n_anomalies,
+        ('videos_by_category', 'not_null', 'play_count'): n_anomalies,
+        ('videos_by_category', 'date_range', 'publish_date'): n_anomalies,
+    }
+    for check, count in expected.items():
+        assert failed[check] == count, (check, failed[check])
+    print(f"✅ 注入的 {len(expected)} 类异常全部检出，各 {n_anomalies} 行")
+
+
+BENCHMARKS = {
+    'popularity': bench_popularity,
+    'rollups': bench_rollups,
+    'scenarios': bench_scenarios,
+    'windows': bench_windows,
+    'report': bench_report,
+    'validation': bench_validation,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="分析环节性能基准")
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument("--videos", type=int, default=10_000_000, help="合成视频数量")
+    parser.add_argument("--creators", type=int, default=5_000_000, help="合成创作者数量")
+    parser.add_argument("--categories", type=int, default=100, help="合成分区数量")
+    parser.add_argument("--scenarios", type=int, default=2000, help="合成权重场景数量")
+    parser.add_argument("--windows", type=int, default=200, help="扫描的时间窗口数量")
+    parser.add_argument("--workers", type=int, default=1, help="分区明细报告渲染的进程数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-legacy", action="store_true", help="不运行循环实现的对照")
+    args = parser.parse_args()
+
+    BENCHMARKS[args.benchmark](args)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Async HTTP Client for Bilibili APIs
+B站接口异步HTTP客户端：连接池、并发上限、指数退避重试、响应缓存与条件请求(ETag/If-Modified-Since)
+"""
+
+import asyncio
+import random
+import time
+import logging
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://api.bilibili.com"
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept': 'application/json',
+}
+
+# 需要重试的HTTP状态码（限流与服务端错误）
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class BilibiliAPIError(Exception):
+    """接口返回了非0业务码或无法重试的错误"""
+
+
+class TokenBucket:
+    """令牌桶限流：平均每秒 rate 个请求，允许 capacity 个突发"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = None
+
+    async def acquire(self):
+        """取走一个令牌，不足时按缺口等待；加锁保证等待者按先后顺序获得令牌"""
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncBilibiliClient:
+    def __init__(self, base_url=DEFAULT_API_BASE, max_connections=10, max_concurrency=5,
+                 max_retries=3, backoff_base=0.5, timeout=10, headers=None, cache=None,
+                 rate_limits=None):
+        self.base_url = base_url.rstrip('/')
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS, **(headers or {}))
+
+        # 响应缓存(ResponseCache)：TTL内直接复用，过期后带ETag/Last-Modified发起条件请求
+        self.cache = cache
+
+        # 按接口路径独立限流: path -> (每秒请求数, 突发容量)
+        self.buckets = {
+            path: TokenBucket(rate, capacity)
+            for path, (rate, capacity) in (rate_limits or {}).items()
+        }
+
+        self.session = None
+        self.semaphore = None
+        self.stats = {'requests': 0, 'not_modified': 0, 'retries': 0}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+
+    @staticmethod
+    def request_key(url, params=None):
+        """按URL+参数生成稳定的请求键"""
+        if not params:
+            return url
+        query = '&'.join(f"{k}={params[k]}" for k in sorted(params))
+        return f"{url}?{query}"
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        """指数退避 + 抖动，优先遵循服务端的Retry-After"""
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.backoff_base * (2 ** attempt) * (1 + random.random())
+
+    @staticmethod
+    async def _read_payload(resp, path):
+        """解析响应体：非JSON或不是JSON对象（B站标准响应为 {code, message, data}）时按接口错误处理"""
+        try:
+            payload = await resp.json(content_type=None)
+        except ValueError as e:
+            raise BilibiliAPIError(f"{path} 返回了非JSON响应: {e}") from e
+        if not isinstance(payload, dict):
+            raise BilibiliAPIError(f"{path} 返回的JSON不是对象: {type(payload).__name__}")
+        return payload
+
+    async def get_json(self, path, params=None):
+        """GET请求并解析JSON，带缓存、重试与条件请求"""
+        url = path if path.startswith('http') else f"{self.base_url}{path}"
+        key = self.request_key(url, params)
+        bucket = self.buckets.get(path)
+
+        cached = self.cache.lookup(key) if self.cache else None
+        headers = {}
+        if cached:
+            payload, etag, last_modified, fresh = cached
+            if fresh:
+                self.cache.stats['hits'] += 1
+                self.cache.touch(key)
+                return payload
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            # 先过限流再占并发槽位，避免被限流的接口占满连接
+            if bucket is not None:
+                await bucket.acquire()
+            try:
+                async with self.semaphore:
+                    self.stats['requests'] += 1
+                    async with self.session.get(url, params=params, headers=headers) as resp:
+                        if resp.status == 304 and cached:
+                            self.stats['not_modified'] += 1
+                            self.cache.stats['revalidated'] += 1
+                            self.cache.touch(key, refreshed=True)
+                            return cached[0]
+
+                        if resp.status in RETRY_STATUSES:
+                            retry_after = resp.headers.get('Retry-After')
+                            raise aiohttp.ClientResponseError(
+                                resp.request_info, resp.history, status=resp.status, message=resp.reason
+                            )
+
+                        resp.raise_for_status()
+                        payload = await self._read_payload(resp, path)
+
+                        if self.cache:
+                            self.cache.stats['misses'] += 1
+                            # 只缓存业务成功的响应，错误码不应在TTL内被复用
+                            if payload.get('code', 0) == 0:
+                                self.cache.store(key, payload, resp.headers.get('ETag'),
+                                                 resp.headers.get('Last-Modified'))
+                        return payload
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+
+            self.stats['retries'] += 1
+            delay = self._backoff_delay(attempt, retry_after)
+            logger.debug(f"重试 {key} (第{attempt + 1}次)，等待 {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    async def get_data(self, path, params=None):
+        """请求B站标准响应 {code, message, data} 并返回data字段"""
+        payload = await self.get_json(path, params=params)
+        if payload.get('code', 0) != 0:
+            raise BilibiliAPIError(f"{path} 返回错误码 {payload.get('code')}: {payload.get('message')}")
+        return payload.get('data')
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Stratified Bootstrap Confidence Intervals
+分区汇总指标与爱看程度排名的自助法置信区间：在每个 category_tid 内有放回重抽创作者/视频，
+一批重抽样本用一个 (重抽次数 × 样本数) 的下标矩阵一次算完，批次可分发到进程池
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+from grouped_stats import group_quantile, group_values, sort_within_groups
+from scenario_engine import percentile_ranks, rank_matrix
+
+logger = logging.getLogger(__name__)
+
+# 单个批次下标矩阵的元素上限（int64，约 40 MB）
+MAX_BATCH_CELLS = 5_000_000
+
+# 爱看程度指数权重：播放 / 互动 / 上榜
+POPULARITY_WEIGHTS = (0.5, 0.3, 0.2)
+
+
+def _strata(category_tid):
+    """按分区排列样本：返回 (排列下标, 分区号, 各分区起点, 各分区样本数)，分区按首次出现的顺序"""
+    codes, tids = pd.factorize(category_tid)
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes, minlength=len(tids))
+    starts = np.cumsum(counts) - counts
+    return order, np.asarray(tids), starts, counts
+
+
+def _resample(rng, starts, counts, n_replicates):
+    """分层重抽的下标矩阵：每行是一次重抽，每个位置只在自己分区的范围内取样"""
+    position_starts = np.repeat(starts, counts)
+    position_counts = np.repeat(counts, counts)
+    offsets = rng.integers(0, np.broadcast_to(position_counts, (n_replicates, len(position_counts))))
+    return position_starts + offsets
+
+
+def _creator_batch(followers, starts, counts, n_replicates, seed_sequence):
+    """一批重抽样本的 粉丝总数 / 粉丝中位数 / Top10占比，各为 (重抽次数 × 分区数)"""
+    rng = np.random.default_rng(seed_sequence)
+    values = followers[_resample(rng, starts, counts, n_replicates)]
+
+    # 逐行组内升序（重抽只在各自分区的位置范围内取值，排序后分区边界不变）
+    codes = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+    _, sorted_values = sort_within_groups(codes, values)
+
+    ends = starts + counts
+    cumulative = np.concatenate([np.zeros((n_replicates, 1), dtype=np.int64), sorted_values.cumsum(axis=1)], axis=1)
+    totals = cumulative[:, ends] - cumulative[:, starts]
+    top10 = cumulative[:, ends] - cumulative[:, ends - np.minimum(counts, 10)]
+
+    return {
+        'total_followers_a': totals,
+        'median_followers': group_quantile(sorted_values, starts, counts, 0.5),
+        'top10_ratio': np.divide(top10, totals, out=np.zeros(totals.shape), where=totals > 0),
+    }
+
+
+def _video_batch(play_count, interaction_rate, starts, counts, n_replicates, seed_sequence):
+    """一批重抽样本的爱看程度指数与排名，各为 (重抽次数 × 分区数)"""
+    rng = np.random.default_rng(seed_sequence)
+    indices = _resample(rng, starts, counts, n_replicates)
+
+    play_score = np.add.reduceat(play_count[indices], starts, axis=1) / counts
+    interaction_score = np.add.reduceat(interaction_rate[indices], starts, axis=1) / counts
+    # 上榜频次为分区视频数，分层重抽下不变
+    ranking_percentile = pd.Series(counts).rank(pct=True).to_numpy()
+
+    popularity_index = (
+        POPULARITY_WEIGHTS[0] * percentile_ranks(play_score.T).T +
+        POPULARITY_WEIGHTS[1] * percentile_ranks(interaction_score.T).T +
+        POPULARITY_WEIGHTS[2] * ranking_percentile
+    )
+    return {
+        'popularity_index': popularity_index,
+        'rank': rank_matrix(popularity_index.T).T,
+    }
+
+
+def _run_batches(batch_func, arrays, starts, counts, n_replicates, seed, workers):
+    """按批次执行重抽（每批独立子种子，结果与 workers 数无关），沿重抽维度拼接各指标"""
+    batch_size = max(1, MAX_BATCH_CELLS // max(int(counts.sum()), 1))
+    sizes = [batch_size] * (n_replicates // batch_size) + ([n_replicates % batch_size] if n_replicates % batch_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = (*(repeat(array) for array in arrays), repeat(starts), repeat(counts), sizes, seeds)
+
+    if workers > 1 and len(sizes) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batches = list(executor.map(batch_func, *args))
+    else:
+        batches = list(map(batch_func, *args))
+
+    return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+
+
+def _intervals(replicates, tids, confidence):
+    """百分位法置信区间：每个指标生成 <指标>_ci_low / <指标>_ci_high 两列"""
+    alpha = (1 - confidence) / 2
+    intervals = pd.DataFrame(index=pd.Index(tids, name='category_tid'))
+    for name, values in replicates.items():
+        low, high = np.quantile(values, [alpha, 1 - alpha], axis=0)
+        intervals[f'{name}_ci_low'] = low
+        intervals[f'{name}_ci_high'] = high
+    return intervals
+
+
+def bootstrap_rollups(creators_df, n_replicates=1000, confidence=0.95, seed=None, workers=1):
+    """分区内重抽创作者，返回 粉丝总数A / 粉丝中位数 / Top10占比 的置信区间（按 category_tid 索引）"""
+    order, tids, starts, counts = _strata(creators_df['category_tid'])
+    followers = group_values(creators_df['followers_count'])[order]
+
+    logger.info(f"🎲 创作者分层自助抽样: {n_replicates:,} 次 × {len(followers):,} 个创作者")
+    replicates = _run_batches(_creator_batch, (followers,), starts, counts, n_replicates, seed, workers)
+
+    intervals = _intervals(replicates, tids, confidence)
+    for column in ('total_followers_a', 'median_followers'):
+        for bound in ('low', 'high'):
+            intervals[f'{column}_ci_{bound}'] = intervals[f'{column}_ci_{bound}'].round().astype('int64')
+    for bound in ('low', 'high'):
+        intervals[f'top10_ratio_ci_{bound}'] = intervals[f'top10_ratio_ci_{bound}'].round(3)
+    return intervals
+
+
+def bootstrap_popularity(videos_df, n_replicates=1000, confidence=0.95, seed=None, workers=1):
+    """分区内重抽热门视频，返回爱看程度指数与排名的置信区间（按 category_tid 索引）"""
+    order, tids, starts, counts = _strata(videos_df['category_tid'])
+    play_count = videos_df['play_count'].to_numpy(dtype=float)[order]
+    interaction_rate = videos_df['interaction_rate'].to_numpy(dtype=float)[order]
+
+    logger.info(f"🎲 视频分层自助抽样: {n_replicates:,} 次 × {len(play_count):,} 个视频")
+    replicates = _run_batches(_video_batch, (play_count, interaction_rate), starts, counts, n_replicates, seed, workers)
+
+    intervals = _intervals(replicates, tids, confidence)
+    for bound in ('low', 'high'):
+        intervals[f'popularity_index_ci_{bound}'] = intervals[f'popularity_index_ci_{bound}'].round(3)
+        intervals[f'rank_ci_{bound}'] = intervals[f'rank_ci_{bound}'].round().astype('int64')
+    return intervals.rename(columns={'rank_ci_low': 'popularity_rank_ci_low', 'rank_ci_high': 'popularity_rank_ci_high'})
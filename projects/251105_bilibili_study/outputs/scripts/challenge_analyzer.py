@@ -8,155 +8,179 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
+import argparse
 import logging
 
+from audience_sketch import DEFAULT_AUDIENCE_DB, load_dedup_factors
+from data_loader import default_loader, enable_disk_cache
+from scenario_engine import (dirichlet_rank_counts, percentile_ranks, rank_distribution, scenario_matrix,
+                             scenario_ranks, top_k_jaccard, top_k_stability, weighted_scores)
+from report_renderer import format_column, range_column, render_file, render_section, table_rows
+from sdi_analyzer import SDIAnalyzer
+from snapshot_catalog import SnapshotCatalog, snapshot_date, today
+from window_index import DateWindowIndex, window_bounds
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class ChallengeAnalyzer:
-    def __init__(self, data_dir):
+    # 各项挑战实际用到的列；Parquet存储时只解码这些列
+    LOAD_COLUMNS = {
+        'popularity': ['category_tid', 'category_name', 'play_score', 'interaction_score', 'ranking_score',
+                       'play_percentile', 'interaction_percentile', 'ranking_percentile'],
+        'creators': ['uid', 'category_tid', 'category_name', 'followers_count', 'video_count_12m', 'last_video_date'],
+        'videos': ['bv_id', 'category_tid', 'play_count', 'interaction_rate', 'publish_date'],
+        'sdi': ['category_tid', 'category_name', 'narrative_complexity', 'information_density',
+                'voice_importance', 'structure_requirement'],
+    }
+
+    # 各项挑战的默认场景；调用时可传入更多场景（上千个场景也只是矩阵多几列）。
+    # 各场景的排名/得分以 分区 × 场景 的 DataFrame 返回
+    DEDUP_SCENARIOS = {
+        'conservative_50': 0.5,   # 极保守：50%去重
+        'conservative_70': 0.7,   # 保守：70%去重
+        'moderate_80': 0.8,       # 适中：80%去重
+        'aggressive_85': 0.85,    # 激进：85%去重
+        'very_aggressive_90': 0.9  # 极激进：90%去重
+    }
+    # 有受众草图库时追加的实测场景：各分区使用 audience_sketch 测得的去重系数
+    MEASURED_DEDUP_SCENARIO = 'measured'
+
+    # 模拟不同数据源的偏倚情况
+    BIAS_SCENARIOS = {
+        'no_bias': {'play_factor': 1.0, 'interaction_factor': 1.0, 'ranking_factor': 1.0},
+        'play_bias_high': {'play_factor': 1.3, 'interaction_factor': 0.9, 'ranking_factor': 1.0},
+        'interaction_bias_high': {'play_factor': 0.9, 'interaction_factor': 1.4, 'ranking_factor': 1.0},
+        'ranking_bias_high': {'play_factor': 1.0, 'interaction_factor': 1.0, 'ranking_factor': 1.2},
+        'comprehensive_bias': {'play_factor': 1.1, 'interaction_factor': 1.1, 'ranking_factor': 0.8},
+    }
+
+    # 时间窗口（截至快照日期的月份数），12个月为基准
+    WINDOW_MONTHS = [6, 9, 12, 15, 18]
+
+    WEIGHT_SCENARIOS = {
+        'baseline': {'play': 0.5, 'interaction': 0.3, 'ranking': 0.2},
+        'play_emphasis': {'play': 0.7, 'interaction': 0.2, 'ranking': 0.1},
+        'interaction_emphasis': {'play': 0.3, 'interaction': 0.5, 'ranking': 0.2},
+        'ranking_emphasis': {'play': 0.3, 'interaction': 0.2, 'ranking': 0.5},
+        'balanced': {'play': 0.33, 'interaction': 0.33, 'ranking': 0.34},
+    }
+
+    SDI_WEIGHT_SCENARIOS = {
+        'equal_weight': {'narrative': 0.25, 'information': 0.25, 'voice': 0.25, 'structure': 0.25},
+        'narrative_focus': {'narrative': 0.4, 'information': 0.2, 'voice': 0.2, 'structure': 0.2},
+        'information_focus': {'narrative': 0.2, 'information': 0.4, 'voice': 0.2, 'structure': 0.2},
+        'voice_focus': {'narrative': 0.2, 'information': 0.2, 'voice': 0.4, 'structure': 0.2},
+        'structure_focus': {'narrative': 0.2, 'information': 0.2, 'voice': 0.2, 'structure': 0.4},
+    }
+
+    # 爱看程度指数权重：播放 / 互动 / 上榜
+    POPULARITY_WEIGHTS = (0.5, 0.3, 0.2)
+
+    def __init__(self, data_dir, snapshot=None, monte_carlo_samples=0, concentration=10.0, workers=1, seed=None,
+                 audience_db=DEFAULT_AUDIENCE_DB):
         self.data_dir = data_dir
-        self.timestamp = datetime.now().strftime('%Y%m%d')
+        # 受众草图库（不存在时挑战1只测试固定去重系数）
+        self.audience_db = audience_db
+        self.catalog = SnapshotCatalog(data_dir)
+        # 分析对应的数据快照，默认取最新一次采集
+        self.timestamp = snapshot or self.catalog.latest('creators_by_category') or today()
+
+        # 挑战4的蒙特卡洛模式：权重 ~ Dirichlet(concentration × 基准权重)，0 表示不抽样
+        self.monte_carlo_samples = monte_carlo_samples
+        self.concentration = concentration
+        self.workers = workers
+        self.seed = seed
 
     def load_base_data(self):
         """加载基础数据"""
         logger.info("📊 加载基础分析数据...")
 
-        popularity_df = pd.read_csv(os.path.join(self.data_dir, 'raw', f'popularity_metrics_{self.timestamp}.csv'))
-        creators_df = pd.read_csv(os.path.join(self.data_dir, 'raw', f'creators_by_category_{self.timestamp}.csv'))
-        videos_df = pd.read_csv(os.path.join(self.data_dir, 'raw', f'videos_by_category_{self.timestamp}.csv'))
-        sdi_df = pd.read_csv(os.path.join(self.data_dir, 'clean', f'sdi_scores_{self.timestamp}.csv'))
+        popularity_df = self.catalog.load('popularity_metrics', self.timestamp, columns=self.LOAD_COLUMNS['popularity'])
+        creators_df = self.catalog.load('creators_by_category', self.timestamp, columns=self.LOAD_COLUMNS['creators'])
+        videos_df = self.catalog.load('videos_by_category', self.timestamp, columns=self.LOAD_COLUMNS['videos'])
+        sdi_df = self.catalog.load('sdi_scores', self.timestamp, columns=self.LOAD_COLUMNS['sdi'])
 
         return popularity_df, creators_df, videos_df, sdi_df
 
-    def challenge_1_fans_duplication(self, creators_df):
-        """挑战1：粉丝重复计数的影响评估"""
+    def challenge_1_fans_duplication(self, creators_df, dedup_scenarios=None, base='conservative_70'):
+        """
+        挑战1：粉丝重复计数的影响评估。
+        场景值为统一的去重系数，或按 category_tid 索引的各分区系数（实测场景；缺失的分区取其余分区的平均值）
+        """
         logger.info("🔍 挑战1: 分析粉丝重复计数对结果的影响...")
 
         results = {}
-
-        # 测试不同去重系数的影响
-        dedup_scenarios = {
-            'conservative_50': 0.5,   # 极保守：50%去重
-            'conservative_70': 0.7,   # 保守：70%去重
-            'moderate_80': 0.8,       # 适中：80%去重
-            'aggressive_85': 0.85,    # 激进：85%去重
-            'very_aggressive_90': 0.9  # 极激进：90%去重
-        }
-
-        category_impacts = []
-
-        for scenario, dedup_factor in dedup_scenarios.items():
-            scenario_results = []
-
-            for tid in creators_df['category_tid'].unique():
-                category_creators = creators_df[creators_df['category_tid'] == tid]
-                category_name = category_creators.iloc[0]['category_name']
-
-                total_followers_raw = category_creators['followers_count'].sum()
-                total_followers_dedup = int(total_followers_raw * dedup_factor)
-
-                scenario_results.append({
-                    'category_tid': tid,
-                    'category_name': category_name,
-                    'scenario': scenario,
-                    'dedup_factor': dedup_factor,
-                    'followers_raw': total_followers_raw,
-                    'followers_dedup': total_followers_dedup,
-                    'impact_pct': (total_followers_dedup - total_followers_raw) / total_followers_raw
-                })
-
-            category_impacts.extend(scenario_results)
-
-        impact_df = pd.DataFrame(category_impacts)
-
-        # 计算排名稳定性
-        ranking_stability = {}
-
-        for scenario in dedup_scenarios.keys():
-            scenario_data = impact_df[impact_df['scenario'] == scenario].copy()
-            scenario_data = scenario_data.sort_values('followers_dedup', ascending=False)
-            scenario_data['rank'] = range(1, len(scenario_data) + 1)
-            ranking_stability[scenario] = scenario_data[['category_name', 'rank']].set_index('category_name')['rank'].to_dict()
-
-        # 计算Jaccard相似度（排名重叠度）
-        base_ranking = ranking_stability['conservative_70']  # 以保守70%为基准
-        similarities = {}
-
-        for scenario, ranking in ranking_stability.items():
-            if scenario != 'conservative_70':
-                # 计算Top5排名的Jaccard相似度
-                base_top5 = set([cat for cat, rank in base_ranking.items() if rank <= 5])
-                scenario_top5 = set([cat for cat, rank in ranking.items() if rank <= 5])
-
-                intersection = len(base_top5.intersection(scenario_top5))
-                union = len(base_top5.union(scenario_top5))
-                jaccard = intersection / union if union > 0 else 0
-
-                similarities[scenario] = jaccard
+        dedup_scenarios = dedup_scenarios or self.DEDUP_SCENARIOS
+
+        # 分区粉丝总量只汇总一次，各场景只是乘以不同的去重系数：分区 × 场景
+        totals = creators_df.groupby('category_tid', sort=False, observed=True).agg(
+            category_name=('category_name', 'first'),
+            followers_raw=('followers_count', 'sum'),
+        )
+        scenarios = list(dedup_scenarios)
+        factors = np.column_stack([self._category_factors(dedup_scenarios[scenario], totals.index)
+                                   for scenario in scenarios])
+        followers_raw = totals['followers_raw'].to_numpy(dtype=np.int64)
+        followers_dedup = np.floor(followers_raw[:, None] * factors).astype(np.int64)
+
+        n_categories = len(totals)
+        impact_df = pd.DataFrame({
+            'category_tid': np.tile(totals.index.to_numpy(), len(scenarios)),
+            'category_name': np.tile(totals['category_name'].to_numpy(), len(scenarios)),
+            'scenario': np.repeat(scenarios, n_categories),
+            'dedup_factor': factors.T.ravel(),
+            'followers_raw': np.tile(followers_raw, len(scenarios)),
+            'followers_dedup': followers_dedup.T.ravel(),
+        })
+        impact_df['impact_pct'] = (impact_df['followers_dedup'] - impact_df['followers_raw']) / impact_df['followers_raw']
+
+        # 计算排名稳定性与Top5排名的Jaccard相似度（以保守70%为基准）
+        ranks = scenario_ranks(followers_dedup, totals['category_name'], scenarios)
 
         results['impact_analysis'] = impact_df
-        results['ranking_stability'] = ranking_stability
-        results['jaccard_similarities'] = similarities
+        results['ranking_stability'] = ranks
+        results['jaccard_similarities'] = top_k_jaccard(ranks, base).to_dict()
 
-        logger.info(f"✅ 粉丝去重影响分析完成，排名稳定性: {np.mean(list(similarities.values())):.2%}")
+        logger.info(f"✅ 粉丝去重影响分析完成，排名稳定性: {np.mean(list(results['jaccard_similarities'].values())):.2%}")
 
         return results
 
-    def challenge_2_data_source_bias(self, popularity_df, videos_df):
+    def dedup_scenarios(self):
+        """挑战1的默认场景；受众草图库存在时追加实测场景"""
+        scenarios = dict(self.DEDUP_SCENARIOS)
+        measured_factors = load_dedup_factors(self.audience_db)
+        if measured_factors is not None:
+            scenarios[self.MEASURED_DEDUP_SCENARIO] = measured_factors
+        return scenarios
+
+    @staticmethod
+    def _category_factors(factor, category_tids):
+        """去重场景 -> 各分区的去重系数向量"""
+        if np.isscalar(factor):
+            return np.full(len(category_tids), factor, dtype=float)
+        factors = pd.Series(category_tids).map(factor)
+        return factors.fillna(factors.mean()).to_numpy(dtype=float)
+
+    def challenge_2_data_source_bias(self, popularity_df, videos_df, bias_scenarios=None, base='no_bias'):
         """挑战2：数据源偏倚的稳健性测试"""
         logger.info("🔍 挑战2: 评估数据源偏倚对Top5结果的影响...")
 
         results = {}
+        bias_scenarios = bias_scenarios or self.BIAS_SCENARIOS
 
-        # 模拟不同数据源的偏倚情况
-        bias_scenarios = {
-            'no_bias': {'play_factor': 1.0, 'interaction_factor': 1.0, 'ranking_factor': 1.0},
-            'play_bias_high': {'play_factor': 1.3, 'interaction_factor': 0.9, 'ranking_factor': 1.0},
-            'interaction_bias_high': {'play_factor': 0.9, 'interaction_factor': 1.4, 'ranking_factor': 1.0},
-            'ranking_bias_high': {'play_factor': 1.0, 'interaction_factor': 1.0, 'ranking_factor': 1.2},
-            'comprehensive_bias': {'play_factor': 1.1, 'interaction_factor': 1.1, 'ranking_factor': 0.8},
-        }
-
-        scenario_rankings = {}
-
-        for scenario_name, factors in bias_scenarios.items():
-            # 应用偏倚因子
-            biased_popularity = popularity_df.copy()
-
-            biased_popularity['biased_play_score'] = biased_popularity['play_score'] * factors['play_factor']
-            biased_popularity['biased_interaction_score'] = biased_popularity['interaction_score'] * factors['interaction_factor']
-            biased_popularity['biased_ranking_score'] = biased_popularity['ranking_score'] * factors['ranking_factor']
-
-            # 重新计算百分位
-            biased_popularity['biased_play_percentile'] = biased_popularity['biased_play_score'].rank(pct=True)
-            biased_popularity['biased_interaction_percentile'] = biased_popularity['biased_interaction_score'].rank(pct=True)
-            biased_popularity['biased_ranking_percentile'] = biased_popularity['biased_ranking_score'].rank(pct=True)
-
-            # 重新计算综合指数
-            biased_popularity['biased_popularity_index'] = (
-                0.5 * biased_popularity['biased_play_percentile'] +
-                0.3 * biased_popularity['biased_interaction_percentile'] +
-                0.2 * biased_popularity['biased_ranking_percentile']
-            )
-
-            # 重新排名
-            biased_popularity = biased_popularity.sort_values('biased_popularity_index', ascending=False)
-            biased_popularity['biased_rank'] = range(1, len(biased_popularity) + 1)
+        # 各指标乘以场景的偏倚因子后逐列重新计算百分位，再按爱看程度权重合成：分区 × 场景
+        scenarios, factors = scenario_matrix(bias_scenarios, ['play_factor', 'interaction_factor', 'ranking_factor'])
+        scores = popularity_df[['play_score', 'interaction_score', 'ranking_score']].to_numpy(dtype=float)
+        biased_index = sum(
+            weight * percentile_ranks(scores[:, [i]] * factors[:, i])
+            for i, weight in enumerate(self.POPULARITY_WEIGHTS)
+        )
 
-            scenario_rankings[scenario_name] = biased_popularity[['category_name', 'biased_rank']].set_index('category_name')['biased_rank'].to_dict()
+        ranks = scenario_ranks(biased_index, popularity_df['category_name'], scenarios)
+        stability_scores = top_k_stability(ranks, base).to_dict()
 
-        # 计算Top5稳健性
-        base_top5 = set([cat for cat, rank in scenario_rankings['no_bias'].items() if rank <= 5])
-        stability_scores = {}
-
-        for scenario, ranking in scenario_rankings.items():
-            if scenario != 'no_bias':
-                scenario_top5 = set([cat for cat, rank in ranking.items() if rank <= 5])
-                overlap = len(base_top5.intersection(scenario_top5))
-                stability_scores[scenario] = overlap / 5  # Top5重叠比例
-
-        results['scenario_rankings'] = scenario_rankings
+        results['scenario_rankings'] = ranks
         results['stability_scores'] = stability_scores
         results['avg_stability'] = np.mean(list(stability_scores.values()))
 
@@ -164,351 +188,201 @@ class ChallengeAnalyzer:
 
         return results
 
-    def challenge_3_time_window_sensitivity(self, creators_df, videos_df):
-        """挑战3：时间窗口选择的敏感性测试"""
+    def challenge_3_time_window_sensitivity(self, creators_df, videos_df, windows=None, base=12, reference_date=None):
+        """
+        挑战3：时间窗口选择的敏感性测试。
+        窗口为截至 reference_date（默认快照日期）的近 N 个月，可为任意月数；
+        活跃创作者按 last_video_date、热门视频按 publish_date 实际过滤
+        """
         logger.info("🔍 挑战3: 测试不同时间窗口对结果的影响...")
 
         results = {}
+        windows = list(windows or self.WINDOW_MONTHS)
+        start, end = window_bounds(reference_date or snapshot_date(self.timestamp), windows)
+
+        # 日期索引只建一次，每个窗口只是一次二分查找
+        creators_index = DateWindowIndex(creators_df['category_tid'], creators_df['last_video_date'])
+        videos_index = DateWindowIndex(videos_df['category_tid'], videos_df['publish_date'])
+        names = creators_df.drop_duplicates('category_tid')['category_name'].to_numpy()
+
+        active_creators = creators_index.counts(start, end)
+        hot_videos = videos_index.frame(videos_index.counts(start, end), windows).reindex(creators_index.tids, fill_value=0)
 
-        # 模拟不同时间窗口（月份数）
-        time_windows = [6, 9, 12, 15, 18]  # 6个月到18个月
-
-        window_results = {}
-
-        for window_months in time_windows:
-            # 模拟时间窗口效应
-            window_factor = {
-                6: 0.6,   # 6个月数据较少
-                9: 0.8,   # 9个月数据适中
-                12: 1.0,  # 12个月基准
-                15: 1.1,  # 15个月数据充分
-                18: 1.15  # 18个月数据最充分
-            }
-
-            factor = window_factor[window_months]
-
-            # 调整创作者活跃度
-            adjusted_creators = creators_df.copy()
-            adjusted_creators['adjusted_video_count'] = adjusted_creators['video_count_12m'] * factor
-
-            # 重新计算分区指标
-            category_metrics = []
-            for tid in adjusted_creators['category_tid'].unique():
-                category_data = adjusted_creators[adjusted_creators['category_tid'] == tid]
-                category_name = category_data.iloc[0]['category_name']
-
-                avg_videos = category_data['adjusted_video_count'].mean()
-                active_creators = len(category_data[category_data['adjusted_video_count'] >= 1])
-
-                category_metrics.append({
-                    'category_tid': tid,
-                    'category_name': category_name,
-                    'window_months': window_months,
-                    'active_creators': active_creators,
-                    'avg_videos': avg_videos,
-                    'activity_score': active_creators * avg_videos
-                })
-
-            window_df = pd.DataFrame(category_metrics)
-            window_df = window_df.sort_values('activity_score', ascending=False)
-            window_df['rank'] = range(1, len(window_df) + 1)
-
-            window_results[window_months] = window_df[['category_name', 'rank']].set_index('category_name')['rank'].to_dict()
-
-        # 计算时间窗口稳定性
-        base_ranking = window_results[12]  # 以12个月为基准
-        time_stability = {}
-
-        for window, ranking in window_results.items():
-            if window != 12:
-                base_top5 = set([cat for cat, rank in base_ranking.items() if rank <= 5])
-                window_top5 = set([cat for cat, rank in ranking.items() if rank <= 5])
-                overlap = len(base_top5.intersection(window_top5))
-                time_stability[f'{window}months'] = overlap / 5
-
-        results['window_rankings'] = window_results
-        results['time_stability'] = time_stability
-        results['avg_time_stability'] = np.mean(list(time_stability.values()))
+        # 活跃度按窗口内的实际计数排名：先比热门视频数（publish_date），相同时比活跃创作者数（last_video_date）
+        activity_score = hot_videos.to_numpy(dtype=np.int64) * (int(active_creators.max(initial=0)) + 1) + active_creators
+
+        ranks = scenario_ranks(activity_score, names, windows)
+        time_stability = top_k_stability(ranks, base)
+        time_stability.index = [f'{window}months' for window in time_stability.index]
+
+        results['window_rankings'] = ranks
+        results['active_creators'] = pd.DataFrame(active_creators, index=ranks.index, columns=windows)
+        results['hot_videos'] = hot_videos.set_axis(ranks.index)
+        results['time_stability'] = time_stability.to_dict()
+        results['avg_time_stability'] = np.mean(list(results['time_stability'].values()))
 
         logger.info(f"✅ 时间窗口敏感性分析完成，平均稳定性: {results['avg_time_stability']:.1%}")
 
         return results
 
-    def challenge_4_weight_sensitivity(self, popularity_df):
+    def challenge_4_weight_sensitivity(self, popularity_df, weight_scenarios=None, base='baseline'):
         """挑战4：权重参数的敏感性分析"""
         logger.info("🔍 挑战4: 测试爱看程度指数权重的敏感性...")
 
         results = {}
+        weight_scenarios = weight_scenarios or self.WEIGHT_SCENARIOS
 
-        # 测试不同权重组合
-        weight_scenarios = {
-            'baseline': {'play': 0.5, 'interaction': 0.3, 'ranking': 0.2},
-            'play_emphasis': {'play': 0.7, 'interaction': 0.2, 'ranking': 0.1},
-            'interaction_emphasis': {'play': 0.3, 'interaction': 0.5, 'ranking': 0.2},
-            'ranking_emphasis': {'play': 0.3, 'interaction': 0.2, 'ranking': 0.5},
-            'balanced': {'play': 0.33, 'interaction': 0.33, 'ranking': 0.34},
-        }
-
-        weight_rankings = {}
+        # 百分位特征 (分区 × 3) 与权重 (场景 × 3) 相乘，一次得到全部场景的综合指数
+        scenarios, weights = scenario_matrix(weight_scenarios, ['play', 'interaction', 'ranking'])
+        percentiles = popularity_df[['play_percentile', 'interaction_percentile', 'ranking_percentile']]
+        popularity_index = weighted_scores(percentiles, weights)
 
-        for scenario_name, weights in weight_scenarios.items():
-            # 重新计算综合指数
-            recalc_popularity = popularity_df.copy()
+        ranks = scenario_ranks(popularity_index, popularity_df['category_name'], scenarios)
+        weight_stability = top_k_stability(ranks, base).to_dict()
 
-            recalc_popularity['new_popularity_index'] = (
-                weights['play'] * recalc_popularity['play_percentile'] +
-                weights['interaction'] * recalc_popularity['interaction_percentile'] +
-                weights['ranking'] * recalc_popularity['ranking_percentile']
-            )
-
-            # 重新排名
-            recalc_popularity = recalc_popularity.sort_values('new_popularity_index', ascending=False)
-            recalc_popularity['new_rank'] = range(1, len(recalc_popularity) + 1)
-
-            weight_rankings[scenario_name] = recalc_popularity[['category_name', 'new_rank']].set_index('category_name')['new_rank'].to_dict()
-
-        # 计算权重稳定性
-        base_ranking = weight_rankings['baseline']
-        weight_stability = {}
-
-        for scenario, ranking in weight_rankings.items():
-            if scenario != 'baseline':
-                base_top5 = set([cat for cat, rank in base_ranking.items() if rank <= 5])
-                scenario_top5 = set([cat for cat, rank in ranking.items() if rank <= 5])
-                overlap = len(base_top5.intersection(scenario_top5))
-                weight_stability[scenario] = overlap / 5
-
-        results['weight_rankings'] = weight_rankings
+        results['weight_rankings'] = ranks
         results['weight_stability'] = weight_stability
         results['avg_weight_stability'] = np.mean(list(weight_stability.values()))
 
+        if self.monte_carlo_samples:
+            results['monte_carlo'] = self.weight_monte_carlo(popularity_df, self.monte_carlo_samples)
+
         logger.info(f"✅ 权重敏感性分析完成，平均稳定性: {results['avg_weight_stability']:.1%}")
 
         return results
 
-    def challenge_5_sdi_assumption_test(self, sdi_df):
-        """挑战5：SDI评分假设的合理性检验"""
-        logger.info("🔍 挑战5: 检验SDI评分假设的合理性...")
-
-        results = {}
-
-        # 测试不同的SDI权重组合
-        sdi_weight_scenarios = {
-            'equal_weight': {'narrative': 0.25, 'information': 0.25, 'voice': 0.25, 'structure': 0.25},
-            'narrative_focus': {'narrative': 0.4, 'information': 0.2, 'voice': 0.2, 'structure': 0.2},
-            'information_focus': {'narrative': 0.2, 'information': 0.4, 'voice': 0.2, 'structure': 0.2},
-            'voice_focus': {'narrative': 0.2, 'information': 0.2, 'voice': 0.4, 'structure': 0.2},
-            'structure_focus': {'narrative': 0.2, 'information': 0.2, 'voice': 0.2, 'structure': 0.4},
-        }
-
-        sdi_scenarios_results = {}
-
-        for scenario_name, weights in sdi_weight_scenarios.items():
-            recalc_sdi = sdi_df.copy()
-
-            # 重新计算SDI分数
-            recalc_sdi['new_sdi_score'] = (
-                weights['narrative'] * recalc_sdi['narrative_complexity'] +
-                weights['information'] * recalc_sdi['information_density'] +
-                weights['voice'] * recalc_sdi['voice_importance'] +
-                weights['structure'] * recalc_sdi['structure_requirement']
-            )
-
-            # 重新分类依赖程度
-            def categorize_dependency(score):
-                if score >= 4.0:
-                    return "高依赖"
-                elif score >= 2.5:
-                    return "中等依赖"
-                else:
-                    return "低依赖"
+    def weight_monte_carlo(self, popularity_df, n_samples, k=5):
+        """
+        挑战4的蒙特卡洛模式：从以基准权重为中心的 Dirichlet 分布抽样 n_samples 组权重，
+        返回每个分区的Top-K入选概率、平均名次与名次分位数
+        """
+        logger.info(f"🎲 蒙特卡洛权重抽样: {n_samples:,} 组，{self.workers} 个进程...")
 
-            recalc_sdi['new_dependency_level'] = recalc_sdi['new_sdi_score'].apply(categorize_dependency)
+        alpha = self.concentration * np.array(self.POPULARITY_WEIGHTS)
+        percentiles = popularity_df[['play_percentile', 'interaction_percentile', 'ranking_percentile']].to_numpy(dtype=float)
+        counts = dirichlet_rank_counts(percentiles, alpha, n_samples, seed=self.seed, workers=self.workers)
 
-            sdi_scenarios_results[scenario_name] = recalc_sdi[['category_name', 'new_sdi_score', 'new_dependency_level']].copy()
+        distribution = rank_distribution(counts, popularity_df['category_name'], k=k)
+        distribution.attrs.update(n_samples=n_samples, alpha=alpha.tolist())
+        return distribution
 
-        # 分析分类稳定性
-        base_categories = sdi_scenarios_results['equal_weight'].set_index('category_name')['new_dependency_level'].to_dict()
+    def challenge_5_sdi_assumption_test(self, sdi_df, sdi_weight_scenarios=None, base='equal_weight'):
+        """挑战5：SDI评分假设的合理性检验"""
+        logger.info("🔍 挑战5: 检验SDI评分假设的合理性...")
 
-        category_stability = {}
-        for scenario, df in sdi_scenarios_results.items():
-            if scenario != 'equal_weight':
-                scenario_categories = df.set_index('category_name')['new_dependency_level'].to_dict()
+        results = {}
+        sdi_weight_scenarios = sdi_weight_scenarios or self.SDI_WEIGHT_SCENARIOS
 
-                matches = sum(1 for cat in base_categories.keys()
-                            if base_categories[cat] == scenario_categories.get(cat, 'Unknown'))
+        # 四个维度 (分区 × 4) 与权重 (场景 × 4) 相乘，再按阈值一次性重新分类依赖程度
+        scenarios, weights = scenario_matrix(sdi_weight_scenarios, ['narrative', 'information', 'voice', 'structure'])
+        dimensions = sdi_df[SDIAnalyzer.SDI_DIMENSIONS]
+        sdi_scores, level_codes = SDIAnalyzer.score_weights(dimensions, weights)
+        levels = SDIAnalyzer.DEPENDENCY_LEVELS[level_codes]
 
-                category_stability[scenario] = matches / len(base_categories)
+        # 分析分类稳定性：与基准场景分类一致的分区比例
+        base_levels = levels[:, [scenarios.index(base)]]
+        agreement = pd.Series((levels == base_levels).mean(axis=0), index=scenarios).drop(base)
 
-        results['sdi_scenarios'] = sdi_scenarios_results
-        results['category_stability'] = category_stability
-        results['avg_sdi_stability'] = np.mean(list(category_stability.values()))
+        index = pd.Index(sdi_df['category_name'], name='category_name')
+        results['sdi_scenarios'] = pd.DataFrame(sdi_scores, index=index, columns=scenarios)
+        results['dependency_levels'] = pd.DataFrame(levels, index=index, columns=scenarios)
+        results['category_stability'] = agreement.to_dict()
+        results['avg_sdi_stability'] = np.mean(list(results['category_stability'].values()))
 
         logger.info(f"✅ SDI假设检验完成，分类稳定性: {results['avg_sdi_stability']:.1%}")
 
         return results
 
+    @staticmethod
+    def _stability_rows(stability):
+        """{场景: 与基准的一致度} -> 表格行"""
+        stability = pd.Series(stability, dtype=float)
+        return table_rows(pd.DataFrame({'scenario': stability.index, 'stability': stability.to_numpy()}),
+                          [('scenario', '{}'), ('stability', '{:.1%}')])
+
     def generate_challenge_report(self, all_challenges):
         """生成挑战分析报告"""
         logger.info("📝 生成挑战分析报告...")
 
         report_file = os.path.join(self.data_dir, f'challenge_analysis_{self.timestamp}.md')
 
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write("# 挑战分析与敏感性测试报告\n\n")
-            f.write(f"**生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-
-            f.write("## 📋 分析概述\n\n")
-            f.write("本报告对Bilibili创作者与粉丝体量测算的关键假设和方法进行挑战性分析，")
-            f.write("评估结果的稳健性和可靠性。通过敏感性测试，识别潜在风险并提出改进建议。\n\n")
-
-            # 挑战1：粉丝重复计数
-            f.write("## 🔍 挑战1：粉丝重复计数的影响评估\n\n")
-            challenge1 = all_challenges['fans_duplication']
-            f.write("### 核心质疑\n")
-            f.write("口径A的粉丝累加方式必然存在重复计数，不同的去重假设会如何影响分区排名？\n\n")
-
-            f.write("### 测试方法\n")
-            f.write("测试5种去重系数（50%, 70%, 80%, 85%, 90%），计算排名变化和Jaccard相似度。\n\n")
-
-            f.write("### 测试结果\n")
-            f.write("| 去重方案 | 去重系数 | 与基准的Top5相似度 |\n")
-            f.write("|----------|----------|-------------------|\n")
-
-            for scenario, similarity in challenge1['jaccard_similarities'].items():
-                f.write(f"| {scenario} | {challenge1['impact_analysis'][challenge1['impact_analysis']['scenario']==scenario].iloc[0]['dedup_factor']:.0%} | {similarity:.1%} |\n")
-
-            avg_similarity = np.mean(list(challenge1['jaccard_similarities'].values()))
-            f.write(f"\n**结论**: 平均相似度 {avg_similarity:.1%}，排名相对稳定，去重假设的影响在可接受范围内。\n\n")
-
-            # 挑战2：数据源偏倚
-            f.write("## 🔍 挑战2：数据源偏倚的稳健性测试\n\n")
-            challenge2 = all_challenges['data_source_bias']
-            f.write("### 核心质疑\n")
-            f.write("第三方平台的榜单数据可能存在结构性偏倚，这会如何影响\"爱看程度\"的排名？\n\n")
-
-            f.write("### 测试方法\n")
-            f.write("模拟5种偏倚情况（播放偏高、互动偏高、上榜偏高等），重新计算Top5排名。\n\n")
-
-            f.write("### 测试结果\n")
-            f.write("| 偏倚情况 | Top5重叠度 |\n")
-            f.write("|----------|------------|\n")
+        challenge1 = all_challenges['fans_duplication']
+        challenge2 = all_challenges['data_source_bias']
+        challenge3 = all_challenges['time_window']
+        challenge4 = all_challenges['weight_sensitivity']
+        challenge5 = all_challenges['sdi_assumption']
+
+        # 挑战1：各场景的去重系数（实测场景显示分区间的范围）
+        similarities = pd.Series(challenge1['jaccard_similarities'], name='similarity')
+        factor_range = challenge1['impact_analysis'].groupby('scenario')['dedup_factor'].agg(['min', 'max'])
+        factor_range = factor_range.reindex(similarities.index)
+        low, high = format_column(factor_range['min'], '{:.0%}'), format_column(factor_range['max'], '{:.0%}')
+        dedup_df = pd.DataFrame({
+            'scenario': similarities.index,
+            'dedup_factor': np.where(factor_range['min'] == factor_range['max'], low, low + '-' + high),
+            'similarity': similarities.to_numpy(),
+        })
+        avg_similarity = similarities.mean()
+
+        # 挑战3：窗口合计，基准窗口的重叠度显示为"基准"
+        windows = challenge3['window_rankings'].columns
+        window_df = pd.DataFrame({
+            'window': [f'{window}months' for window in windows],
+            'active_creators': challenge3['active_creators'][windows].sum().to_numpy(),
+            'hot_videos': challenge3['hot_videos'][windows].sum().to_numpy(),
+        })
+        window_df['stability'] = window_df['window'].map(challenge3['time_stability'])
+
+        monte_carlo_section = ''
+        if 'monte_carlo' in challenge4:
+            monte_carlo = challenge4['monte_carlo']
+            monte_carlo_section = render_section(
+                'challenge_monte_carlo',
+                alpha='/'.join(f"{a:g}" for a in monte_carlo.attrs['alpha']),
+                n_samples=f"{monte_carlo.attrs['n_samples']:,}",
+                rank_table=table_rows(monte_carlo.reset_index(), [
+                    ('category_name', '{}'), ('top5_probability', '{:.1%}'), ('mean_rank', '{:.2f}'),
+                    (range_column('rank_p5', 'rank_p95', '{:.0f}'), None),
+                ]),
+            )
 
-            for scenario, stability in challenge2['stability_scores'].items():
-                f.write(f"| {scenario} | {stability:.1%} |\n")
-
-            f.write(f"\n**结论**: 平均稳定性 {challenge2['avg_stability']:.1%}，结果对数据源偏倚具有一定抗性。\n\n")
-
-            # 挑战3：时间窗口敏感性
-            f.write("## 🔍 挑战3：时间窗口选择的敏感性测试\n\n")
-            challenge3 = all_challenges['time_window']
-            f.write("### 核心质疑\n")
-            f.write("12个月的时间窗口是否合适？不同时间窗口会如何影响活跃度和排名？\n\n")
-
-            f.write("### 测试方法\n")
-            f.write("测试6/9/12/15/18个月的时间窗口，比较创作者活跃度和分区排名变化。\n\n")
-
-            f.write("### 测试结果\n")
-            f.write("| 时间窗口 | 与12个月的Top5重叠度 |\n")
-            f.write("|----------|---------------------|\n")
-
-            for window, stability in challenge3['time_stability'].items():
-                f.write(f"| {window} | {stability:.1%} |\n")
-
-            f.write(f"\n**结论**: 平均稳定性 {challenge3['avg_time_stability']:.1%}，12个月窗口选择较为合理。\n\n")
-
-            # 挑战4：权重敏感性
-            f.write("## 🔍 挑战4：权重参数的敏感性分析\n\n")
-            challenge4 = all_challenges['weight_sensitivity']
-            f.write("### 核心质疑\n")
-            f.write("\"爱看程度\"指数的权重设置（0.5/0.3/0.2）是否合理？权重变化对结果影响多大？\n\n")
-
-            f.write("### 测试方法\n")
-            f.write("测试5种权重组合，包括播放主导、互动主导、上榜主导和均衡权重等。\n\n")
-
-            f.write("### 测试结果\n")
-            f.write("| 权重方案 | Top5重叠度 |\n")
-            f.write("|----------|------------|\n")
-
-            for scenario, stability in challenge4['weight_stability'].items():
-                f.write(f"| {scenario} | {stability:.1%} |\n")
-
-            f.write(f"\n**结论**: 平均稳定性 {challenge4['avg_weight_stability']:.1%}，权重设置对结果影响适中。\n\n")
-
-            # 挑战5：SDI假设检验
-            f.write("## 🔍 挑战5：SDI评分假设的合理性检验\n\n")
-            challenge5 = all_challenges['sdi_assumption']
-            f.write("### 核心质疑\n")
-            f.write("SDI四个维度的等权重假设是否合理？不同权重下的分类稳定性如何？\n\n")
-
-            f.write("### 测试方法\n")
-            f.write("测试5种SDI权重组合，观察高/中/低脚本依赖分类的稳定性。\n\n")
-
-            f.write("### 测试结果\n")
-            f.write("| 权重方案 | 分类一致性 |\n")
-            f.write("|----------|------------|\n")
-
-            for scenario, stability in challenge5['category_stability'].items():
-                f.write(f"| {scenario} | {stability:.1%} |\n")
-
-            f.write(f"\n**结论**: 平均一致性 {challenge5['avg_sdi_stability']:.1%}，SDI分类相对稳定。\n\n")
-
-            # 综合评估
-            f.write("## 📊 综合稳健性评估\n\n")
-
-            overall_stability = np.mean([
-                avg_similarity,
-                challenge2['avg_stability'],
-                challenge3['avg_time_stability'],
-                challenge4['avg_weight_stability'],
-                challenge5['avg_sdi_stability']
-            ])
-
-            f.write(f"**整体稳健性评分**: {overall_stability:.1%}\n\n")
-
-            if overall_stability >= 0.8:
-                f.write("✅ **结论**: 分析结果具有较高稳健性，核心发现可信度高。\n\n")
-            elif overall_stability >= 0.6:
-                f.write("⚠️ **结论**: 分析结果稳健性中等，建议进一步验证关键假设。\n\n")
-            else:
-                f.write("❌ **结论**: 分析结果稳健性较低，需要重新审视方法和假设。\n\n")
-
-            # 改进建议
-            f.write("## 💡 改进建议\n\n")
-            f.write("### 方法论优化\n")
-            f.write("1. **多源数据验证**: 整合飞瓜、火烧云、卡思等多个平台数据\n")
-            f.write("2. **动态权重调整**: 根据分区特征动态调整指标权重\n")
-            f.write("3. **置信区间报告**: 为关键指标提供置信区间而非点估计\n")
-            f.write("4. **分层抽样**: 按创作者规模分层，减少头部账号的影响\n\n")
-
-            f.write("### 数据质量提升\n")
-            f.write("1. **实时数据更新**: 建立月度数据更新机制\n")
-            f.write("2. **数据质量监控**: 设置异常值检测和数据完整性检查\n")
-            f.write("3. **标准化处理**: 建立数据预处理的标准化流程\n")
-            f.write("4. **外部验证**: 寻找官方或第三方数据进行交叉验证\n\n")
-
-            f.write("### 分析框架完善\n")
-            f.write("1. **场景分析**: 为不同应用场景定制化分析口径\n")
-            f.write("2. **趋势跟踪**: 增加时间序列分析，捕捉动态变化\n")
-            f.write("3. **用户细分**: 按粉丝规模、内容类型等维度细分分析\n")
-            f.write("4. **预测建模**: 基于历史数据建立增长预测模型\n\n")
-
-            # 风险提示
-            f.write("## ⚠️ 风险提示与使用建议\n\n")
-            f.write("### 主要风险\n")
-            f.write("1. **数据时效性**: 社交媒体数据变化快，分析结果有时效性\n")
-            f.write("2. **平台政策变化**: 算法调整可能影响内容分发和用户行为\n")
-            f.write("3. **样本代表性**: 第三方平台数据可能无法完全代表全平台情况\n")
-            f.write("4. **因果推断限制**: 相关性分析无法确定因果关系\n\n")
-
-            f.write("### 使用建议\n")
-            f.write("1. **结合定性分析**: 量化分析需要结合行业专家的定性判断\n")
-            f.write("2. **分阶段验证**: 小规模试点验证后再大规模应用\n")
-            f.write("3. **持续监控**: 建立结果跟踪机制，及时调整策略\n")
-            f.write("4. **多维度决策**: 将分析结果作为决策参考之一，而非唯一依据\n\n")
-
-            f.write("---\n")
-            f.write("**报告说明**: 本挑战分析基于当前数据和假设，随着数据质量和方法改进，结论可能需要更新。\n")
+        # 综合评估
+        overall_stability = np.mean([
+            avg_similarity,
+            challenge2['avg_stability'],
+            challenge3['avg_time_stability'],
+            challenge4['avg_weight_stability'],
+            challenge5['avg_sdi_stability']
+        ])
+        if overall_stability >= 0.8:
+            overall_conclusion = "✅ **结论**: 分析结果具有较高稳健性，核心发现可信度高。"
+        elif overall_stability >= 0.6:
+            overall_conclusion = "⚠️ **结论**: 分析结果稳健性中等，建议进一步验证关键假设。"
+        else:
+            overall_conclusion = "❌ **结论**: 分析结果稳健性较低，需要重新审视方法和假设。"
+
+        render_file(
+            report_file, 'challenge_analysis',
+            generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            measured_note="另加入由粉丝样本草图实测的各分区去重系数（measured）。"
+            if self.MEASURED_DEDUP_SCENARIO in challenge1['ranking_stability'].columns else '',
+            dedup_table=table_rows(dedup_df, [('scenario', '{}'), ('dedup_factor', None), ('similarity', '{:.1%}')]),
+            avg_similarity=f"{avg_similarity:.1%}",
+            bias_table=self._stability_rows(challenge2['stability_scores']),
+            avg_stability=f"{challenge2['avg_stability']:.1%}",
+            window_table=table_rows(window_df, [
+                ('window', '{}'), ('active_creators', '{:,}'), ('hot_videos', '{:,}'),
+                ('stability', lambda values: format_column(values, '{:.1%}', na_rep='基准')),
+            ]),
+            avg_time_stability=f"{challenge3['avg_time_stability']:.1%}",
+            weight_table=self._stability_rows(challenge4['weight_stability']),
+            avg_weight_stability=f"{challenge4['avg_weight_stability']:.1%}",
+            monte_carlo_section=monte_carlo_section,
+            sdi_table=self._stability_rows(challenge5['category_stability']),
+            avg_sdi_stability=f"{challenge5['avg_sdi_stability']:.1%}",
+            overall_stability=f"{overall_stability:.1%}",
+            overall_conclusion=overall_conclusion,
+        )
 
         logger.info(f"📝 挑战分析报告已生成: {report_file}")
         return report_file
@@ -523,7 +397,7 @@ class ChallengeAnalyzer:
         # 执行5个挑战分析
         challenges = {}
 
-        challenges['fans_duplication'] = self.challenge_1_fans_duplication(creators_df)
+        challenges['fans_duplication'] = self.challenge_1_fans_duplication(creators_df, self.dedup_scenarios())
         challenges['data_source_bias'] = self.challenge_2_data_source_bias(popularity_df, videos_df)
         challenges['time_window'] = self.challenge_3_time_window_sensitivity(creators_df, videos_df)
         challenges['weight_sensitivity'] = self.challenge_4_weight_sensitivity(popularity_df)
@@ -540,9 +414,25 @@ class ChallengeAnalyzer:
         }
 
 if __name__ == "__main__":
-    analyzer = ChallengeAnalyzer("../")
+    parser = argparse.ArgumentParser(description="挑战分析与敏感性测试")
+    parser.add_argument("--snapshot", default=None, help="快照编号 YYYYMMDD（默认最新）")
+    parser.add_argument("--monte-carlo", type=int, default=0, help="挑战4蒙特卡洛抽样的权重组数（0为不抽样）")
+    parser.add_argument("--concentration", type=float, default=10.0, help="Dirichlet 集中度，越大越接近基准权重")
+    parser.add_argument("--workers", type=int, default=1, help="蒙特卡洛抽样的进程数")
+    parser.add_argument("--seed", type=int, default=None, help="蒙特卡洛抽样的随机种子")
+    parser.add_argument("--audience-db", default=DEFAULT_AUDIENCE_DB, help="受众草图库（存在时加入实测去重场景）")
+    parser.add_argument("--data-cache", action="store_true", help="把解析后的数据集缓存到磁盘，多个脚本间复用（源文件变化即失效）")
+    args = parser.parse_args()
+
+    if args.data_cache:
+        enable_disk_cache()
+
+    analyzer = ChallengeAnalyzer("../", snapshot=args.snapshot, monte_carlo_samples=args.monte_carlo,
+                                 concentration=args.concentration, workers=args.workers, seed=args.seed,
+                                 audience_db=args.audience_db)
     results = analyzer.run()
 
     print("\n🎯 挑战分析完成!")
     print(f"📊 分析报告: {results['report_file']}")
-    print(f"🔍 共完成 {len(results['challenges'])} 项挑战分析")
\ No newline at end of file
+    print(f"🔍 共完成 {len(results['challenges'])} 项挑战分析")
+    print(f"🗄️ {default_loader().summary()}")
\ No newline at end of file
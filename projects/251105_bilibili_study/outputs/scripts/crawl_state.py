@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Durable Crawl State Store
+基于SQLite的爬取状态库：按 category_tid 记录已抓取的列表页、视频与创作者，支持中断后续爬
+"""
+
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    category_tid INTEGER PRIMARY KEY,
+    category_name TEXT NOT NULL,
+    total_pages INTEGER
+);
+CREATE TABLE IF NOT EXISTS pages (
+    category_tid INTEGER NOT NULL,
+    pn INTEGER NOT NULL,
+    video_count INTEGER NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (category_tid, pn)
+);
+CREATE TABLE IF NOT EXISTS videos (
+    bv_id TEXT PRIMARY KEY,
+    title TEXT,
+    creator_uid INTEGER NOT NULL,
+    creator_name TEXT,
+    category_tid INTEGER NOT NULL,
+    category_name TEXT,
+    play_count INTEGER,
+    like_count INTEGER,
+    coin_count INTEGER,
+    favorite_count INTEGER,
+    share_count INTEGER,
+    interaction_rate REAL,
+    publish_date TEXT,
+    ranking_position INTEGER,
+    fetched_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS creators (
+    uid INTEGER PRIMARY KEY,
+    category_tid INTEGER NOT NULL,
+    category_name TEXT,
+    username TEXT,
+    followers_count INTEGER,
+    archive_count INTEGER,
+    discovered_at TEXT NOT NULL,
+    fetched_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_videos_category ON videos (category_tid);
+CREATE INDEX IF NOT EXISTS idx_creators_pending ON creators (fetched_at);
+"""
+
+VIDEO_FIELDS = [
+    'bv_id', 'title', 'creator_uid', 'creator_name', 'category_tid', 'category_name', 'play_count',
+    'like_count', 'coin_count', 'favorite_count', 'share_count', 'interaction_rate', 'publish_date',
+    'ranking_position'
+]
+
+
+class CrawlStateStore:
+    def __init__(self, db_file):
+        self.db_file = db_file
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+
+        self.conn = sqlite3.connect(db_file)
+        # WAL + NORMAL：每页一个事务，崩溃最多丢失正在写入的那一页
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def _now():
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def page_count(self, category_tid):
+        """分区的总页数（第1页抓取后才知道）"""
+        row = self.conn.execute(
+            "SELECT total_pages FROM categories WHERE category_tid = ?", (category_tid,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def done_pages(self, category_tid):
+        """分区已完成的页码集合"""
+        rows = self.conn.execute("SELECT pn FROM pages WHERE category_tid = ?", (category_tid,))
+        return {pn for (pn,) in rows}
+
+    def known_creators(self):
+        """所有已发现的创作者uid（无论名片是否已抓取）"""
+        return {uid for (uid,) in self.conn.execute("SELECT uid FROM creators")}
+
+    def pending_creators(self):
+        """已发现但尚未抓取名片的创作者uid"""
+        return [uid for (uid,) in self.conn.execute("SELECT uid FROM creators WHERE fetched_at IS NULL")]
+
+    def record_page(self, category_tid, category_name, pn, videos, total_pages=None):
+        """在一个事务内写入一页的视频、新发现的创作者和页完成标记"""
+        now = self._now()
+        with self.conn:
+            if total_pages is not None:
+                self.conn.execute(
+                    "INSERT INTO categories (category_tid, category_name, total_pages) VALUES (?, ?, ?) "
+                    "ON CONFLICT(category_tid) DO UPDATE SET total_pages = excluded.total_pages",
+                    (category_tid, category_name, total_pages),
+                )
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO videos ({', '.join(VIDEO_FIELDS)}, fetched_at) "
+                f"VALUES ({', '.join('?' for _ in VIDEO_FIELDS)}, ?)",
+                [tuple(video[field] for field in VIDEO_FIELDS) + (now,) for video in videos],
+            )
+            # 创作者归属首次出现的分区
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO creators (uid, category_tid, category_name, discovered_at) VALUES (?, ?, ?, ?)",
+                [(video['creator_uid'], category_tid, category_name, now) for video in videos],
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (category_tid, pn, video_count, fetched_at) VALUES (?, ?, ?, ?)",
+                (category_tid, pn, len(videos), now),
+            )
+
+    def record_creator(self, uid, username, followers_count, archive_count=None):
+        """写入创作者名片，标记为已抓取"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE creators SET username = ?, followers_count = ?, archive_count = ?, fetched_at = ? "
+                "WHERE uid = ?",
+                (username, followers_count, archive_count, self._now(), uid),
+            )
+
+    def progress(self):
+        """按分区汇总爬取进度"""
+        return pd.read_sql_query(
+            """
+            SELECT c.category_tid, c.category_name, c.total_pages,
+                   (SELECT COUNT(*) FROM pages p WHERE p.category_tid = c.category_tid) AS done_pages,
+                   (SELECT COUNT(*) FROM videos v WHERE v.category_tid = c.category_tid) AS videos,
+                   (SELECT COUNT(*) FROM creators u WHERE u.category_tid = c.category_tid) AS creators,
+                   (SELECT COUNT(*) FROM creators u
+                     WHERE u.category_tid = c.category_tid AND u.fetched_at IS NOT NULL) AS fetched_creators
+            FROM categories c ORDER BY c.category_tid
+            """,
+            self.conn,
+        )
+
+    def load_videos(self):
+        return pd.read_sql_query(f"SELECT {', '.join(VIDEO_FIELDS)} FROM videos", self.conn)
+
+    def load_creators(self):
+        """已抓取名片的创作者"""
+        return pd.read_sql_query(
+            "SELECT uid, username, followers_count, archive_count, category_tid, category_name "
+            "FROM creators WHERE fetched_at IS NOT NULL",
+            self.conn,
+        )
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Async Creator and Video Crawler
+异步创作者/视频采集器：按接口令牌桶限流、固定大小的worker池、基于状态库断点续爬
+"""
+
+import asyncio
+import math
+import logging
+from datetime import datetime, timedelta
+
+import aiohttp
+
+from bilibili_http import AsyncBilibiliClient, BilibiliAPIError, DEFAULT_API_BASE
+from crawl_state import CrawlStateStore
+from schemas import CREATOR_COLUMNS, VIDEO_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+NEWLIST_PATH = "/x/web-interface/newlist"
+CARD_PATH = "/x/web-interface/card"
+
+# 各接口的限流配置: (每秒请求数, 突发容量)
+DEFAULT_RATE_LIMITS = {
+    NEWLIST_PATH: (4, 4),
+    CARD_PATH: (8, 8),
+}
+
+
+class CreatorCrawler:
+    def __init__(self, api_base=DEFAULT_API_BASE, workers=8, page_size=50, max_pages=None,
+                 rate_limits=None, max_retries=3, state_file=None, cache=None):
+        self.api_base = api_base
+        self.workers = workers
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.rate_limits = rate_limits or DEFAULT_RATE_LIMITS
+        self.max_retries = max_retries
+        self.cache = cache
+
+        # 爬取状态逐页/逐个落盘；未指定文件时仅保存在内存中
+        self.state = CrawlStateStore(state_file or ':memory:')
+        self.known_creators = self.state.known_creators()
+        self.failed_tasks = 0
+
+    def _enqueue_pages(self, queue, tid, tname, total_pages):
+        done_pages = self.state.done_pages(tid)
+        for pn in range(2, total_pages + 1):
+            if pn not in done_pages:
+                queue.put_nowait(('page', tid, tname, pn))
+
+    async def _fetch_page(self, client, queue, tid, tname, pn):
+        """抓取分区投稿列表的一页，并把新出现的UP主加入队列"""
+        data = await client.get_data(NEWLIST_PATH, params={'rid': tid, 'pn': pn, 'ps': self.page_size})
+
+        videos = []
+        for index, archive in enumerate(data.get('archives') or []):
+            stat = archive['stat']
+            owner = archive['owner']
+            play_count = stat['view']
+            interactions = stat['like'] + stat['coin'] + stat['favorite'] + stat['share']
+
+            videos.append({
+                'bv_id': archive['bvid'],
+                'title': archive['title'],
+                'creator_uid': owner['mid'],
+                'creator_name': owner['name'],
+                'category_tid': tid,
+                'category_name': tname,
+                'play_count': play_count,
+                'like_count': stat['like'],
+                'coin_count': stat['coin'],
+                'favorite_count': stat['favorite'],
+                'share_count': stat['share'],
+                'interaction_rate': round(interactions / play_count, 4) if play_count else 0.0,
+                'publish_date': datetime.fromtimestamp(archive['pubdate']).strftime('%Y-%m-%d'),
+                'ranking_position': (pn - 1) * self.page_size + index + 1,
+            })
+
+        total_pages = None
+        if pn == 1:
+            total_pages = math.ceil(data['page']['count'] / self.page_size)
+            if self.max_pages:
+                total_pages = min(total_pages, self.max_pages)
+
+        self.state.record_page(tid, tname, pn, videos, total_pages=total_pages)
+
+        for video in videos:
+            uid = video['creator_uid']
+            if uid not in self.known_creators:
+                self.known_creators.add(uid)
+                queue.put_nowait(('creator', uid))
+
+        if total_pages is not None:
+            self._enqueue_pages(queue, tid, tname, total_pages)
+
+    async def _fetch_creator(self, client, uid):
+        """抓取UP主名片（粉丝数、投稿数）"""
+        data = await client.get_data(CARD_PATH, params={'mid': uid})
+        self.state.record_creator(
+            uid,
+            username=data['card']['name'],
+            followers_count=int(data['card']['fans']),
+            archive_count=data.get('archive_count'),
+        )
+
+    async def _worker(self, client, queue):
+        while True:
+            task = await queue.get()
+            try:
+                if task[0] == 'page':
+                    await self._fetch_page(client, queue, *task[1:])
+                else:
+                    await self._fetch_creator(client, task[1])
+            except (aiohttp.ClientError, asyncio.TimeoutError, BilibiliAPIError, KeyError) as e:
+                self.failed_tasks += 1
+                logger.warning(f"⚠️ 任务失败 {task}: {type(e).__name__}: {e}")
+            except Exception:
+                # 非JSON响应、data 为空、状态库错误等：记为失败任务，worker 继续运行，避免 queue.join() 永久等待
+                self.failed_tasks += 1
+                logger.exception(f"❌ 任务异常 {task}")
+            finally:
+                queue.task_done()
+
+    async def _crawl(self, categories):
+        queue = asyncio.Queue()
+
+        for tid, tname in categories:
+            total_pages = self.state.page_count(tid)
+            if total_pages is not None:
+                # 续爬：第1页已完成，只补齐缺失的页
+                self._enqueue_pages(queue, tid, tname, total_pages)
+            else:
+                queue.put_nowait(('page', tid, tname, 1))
+
+        pending_creators = self.state.pending_creators()
+        for uid in pending_creators:
+            queue.put_nowait(('creator', uid))
+
+        if queue.empty():
+            logger.info("♻️ 状态库中所有页与创作者均已抓取，无需请求")
+            return
+        logger.info(f"📋 待抓取: {queue.qsize() - len(pending_creators)} 个列表页, "
+                    f"{len(pending_creators)} 个已发现的创作者")
+
+        async with AsyncBilibiliClient(
+            base_url=self.api_base,
+            max_connections=self.workers,
+            max_concurrency=self.workers,
+            max_retries=self.max_retries,
+            rate_limits=self.rate_limits,
+            cache=self.cache,
+        ) as client:
+            workers = [asyncio.create_task(self._worker(client, queue)) for _ in range(self.workers)]
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            stats = client.stats
+
+        logger.info(f"🌐 接口请求 {stats['requests']} 次，重试 {stats['retries']} 次，失败任务 {self.failed_tasks} 个")
+
+    def crawl(self, categories):
+        """采集给定分区 [(tid, tname), ...] 的投稿与UP主"""
+        asyncio.run(self._crawl(categories))
+        return self.to_frames()
+
+    def to_frames(self, content_types=None, window_days=365):
+        """把采集结果整理成与模拟数据相同结构的 (creators_df, videos_df)"""
+        collected_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        content_types = content_types or {}
+
+        videos_df = self.state.load_videos()
+        videos_df['collected_at'] = collected_at
+        videos_df['source'] = 'B站接口'
+        videos_df = videos_df[VIDEO_COLUMNS]
+
+        # 最近投稿时间与近12个月投稿数由已采集的投稿推算
+        window_start = (datetime.now() - timedelta(days=window_days)).strftime('%Y-%m-%d')
+        recent = videos_df[videos_df['publish_date'] >= window_start]
+        last_video_date = videos_df.groupby('creator_uid')['publish_date'].max()
+        video_count_12m = recent.groupby('creator_uid').size()
+
+        creators_df = self.state.load_creators()
+        creators_df['last_video_date'] = creators_df['uid'].map(last_video_date)
+        creators_df['video_count_12m'] = creators_df['uid'].map(video_count_12m).fillna(0).astype(int)
+        creators_df['content_type'] = creators_df['category_tid'].map(content_types).fillna(creators_df['category_name'])
+        creators_df['collected_at'] = collected_at
+        creators_df['source'] = 'B站接口'
+        creators_df['data_quality'] = 'crawled'
+        creators_df = creators_df[CREATOR_COLUMNS]
+        return creators_df, videos_df
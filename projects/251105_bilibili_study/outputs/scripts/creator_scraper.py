@@ -4,37 +4,115 @@ Bilibili Creator Data Collection Script
 从第三方平台获取创作者数据样本
 """
 
-import pandas as pd
-import requests
-import json
-import time
-import random
-from datetime import datetime, timedelta
+import argparse
+from datetime import datetime
 import os
-from urllib.parse import quote, urljoin
 import logging
 
+from bilibili_http import DEFAULT_API_BASE
+from creator_crawler import CreatorCrawler
+from data_validator import (FAILED_CHECK_COLUMNS, DataValidator, save_validation, validation_summary,
+                            validation_verdict)
+from dataset_store import STORAGE_FORMATS
+from report_renderer import render_file, render_section, table_rows
+from snapshot_catalog import SNAPSHOT_FORMAT, SnapshotCatalog, save_snapshot, today
+from response_cache import ResponseCache
+from synthetic_data import SyntheticDataGenerator
+
 # 设置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 各分区的创作者特征（模拟数据参数，content_type 同时用于接口采集结果）
+CATEGORY_PROFILES = {
+    1: {"name_prefix": "动画", "avg_followers": 150000, "content_type": "动画创作"},
+    3: {"name_prefix": "音乐", "avg_followers": 180000, "content_type": "音乐制作"},
+    4: {"name_prefix": "游戏", "avg_followers": 220000, "content_type": "游戏实况"},
+    36: {"name_prefix": "知识", "avg_followers": 120000, "content_type": "知识科普"},
+    188: {"name_prefix": "科技", "avg_followers": 95000, "content_type": "科技评测"},
+    160: {"name_prefix": "生活", "avg_followers": 85000, "content_type": "生活记录"},
+    211: {"name_prefix": "美食", "avg_followers": 110000, "content_type": "美食制作"},
+    217: {"name_prefix": "动物", "avg_followers": 130000, "content_type": "萌宠分享"},
+    119: {"name_prefix": "鬼畜", "avg_followers": 160000, "content_type": "鬼畜创作"},
+    155: {"name_prefix": "时尚", "avg_followers": 90000, "content_type": "时尚穿搭"},
+    5: {"name_prefix": "娱乐", "avg_followers": 200000, "content_type": "娱乐解说"},
+    181: {"name_prefix": "影视", "avg_followers": 140000, "content_type": "影视解说"},
+}
+
 class BilibiliCreatorScraper:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
-
-        # 限制抓取频率
-        self.request_delay = 2  # 秒
-        self.creators_data = []
-        self.videos_data = []
+    def __init__(self, api_base=DEFAULT_API_BASE, simulate=False, crawl_workers=8, max_pages=20,
+                 state_file=None, cache=None, seed=None, scale=1.0, storage='csv', categories_df=None,
+                 snapshot=None, catalog=None, validator=None):
+        # 接口采集配置：限流由 CreatorCrawler 按接口的令牌桶控制
+        self.api_base = api_base
+        self.simulate = simulate
+        self.crawl_workers = crawl_workers
+        self.max_pages = max_pages
+        self.state_file = state_file
+        self.cache = cache
+        self.storage = storage
+        # 流水线中由上游阶段直接传入分区表，单独运行时从CSV读取
+        self.categories_df = categories_df
+        # 快照编号即采集日期
+        self.snapshot = snapshot or today()
+        self.catalog = catalog or SnapshotCatalog()
+        self.data_quality = None
+        # 采集结果进入分析前的数据校验
+        self.validator = validator or DataValidator()
+
+        # 模拟数据生成器（接口不可用或 --simulate 时使用）
+        self.generator = SyntheticDataGenerator(CATEGORY_PROFILES, seed=seed, scale=scale)
+
+    def load_primary_categories(self):
+        """读取一级分区"""
+        categories_df = self.categories_df
+        if categories_df is None:
+            # 优先使用同一快照的分区表，没有时使用最新的分区快照
+            snapshot = self.snapshot if self.snapshot in self.catalog.snapshots('categories') else None
+            categories_df = self.catalog.load('categories', snapshot)
+        return categories_df[categories_df['parent_tid'] == 0]
+
+    def reference_date(self):
+        """模拟数据的日期基准：今天的快照取当前时间，补生成历史快照时取快照当天，日期不会晚于快照"""
+        if self.snapshot == today():
+            return datetime.now()
+        return datetime.strptime(self.snapshot, SNAPSHOT_FORMAT)
+
+    def crawl_creators_and_videos(self):
+        """通过接口异步采集各一级分区的投稿与UP主"""
+        logger.info("🚀 从B站接口采集创作者与视频数据...")
+
+        primary_categories = self.load_primary_categories()
+        categories = list(zip(primary_categories['tid'], primary_categories['tname']))
+
+        crawler = CreatorCrawler(
+            api_base=self.api_base,
+            workers=self.crawl_workers,
+            max_pages=self.max_pages,
+            state_file=self.state_file,
+            cache=self.cache,
+        )
+        crawler.crawl(categories)
+        logger.info(f"📋 爬取进度:\n{crawler.state.progress().to_string(index=False)}")
+        content_types = {tid: profile['content_type'] for tid, profile in CATEGORY_PROFILES.items()}
+        creators_df, videos_df = crawler.to_frames(content_types=content_types)
+
+        logger.info(f"✅ 采集到 {len(creators_df)} 个创作者, {len(videos_df)} 个视频")
+        return creators_df, videos_df
+
+    def collect_creators_and_videos(self):
+        """优先接口采集，接口不可用时回退到模拟数据"""
+        if not self.simulate:
+            creators_df, videos_df = self.crawl_creators_and_videos()
+            if len(creators_df) > 0 and len(videos_df) > 0:
+                self.data_quality = 'crawled'
+                return creators_df, videos_df
+            logger.warning("⚠️ 接口未采集到数据，回退到模拟数据")
+
+        self.data_quality = 'simulated'
+        creators_df = self.get_sample_creators_data()
+        videos_df = self.get_sample_videos_data(creators_df)
+        return creators_df, videos_df
 
     def get_sample_creators_data(self):
         """
@@ -44,73 +122,16 @@ class BilibiliCreatorScraper:
         logger.info("🚀 生成模拟创作者数据样本...")
 
         # 读取分区数据
-        categories_df = pd.read_csv('../raw/categories_20251105.csv')
-        primary_categories = categories_df[categories_df['parent_tid'] == 0]
-
-        # 为每个主要分区生成样本数据
-        sample_creators = []
-
-        # 各分区的模拟创作者特征
-        category_profiles = {
-            1: {"name_prefix": "动画", "avg_followers": 150000, "content_type": "动画创作"},
-            3: {"name_prefix": "音乐", "avg_followers": 180000, "content_type": "音乐制作"},
-            4: {"name_prefix": "游戏", "avg_followers": 220000, "content_type": "游戏实况"},
-            36: {"name_prefix": "知识", "avg_followers": 120000, "content_type": "知识科普"},
-            188: {"name_prefix": "科技", "avg_followers": 95000, "content_type": "科技评测"},
-            160: {"name_prefix": "生活", "avg_followers": 85000, "content_type": "生活记录"},
-            211: {"name_prefix": "美食", "avg_followers": 110000, "content_type": "美食制作"},
-            217: {"name_prefix": "动物", "avg_followers": 130000, "content_type": "萌宠分享"},
-            119: {"name_prefix": "鬼畜", "avg_followers": 160000, "content_type": "鬼畜创作"},
-            155: {"name_prefix": "时尚", "avg_followers": 90000, "content_type": "时尚穿搭"},
-            5: {"name_prefix": "娱乐", "avg_followers": 200000, "content_type": "娱乐解说"},
-            181: {"name_prefix": "影视", "avg_followers": 140000, "content_type": "影视解说"},
-        }
-
-        creator_id = 100000
-        for _, category in primary_categories.iterrows():
-            tid = category['tid']
-            tname = category['tname']
-
-            if tid not in category_profiles:
-                continue
-
-            profile = category_profiles[tid]
-
-            # 为每个分区生成50-150个创作者
-            num_creators = random.randint(80, 150)
-
-            for i in range(num_creators):
-                creator_id += 1
-
-                # 生成粉丝数（对数正态分布）
-                base_followers = profile["avg_followers"]
-                followers = max(1000, int(random.lognormvariate(11.0, 1.2)))
-
-                # 生成最近投稿时间
-                days_ago = random.randint(1, 365)
-                last_video_date = datetime.now() - timedelta(days=days_ago)
+        primary_categories = self.load_primary_categories()
 
-                # 生成近12个月投稿数量
-                video_count_12m = random.randint(1, 200)
+        # 快照编号可能在构造后由流水线设置，生成时才确定日期基准
+        self.generator.now = self.reference_date()
 
-                creator = {
-                    'uid': creator_id,
-                    'username': f"{profile['name_prefix']}UP_{i+1:03d}",
-                    'followers_count': followers,
-                    'category_tid': tid,
-                    'category_name': tname,
-                    'last_video_date': last_video_date.strftime('%Y-%m-%d'),
-                    'video_count_12m': video_count_12m,
-                    'content_type': profile['content_type'],
-                    'collected_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'source': '模拟数据',
-                    'data_quality': 'simulated'
-                }
+        # 为每个主要分区生成 80-150 个创作者（乘以 scale）
+        creators_df = self.generator.generate_creators(primary_categories)
 
-                sample_creators.append(creator)
-
-        logger.info(f"✅ 生成了 {len(sample_creators)} 个创作者样本")
-        return pd.DataFrame(sample_creators)
+        logger.info(f"✅ 生成了 {len(creators_df)} 个创作者样本")
+        return creators_df
 
     def get_sample_videos_data(self, creators_df):
         """
@@ -118,62 +139,13 @@ class BilibiliCreatorScraper:
         """
         logger.info("🚀 生成模拟热门视频数据...")
 
-        sample_videos = []
-        video_id = 1000000
-
-        # 为每个分区生成热门视频样本
-        categories = creators_df['category_tid'].unique()
-
-        for tid in categories:
-            category_creators = creators_df[creators_df['category_tid'] == tid]
-            category_name = category_creators.iloc[0]['category_name']
-
-            # 每个分区生成30-50个热门视频
-            num_videos = random.randint(30, 50)
-
-            for i in range(num_videos):
-                video_id += 1
-
-                # 随机选择该分区的一个创作者
-                creator = category_creators.sample(1).iloc[0]
-
-                # 生成视频数据
-                play_count = random.randint(10000, 5000000)
-                like_count = int(play_count * random.uniform(0.02, 0.15))
-                coin_count = int(play_count * random.uniform(0.005, 0.03))
-                favorite_count = int(play_count * random.uniform(0.008, 0.025))
-                share_count = int(play_count * random.uniform(0.001, 0.008))
-
-                # 计算互动率
-                interaction_rate = (like_count + coin_count + favorite_count + share_count) / play_count
-
-                # 生成发布时间
-                days_ago = random.randint(1, 365)
-                publish_date = datetime.now() - timedelta(days=days_ago)
-
-                video = {
-                    'bv_id': f"BV{video_id}",
-                    'title': f"{category_name}热门视频_{i+1:02d}",
-                    'creator_uid': creator['uid'],
-                    'creator_name': creator['username'],
-                    'category_tid': tid,
-                    'category_name': category_name,
-                    'play_count': play_count,
-                    'like_count': like_count,
-                    'coin_count': coin_count,
-                    'favorite_count': favorite_count,
-                    'share_count': share_count,
-                    'interaction_rate': round(interaction_rate, 4),
-                    'publish_date': publish_date.strftime('%Y-%m-%d'),
-                    'collected_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'source': '模拟数据',
-                    'ranking_position': i + 1
-                }
-
-                sample_videos.append(video)
-
-        logger.info(f"✅ 生成了 {len(sample_videos)} 个热门视频样本")
-        return pd.DataFrame(sample_videos)
+        self.generator.now = self.reference_date()
+
+        # 每个分区生成 30-50 个热门视频（乘以 scale）
+        videos_df = self.generator.generate_videos(creators_df)
+
+        logger.info(f"✅ 生成了 {len(videos_df)} 个热门视频样本")
+        return videos_df
 
     def calculate_popularity_metrics(self, videos_df, creators_df):
         """
@@ -181,36 +153,26 @@ class BilibiliCreatorScraper:
         """
         logger.info("🚀 计算分区爱看程度指标...")
 
-        # 按分区汇总视频数据
-        category_metrics = []
-
-        for tid in videos_df['category_tid'].unique():
-            category_videos = videos_df[videos_df['category_tid'] == tid]
-            category_name = category_videos.iloc[0]['category_name']
-
-            # 计算各维度指标
-            avg_play_count = category_videos['play_count'].mean()
-            avg_interaction_rate = category_videos['interaction_rate'].mean()
-            total_videos = len(category_videos)
-
-            # 计算百分位数排名（相对于所有分区）
-            play_percentile = videos_df[videos_df['category_tid'] == tid]['play_count'].mean()
-            interaction_percentile = videos_df[videos_df['category_tid'] == tid]['interaction_rate'].mean()
+        # 按分区一次性汇总视频数据（sort=False 保持分区首次出现的顺序）
+        metrics_df = videos_df.groupby('category_tid', sort=False).agg(
+            play_score=('play_count', 'mean'),
+            interaction_score=('interaction_rate', 'mean'),
+            total_hot_videos=('play_count', 'size'),
+        ).reset_index()
 
-            metrics = {
-                'category_tid': tid,
-                'category_name': category_name,
-                'avg_play_count': int(avg_play_count),
-                'avg_interaction_rate': round(avg_interaction_rate, 4),
-                'total_hot_videos': total_videos,
-                'play_score': play_percentile,
-                'interaction_score': interaction_percentile,
-                'ranking_score': total_videos  # 热门视频数量作为上榜频次
-            }
+        # 分区名称取各分区首行（对字符串列做 groupby.first 比数值聚合慢一个数量级）
+        category_names = videos_df.drop_duplicates('category_tid').set_index('category_tid')['category_name']
+        metrics_df['category_name'] = metrics_df['category_tid'].map(category_names)
 
-            category_metrics.append(metrics)
+        # 计算各维度指标
+        metrics_df['avg_play_count'] = metrics_df['play_score'].astype('int64')
+        metrics_df['avg_interaction_rate'] = metrics_df['interaction_score'].round(4)
+        metrics_df['ranking_score'] = metrics_df['total_hot_videos']  # 热门视频数量作为上榜频次
 
-        metrics_df = pd.DataFrame(category_metrics)
+        metrics_df = metrics_df.reindex(columns=[
+            'category_tid', 'category_name', 'avg_play_count', 'avg_interaction_rate', 'total_hot_videos',
+            'play_score', 'interaction_score', 'ranking_score'
+        ])
 
         # 计算百分位排名
         metrics_df['play_percentile'] = metrics_df['play_score'].rank(pct=True)
@@ -235,19 +197,19 @@ class BilibiliCreatorScraper:
 
     def save_all_data(self, creators_df, videos_df, metrics_df, output_dir):
         """保存所有数据"""
-        timestamp = datetime.now().strftime("%Y%m%d")
+        timestamp = self.snapshot
 
         # 保存创作者数据
         creators_file = os.path.join(output_dir, f"creators_by_category_{timestamp}.csv")
-        creators_df.to_csv(creators_file, index=False, encoding='utf-8-sig')
+        save_snapshot(creators_df, creators_file, storage=self.storage)
 
         # 保存视频数据
         videos_file = os.path.join(output_dir, f"videos_by_category_{timestamp}.csv")
-        videos_df.to_csv(videos_file, index=False, encoding='utf-8-sig')
+        save_snapshot(videos_df, videos_file, storage=self.storage)
 
         # 保存指标数据
         metrics_file = os.path.join(output_dir, f"popularity_metrics_{timestamp}.csv")
-        metrics_df.to_csv(metrics_file, index=False, encoding='utf-8-sig')
+        save_snapshot(metrics_df, metrics_file, storage=self.storage)
 
         logger.info(f"💾 数据保存完成:")
         logger.info(f"   - 创作者数据: {creators_file}")
@@ -264,83 +226,111 @@ class BilibiliCreatorScraper:
         """运行完整的数据收集流程"""
         logger.info("🚀 开始Bilibili创作者数据收集...")
 
-        # 1. 生成创作者数据
-        creators_df = self.get_sample_creators_data()
+        # 1-2. 采集创作者与视频数据
+        creators_df, videos_df = self.collect_creators_and_videos()
 
-        # 2. 生成视频数据
-        videos_df = self.get_sample_videos_data(creators_df)
+        # 3. 数据校验（strict 时未通过即中止，不进入指标计算）
+        checks_df, flags_df = self.validator.validate(creators_df, videos_df)
 
-        # 3. 计算爱看程度指标
+        # 4. 计算爱看程度指标
         metrics_df = self.calculate_popularity_metrics(videos_df, creators_df)
 
-        # 4. 保存所有数据
+        # 5. 保存所有数据
         file_paths = self.save_all_data(creators_df, videos_df, metrics_df, output_dir)
+        file_paths['validation_file'] = save_validation(
+            checks_df, flags_df, os.path.join(output_dir, '..', 'clean'), self.snapshot, storage=self.storage)[0]
+
+        # 6. 生成数据质量报告
+        self.generate_quality_report(creators_df, videos_df, metrics_df, output_dir, checks_df)
 
-        # 5. 生成数据质量报告
-        self.generate_quality_report(creators_df, videos_df, metrics_df, output_dir)
+        if self.cache is not None:
+            logger.info(f"🗄️ {self.cache.summary()}")
 
         logger.info("✅ 数据收集流程完成!")
 
         return file_paths, metrics_df
 
-    def generate_quality_report(self, creators_df, videos_df, metrics_df, output_dir):
-        """生成数据质量报告"""
-        timestamp = datetime.now().strftime("%Y%m%d")
+    def generate_quality_report(self, creators_df, videos_df, metrics_df, output_dir, validation_df=None):
+        """生成数据质量报告；传入校验结果时附上数据校验一节"""
+        timestamp = self.snapshot
         report_file = os.path.join(output_dir, f"data_quality_report_{timestamp}.md")
 
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write("# Bilibili 数据收集质量报告\n\n")
-            f.write(f"**生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-
-            f.write("## 数据概览\n\n")
-            f.write(f"- **创作者总数**: {len(creators_df):,} 人\n")
-            f.write(f"- **覆盖分区数**: {creators_df['category_tid'].nunique()} 个\n")
-            f.write(f"- **热门视频数**: {len(videos_df):,} 个\n")
-            f.write(f"- **数据时间范围**: 近12个月\n\n")
-
-            f.write("## 分区分布\n\n")
-            f.write("| 分区 | 创作者数量 | 平均粉丝数 | 热门视频数 |\n")
-            f.write("|------|------------|------------|------------|\n")
-
-            for tid in sorted(creators_df['category_tid'].unique()):
-                category_creators = creators_df[creators_df['category_tid'] == tid]
-                category_videos = videos_df[videos_df['category_tid'] == tid]
-                category_name = category_creators.iloc[0]['category_name']
-
-                creator_count = len(category_creators)
-                avg_followers = int(category_creators['followers_count'].mean())
-                video_count = len(category_videos)
-
-                f.write(f"| {category_name} | {creator_count:,} | {avg_followers:,} | {video_count} |\n")
-
-            f.write("\n## Top5 热门分区\n\n")
-            top5 = metrics_df.head(5)
-            f.write("| 排名 | 分区 | 爱看指数 | 平均播放量 | 平均互动率 |\n")
-            f.write("|------|------|----------|------------|------------|\n")
-
-            for _, row in top5.iterrows():
-                f.write(f"| {row['rank']} | {row['category_name']} | {row['popularity_index']:.3f} | {row['avg_play_count']:,} | {row['avg_interaction_rate']:.2%} |\n")
-
-            f.write("\n## 数据质量说明\n\n")
-            f.write("⚠️ **重要说明**: 本次收集的数据为模拟数据，用于展示分析框架和方法。\n\n")
-            f.write("**实际项目中应包含的真实数据源**:\n")
-            f.write("- 飞瓜数据B站版的创作者榜单\n")
-            f.write("- 火烧云数据的行业分析\n")
-            f.write("- B站官方开放平台的部分统计数据\n")
-            f.write("- 第三方监测平台的热门视频榜单\n\n")
-
-            f.write("**数据收集建议**:\n")
-            f.write("1. 建立多数据源验证机制\n")
-            f.write("2. 设置合理的抓取频率避免反爬\n")
-            f.write("3. 保留原始数据的时间戳和来源标识\n")
-            f.write("4. 定期更新分区映射和创作者状态\n")
+        # 分区分布：一次分组聚合，按分区ID排序
+        distribution = creators_df.groupby('category_tid', sort=True).agg(
+            category_name=('category_name', 'first'),
+            creator_count=('followers_count', 'size'),
+            avg_followers=('followers_count', 'mean'),
+        )
+        distribution['avg_followers'] = distribution['avg_followers'].astype('int64')
+        distribution['video_count'] = videos_df['category_tid'].value_counts().reindex(distribution.index, fill_value=0)
+
+        if self.data_quality == 'crawled':
+            source_note = "ℹ️ **数据来源**: 本次数据通过B站公开接口采集，粉丝数为采集时点数据。"
+        else:
+            source_note = "⚠️ **重要说明**: 本次收集的数据为模拟数据，用于展示分析框架和方法。"
+
+        validation_section = ''
+        if validation_df is not None:
+            summary = validation_summary(validation_df)
+            failed_checks = validation_df[validation_df['failed'] > 0]
+            validation_section = render_section(
+                'data_validation',
+                check_count=summary['checks'],
+                verdict=validation_verdict(summary),
+                outlier_count=f"{summary['outliers']:,}",
+                snapshot=timestamp,
+                check_table=table_rows(failed_checks, FAILED_CHECK_COLUMNS) if len(failed_checks)
+                else "| - | 全部通过 | - | - | 0 | 0.00% | - |\n",
+            )
+
+        render_file(
+            report_file, 'data_quality',
+            generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            creator_count=f"{len(creators_df):,}",
+            category_count=creators_df['category_tid'].nunique(),
+            video_count=f"{len(videos_df):,}",
+            category_table=table_rows(distribution, [
+                ('category_name', '{}'), ('creator_count', '{:,}'), ('avg_followers', '{:,}'), ('video_count', '{}'),
+            ]),
+            top5_table=table_rows(metrics_df.head(5), [
+                ('rank', '{}'), ('category_name', '{}'), ('popularity_index', '{:.3f}'),
+                ('avg_play_count', '{:,}'), ('avg_interaction_rate', '{:.2%}'),
+            ]),
+            validation_section=validation_section,
+            source_note=source_note,
+        )
 
         logger.info(f"📊 数据质量报告已生成: {report_file}")
 
 if __name__ == "__main__":
-    scraper = BilibiliCreatorScraper()
+    parser = argparse.ArgumentParser(description="收集B站创作者与视频数据")
+    parser.add_argument("--api-base", default=DEFAULT_API_BASE, help="接口地址 (可指向本地mock服务)")
+    parser.add_argument("--simulate", action="store_true", help="不请求接口，生成模拟数据")
+    parser.add_argument("--workers", type=int, default=8, help="并发worker数量")
+    parser.add_argument("--max-pages", type=int, default=20, help="每个分区最多采集的列表页数")
+    parser.add_argument("--seed", type=int, default=None, help="模拟数据的随机种子")
+    parser.add_argument("--scale", type=float, default=1.0, help="模拟数据规模倍数")
+    parser.add_argument("--storage", choices=STORAGE_FORMATS, default="csv", help="parquet: 额外写出列式存储文件")
+    parser.add_argument("--strict-validation", action="store_true", help="数据校验存在错误级问题时中止")
+    parser.add_argument("--state-file", default=None,
+                        help="爬取状态库（默认 ../raw/.crawl_state_<今天>.sqlite）；跨天续爬时指定中断时的状态库")
+    args = parser.parse_args()
+
     output_dir = "../raw"
     os.makedirs(output_dir, exist_ok=True)
+    scraper = BilibiliCreatorScraper(
+        api_base=args.api_base,
+        simulate=args.simulate,
+        crawl_workers=args.workers,
+        max_pages=args.max_pages,
+        # 使用同一状态库重复运行会续爬，已抓取的页与创作者不再请求
+        state_file=args.state_file or os.path.join(output_dir, f".crawl_state_{today()}.sqlite"),
+        cache=ResponseCache(),
+        seed=args.seed,
+        scale=args.scale,
+        storage=args.storage,
+        validator=DataValidator(strict=args.strict_validation),
+    )
 
     file_paths, metrics_df = scraper.run(output_dir)
 
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Memoized Dataset Loader
+各分析脚本共用的数据读取层：同一进程内每个数据文件只解析一次（按需补读缺少的列），
+可选的磁盘缓存把解析并转换类型后的 DataFrame 以 pickle 保存，源文件修改时间或大小变化即失效
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+
+import pandas as pd
+
+from dataset_store import dataset_name, load_dataset, parquet_path
+from schemas import SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_CACHE_DIR = os.path.join('..', '.cache', 'datasets')
+
+# 磁盘缓存格式版本：转换逻辑变化时递增，旧缓存自动失效
+CACHE_VERSION = 1
+
+
+def file_signature(csv_file):
+    """CSV 与同名 Parquet 的 (修改时间, 大小)；任一文件变化都会得到新签名"""
+    signature = []
+    for path in (csv_file, parquet_path(csv_file)):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature.append((os.path.basename(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class DatasetLoader:
+    def __init__(self, cache_dir=None):
+        """cache_dir 为 None 时只在进程内缓存"""
+        self.cache_dir = cache_dir
+        # 绝对路径 -> {'signature', 'frame', 'complete'}；frame 只含已读取过的列
+        self._memo = {}
+        self.stats = {'memory': 0, 'disk': 0, 'parsed': 0}
+
+    def _cache_file(self, path, signature):
+        name = dataset_name(path)
+        key = json.dumps([CACHE_VERSION, path, signature, SCHEMAS.get(name)], sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.cache_dir, f'{stem}-{digest}.pkl')
+
+    def _read_disk(self, path, signature):
+        cache_file = self._cache_file(path, signature)
+        if not os.path.exists(cache_file):
+            return None
+        try:
+            with open(cache_file, 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"⚠️ 数据缓存损坏，重新解析: {cache_file} ({e})")
+            return None
+        logger.debug(f"♻️ 磁盘缓存: {os.path.basename(path)}")
+        return entry
+
+    def _write_disk(self, path, entry):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_file = self._cache_file(path, entry['signature'])
+        # 同一数据文件只保留当前签名的缓存
+        prefix = os.path.splitext(os.path.basename(path))[0] + '-'
+        for filename in os.listdir(self.cache_dir):
+            if filename.startswith(prefix) and os.path.join(self.cache_dir, filename) != cache_file:
+                os.remove(os.path.join(self.cache_dir, filename))
+        tmp_file = cache_file + '.tmp'
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+
+    def load(self, csv_file, columns=None):
+        """
+        与 dataset_store.load_dataset 相同的结果；文件未变化时直接返回已解析的列（新的 DataFrame 对象，
+        写时复制，调用方修改不会影响缓存），缺少的列才补读
+        """
+        path = os.path.abspath(csv_file)
+        signature = file_signature(path)
+        entry = self._memo.get(path)
+        source = 'memory'
+        if entry is None or entry['signature'] != signature:
+            entry = self._read_disk(path, signature) if self.cache_dir else None
+            source = 'disk'
+            if entry is None:
+                entry = {'signature': signature, 'frame': None, 'complete': False}
+            self._memo[path] = entry
+
+        frame = entry['frame']
+        if columns is None:
+            missing = None if not entry['complete'] else []
+        else:
+            missing = [] if entry['complete'] else [c for c in columns if frame is None or c not in frame.columns]
+
+        if missing == [] and frame is not None:
+            self.stats[source] += 1
+            return frame[list(columns)] if columns is not None else frame[list(frame.columns)]
+
+        # 未读取过的列：全部列时重新整表解析，否则只补读缺少的列后按列拼接（行顺序相同）
+        self.stats['parsed'] += 1
+        loaded = load_dataset(path, columns=missing)
+        if missing is None:
+            entry.update(frame=loaded, complete=True)
+        else:
+            entry['frame'] = loaded if frame is None else pd.concat([frame, loaded], axis=1)
+        if self.cache_dir:
+            self._write_disk(path, entry)
+
+        frame = entry['frame']
+        return frame[list(columns)] if columns is not None else frame[list(frame.columns)]
+
+    def clear(self):
+        self._memo.clear()
+
+    def summary(self):
+        return (f"数据集读取: 进程内复用 {self.stats['memory']} 次，磁盘缓存 {self.stats['disk']} 次，"
+                f"解析文件 {self.stats['parsed']} 次")
+
+
+# 同一进程内各脚本共用的读取器（SnapshotCatalog 默认使用）
+_default_loader = DatasetLoader()
+
+
+def default_loader():
+    return _default_loader
+
+
+def enable_disk_cache(cache_dir=DEFAULT_DATA_CACHE_DIR):
+    """为共用读取器开启磁盘缓存"""
+    _default_loader.cache_dir = cache_dir
+    return _default_loader
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Data Validator
+采集与分析之间的数据校验：对创作者与视频数据逐列做向量化检查（结构、缺失值、主键重复、不可能的比例、
+互动率一致性、日期范围、分区内对数正态离群值）。结果为 data_validation（每项检查一行）与
+validation_flags（未通过检查的行）两个数据集，写入快照供报告读取
+"""
+
+import argparse
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_store import STORAGE_FORMATS
+from schemas import CREATOR_COLUMNS, DATE_FORMATS, KEY_COLUMNS, SCHEMAS, VIDEO_COLUMNS
+from snapshot_catalog import SnapshotCatalog, save_snapshot
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_LABELS = {'error': '❌ 错误', 'warning': '⚠️ 警告', 'info': 'ℹ️ 提示'}
+
+REQUIRED_COLUMNS = {
+    'creators_by_category': CREATOR_COLUMNS,
+    'videos_by_category': VIDEO_COLUMNS,
+}
+
+# 缺失即为错误的列，其余列缺失记为警告
+NOT_NULL_COLUMNS = {
+    'creators_by_category': ['uid', 'followers_count', 'category_tid', 'last_video_date', 'video_count_12m'],
+    'videos_by_category': ['bv_id', 'creator_uid', 'category_tid', 'play_count', 'like_count', 'coin_count',
+                           'favorite_count', 'share_count', 'interaction_rate', 'publish_date'],
+}
+
+# 不能为负的计数列
+COUNT_COLUMNS = {
+    'creators_by_category': ['followers_count', 'video_count_12m'],
+    'videos_by_category': ['play_count', 'like_count', 'coin_count', 'favorite_count', 'share_count',
+                           'interaction_rate'],
+}
+
+# 不可能超过播放量的互动数；互动率 = 四项互动数之和 / 播放量（保留4位小数）
+PLAY_BOUNDED_COLUMNS = ['like_count', 'coin_count', 'favorite_count']
+INTERACTION_COLUMNS = ['like_count', 'coin_count', 'favorite_count', 'share_count']
+INTERACTION_TOLERANCE = 1e-4
+
+# 日期列不早于B站上线日期、不晚于采集时间
+DATE_COLUMNS = {
+    'creators_by_category': ['last_video_date'],
+    'videos_by_category': ['publish_date'],
+}
+MIN_DATE = pd.Timestamp('2009-06-26')
+ACTIVITY_WINDOW_DAYS = 365
+
+# 分区内按对数正态检测离群值：log1p 后的修正Z分数 0.6745 × (x - 中位数) / MAD
+OUTLIER_COLUMNS = {
+    'creators_by_category': ['followers_count'],
+    'videos_by_category': ['play_count'],
+}
+OUTLIER_THRESHOLD = 3.5
+
+VALIDATION_COLUMNS = ['dataset', 'check', 'column', 'severity', 'failed', 'total', 'failed_pct', 'sample']
+FLAG_COLUMNS = ['dataset', 'key', 'check', 'column']
+SAMPLE_SIZE = 5
+
+# 报告中未通过检查的表格列（templates/data_validation.md 中的表头同序）
+FAILED_CHECK_COLUMNS = [
+    ('dataset', '{}'), ('check', '{}'), ('column', '{}'),
+    ('severity', lambda values: values.astype(str).map(SEVERITY_LABELS)),
+    ('failed', '{:,}'), ('failed_pct', '{:.2%}'), ('sample', '{}'),
+]
+
+
+def _mask(values):
+    """比较结果转为布尔数组，缺失值视为通过（缺失由 not_null 检查报告）"""
+    if isinstance(values, pd.Series):
+        return values.fillna(False).to_numpy(dtype=bool)
+    return np.asarray(values, dtype=bool)
+
+
+def coerce_types(df, dataset):
+    """
+    校验用的类型转换（不同于 apply_schema，坏数据不抛异常）：日期与数值列逐值转换，
+    无法转换、非整数或超出 SCHEMAS 整数类型范围的值置为缺失。返回 (转换后的 df, {列: 无法转换的行掩码})
+    """
+    schema = SCHEMAS[dataset]
+    numeric = [column for column, dtype in schema.items() if dtype.startswith('int')] + COUNT_COLUMNS[dataset]
+    df = df.copy()
+    invalid = {}
+    for column in df.columns:
+        dtype = schema.get(column, '')
+        values = df[column]
+        if dtype in DATE_FORMATS:
+            if pd.api.types.is_datetime64_any_dtype(values):
+                continue
+            converted = pd.to_datetime(values, format=DATE_FORMATS[dtype], errors='coerce')
+        elif column in numeric:
+            converted = pd.to_numeric(values, errors='coerce')
+            if dtype.startswith('int'):
+                info = np.iinfo(dtype)
+                valid = converted.mod(1).eq(0) & converted.between(info.min, info.max)
+                converted = converted.where(valid).astype(dtype.capitalize())
+            elif not pd.api.types.is_numeric_dtype(values):
+                converted = converted.astype(float)
+        else:
+            continue
+        invalid[column] = (values.notna() & converted.isna()).to_numpy()
+        df[column] = converted
+    return df, invalid
+
+
+def robust_zscores(values, groups):
+    """组内修正Z分数（中位数/MAD）；MAD 为 0 的组返回 0，负值（由 non_negative 报告）不参与"""
+    values = np.asarray(values, dtype=float)
+    values = pd.Series(np.log1p(np.where(values >= 0, values, np.nan)))
+    groups = np.asarray(groups)
+    deviation = values - values.groupby(groups).transform('median')
+    mad = deviation.abs().groupby(groups).transform('median').to_numpy()
+    deviation = deviation.to_numpy()
+    return np.divide(0.6745 * deviation, mad, out=np.zeros(len(deviation)), where=mad > 0)
+
+
+class DataValidator:
+    def __init__(self, outlier_threshold=OUTLIER_THRESHOLD, strict=False):
+        """strict 时存在未通过的错误级检查即抛出 ValueError，阻止进入分析阶段"""
+        self.outlier_threshold = outlier_threshold
+        self.strict = strict
+
+    @staticmethod
+    def _record(results, flags, dataset, keys, check, column, severity, mask, flag_rows=True):
+        """把一项检查的布尔掩码汇总为一行结果；未通过的行（主键）记入 flags"""
+        failed = int(mask.sum())
+        sample = None
+        if failed:
+            failed_keys = keys[mask]
+            sample = ';'.join(str(key) for key in failed_keys[:SAMPLE_SIZE].tolist())
+            if flag_rows:
+                flags.append(pd.DataFrame({'dataset': dataset, 'key': failed_keys.astype(str),
+                                           'check': check, 'column': column}))
+        results.append({'dataset': dataset, 'check': check, 'column': column, 'severity': severity,
+                        'failed': failed, 'total': len(mask), 'sample': sample})
+
+    def check_frame(self, df, dataset, results, flags, creator_uids=None, invalid=None):
+        """对一个数据集执行全部检查，结果追加到 results / flags；invalid 为 coerce_types 返回的无法转换掩码"""
+        invalid = invalid or {}
+        total = len(df)
+        key = KEY_COLUMNS[dataset]
+        keys = df[key].to_numpy() if key in df.columns else np.arange(total)
+
+        def record(check, column, severity, mask, flag_rows=True):
+            self._record(results, flags, dataset, keys, check, column, severity, mask, flag_rows)
+
+        # 结构：缺列时整列不可用（不逐行标记）；类型无法转换的值逐行标记，并在 not_null 中计为缺失
+        for column in REQUIRED_COLUMNS[dataset]:
+            if column in df.columns:
+                record('schema', column, 'error', invalid.get(column, np.zeros(total, dtype=bool)))
+            else:
+                record('schema', column, 'error', np.ones(total, dtype=bool), flag_rows=False)
+        present = [column for column in REQUIRED_COLUMNS[dataset] if column in df.columns]
+
+        # 缺失值（日期无法解析也计为缺失）
+        missing = df[present].isna().to_numpy()
+        not_null = NOT_NULL_COLUMNS[dataset]
+        for i, column in enumerate(present):
+            record('not_null', column, 'error' if column in not_null else 'warning', missing[:, i])
+
+        if key in df.columns:
+            record('unique_key', key, 'error', df[key].duplicated().to_numpy())
+
+        for column in COUNT_COLUMNS[dataset]:
+            if column in df.columns:
+                record('non_negative', column, 'error', _mask(df[column].lt(0)))
+
+        if dataset == 'videos_by_category':
+            self._check_interactions(df, record)
+            if creator_uids is not None and 'creator_uid' in df.columns:
+                record('known_creator', 'creator_uid', 'warning', ~df['creator_uid'].isin(creator_uids).to_numpy())
+
+        self._check_dates(df, dataset, record)
+
+        if 'category_tid' in df.columns:
+            for column in OUTLIER_COLUMNS[dataset]:
+                if column in df.columns:
+                    zscores = robust_zscores(df[column].to_numpy(dtype=float, na_value=np.nan),
+                                             df['category_tid'].to_numpy())
+                    record('lognormal_outlier', column, 'info', np.abs(zscores) > self.outlier_threshold)
+
+    @staticmethod
+    def _check_interactions(df, record):
+        if 'play_count' not in df.columns:
+            return
+        play = df['play_count'].to_numpy(dtype=float, na_value=np.nan)
+        for column in PLAY_BOUNDED_COLUMNS:
+            if column in df.columns:
+                record('play_bound', column, 'error', df[column].to_numpy(dtype=float, na_value=np.nan) > play)
+
+        if 'interaction_rate' in df.columns and all(column in df.columns for column in INTERACTION_COLUMNS):
+            interactions = df[INTERACTION_COLUMNS].to_numpy(dtype=float, na_value=np.nan).sum(axis=1)
+            # 播放量为0时采集端记录互动率为0；播放量缺失的行由 not_null 报告
+            expected = np.divide(interactions, play, out=np.zeros(len(play)), where=play > 0)
+            rate = df['interaction_rate'].to_numpy(dtype=float, na_value=np.nan)
+            inconsistent = (np.abs(rate - expected) > INTERACTION_TOLERANCE) & ~np.isnan(play)
+            record('interaction_rate', 'interaction_rate', 'warning', inconsistent)
+
+    @staticmethod
+    def _check_dates(df, dataset, record):
+        # 采集时间缺失的行以当前时间为上限
+        if 'collected_at' in df.columns and pd.api.types.is_datetime64_any_dtype(df['collected_at']):
+            reference = df['collected_at'].dt.normalize().fillna(pd.Timestamp.now().normalize())
+        else:
+            reference = pd.Series(pd.Timestamp.now().normalize(), index=df.index)
+
+        for column in DATE_COLUMNS[dataset]:
+            if column not in df.columns or not pd.api.types.is_datetime64_any_dtype(df[column]):
+                continue
+            dates = df[column]
+            record('date_range', column, 'error', _mask(dates.lt(MIN_DATE) | dates.gt(reference)))
+
+            # 近12个月有投稿，最近投稿日期却在窗口之外
+            if column == 'last_video_date' and 'video_count_12m' in df.columns:
+                stale = dates.lt(reference - pd.Timedelta(days=ACTIVITY_WINDOW_DAYS))
+                record('activity_window', column, 'warning', _mask(stale & df['video_count_12m'].gt(0)))
+
+    def validate(self, creators_df, videos_df):
+        """返回 (checks_df, flags_df)：每项检查一行的结果表，以及未通过检查的行"""
+        start = time.perf_counter()
+        results, flags = [], []
+        creators_df, creator_invalid = coerce_types(creators_df, 'creators_by_category')
+        videos_df, video_invalid = coerce_types(videos_df, 'videos_by_category')
+
+        self.check_frame(creators_df, 'creators_by_category', results, flags, invalid=creator_invalid)
+        creator_uids = creators_df['uid'].dropna().to_numpy() if 'uid' in creators_df.columns else None
+        self.check_frame(videos_df, 'videos_by_category', results, flags, creator_uids=creator_uids,
+                         invalid=video_invalid)
+
+        checks_df = pd.DataFrame(results)
+        checks_df['failed_pct'] = (checks_df['failed'] / checks_df['total'].where(checks_df['total'] > 0)).fillna(0.0)
+        checks_df = checks_df[VALIDATION_COLUMNS]
+        flags_df = pd.concat(flags, ignore_index=True) if flags else pd.DataFrame(columns=FLAG_COLUMNS)
+
+        summary = validation_summary(checks_df)
+        logger.info(f"🔎 数据校验完成 ({time.perf_counter() - start:.2f}s): {len(checks_df)} 项检查，"
+                    f"错误 {summary['errors']} 项，警告 {summary['warnings']} 项，离群值 {summary['outliers']:,} 行")
+        failed_errors = checks_df[(checks_df['severity'] == 'error') & (checks_df['failed'] > 0)]
+        for row in failed_errors.itertuples():
+            logger.warning(f"⚠️ {row.dataset}.{row.column} 未通过 {row.check}: {row.failed:,} 行 (如 {row.sample})")
+        if self.strict and len(failed_errors):
+            raise ValueError(f"数据校验未通过: {len(failed_errors)} 项错误级检查失败")
+
+        return checks_df, flags_df
+
+
+def validation_summary(checks_df):
+    """报告用的汇总：未通过的错误/警告检查项数、离群值行数"""
+    failed = checks_df[checks_df['failed'] > 0]
+    return {
+        'checks': len(checks_df),
+        'errors': int((failed['severity'] == 'error').sum()),
+        'warnings': int((failed['severity'] == 'warning').sum()),
+        'outliers': int(failed.loc[failed['check'] == 'lognormal_outlier', 'failed'].sum()),
+        'passed': not (failed['severity'] == 'error').any(),
+    }
+
+
+def validation_verdict(summary):
+    if summary['errors']:
+        return f"❌ {summary['errors']} 项错误级检查未通过，相关指标需复核"
+    if summary['warnings']:
+        return f"⚠️ 无错误，{summary['warnings']} 项警告"
+    return "✅ 全部通过"
+
+
+def outlier_counts(checks_df):
+    """各数据集的离群值行数"""
+    outliers = checks_df[checks_df['check'] == 'lognormal_outlier']
+    return outliers.groupby('dataset', observed=True)['failed'].sum().to_dict()
+
+
+def save_validation(checks_df, flags_df, clean_dir, snapshot, storage='csv'):
+    """写出 data_validation / validation_flags 快照，返回写出的文件列表"""
+    os.makedirs(clean_dir, exist_ok=True)
+    written = []
+    for df, name in ((checks_df, 'data_validation'), (flags_df, 'validation_flags')):
+        written += save_snapshot(df, os.path.join(clean_dir, f'{name}_{snapshot}.csv'), storage=storage)
+    return written
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="校验创作者与视频数据")
+    parser.add_argument("--snapshot", default=None, help="快照编号 YYYYMMDD（默认最新）")
+    parser.add_argument("--storage", choices=STORAGE_FORMATS, default="csv", help="parquet: 额外写出列式存储文件")
+    parser.add_argument("--outlier-threshold", type=float, default=OUTLIER_THRESHOLD, help="离群值的修正Z分数阈值")
+    parser.add_argument("--strict", action="store_true", help="存在错误级问题时以非零状态退出")
+    args = parser.parse_args()
+
+    catalog = SnapshotCatalog()
+    snapshot = catalog.resolve(args.snapshot, 'creators_by_category')
+    validator = DataValidator(outlier_threshold=args.outlier_threshold, strict=args.strict)
+    checks_df, flags_df = validator.validate(catalog.load('creators_by_category', snapshot),
+                                             catalog.load('videos_by_category', snapshot))
+    files = save_validation(checks_df, flags_df, os.path.join(catalog.data_dir, 'clean'), snapshot, args.storage)
+
+    summary = validation_summary(checks_df)
+    print(f"\n{'✅' if summary['passed'] else '❌'} 快照 {snapshot} 数据校验: {summary['checks']} 项检查，"
+          f"错误 {summary['errors']} 项，警告 {summary['warnings']} 项，离群值 {summary['outliers']:,} 行")
+    print(f"📄 校验结果: {files[0]}")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Columnar Dataset Store
+raw/ 与 clean/ 数据集的统一读写：可选 Parquet 列式存储（类型化schema、压缩、按列读取），CSV 始终保留供人工查看
+"""
+
+import os
+import re
+import logging
+
+import pandas as pd
+
+from schemas import apply_schema, csv_dtypes
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 为可选依赖，缺失时只读写CSV
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+STORAGE_FORMATS = ('csv', 'parquet')
+
+
+def dataset_name(csv_file):
+    """由文件名得到数据集名：creators_by_category_20251105.csv -> creators_by_category"""
+    stem = os.path.splitext(os.path.basename(csv_file))[0]
+    return re.sub(r'_\d{8}$', '', stem)
+
+
+def parquet_path(csv_file):
+    return os.path.splitext(csv_file)[0] + '.parquet'
+
+
+def save_dataset(df, csv_file, storage='csv', compression='zstd'):
+    """写出CSV；storage='parquet' 时另写同名的 .parquet 文件。返回实际写出的文件列表"""
+    df.to_csv(csv_file, index=False, encoding='utf-8-sig')
+    written = [csv_file]
+
+    if storage == 'parquet':
+        if pq is None:
+            logger.warning("⚠️ 未安装 pyarrow，仅保存CSV")
+            return written
+        # 列类型取自 schemas：category 列存为字典编码，日期列存为时间戳
+        table = pa.Table.from_pandas(apply_schema(df, dataset_name(csv_file)), preserve_index=False)
+        pq.write_table(table, parquet_path(csv_file), compression=compression)
+        written.append(parquet_path(csv_file))
+
+    return written
+
+
+def load_dataset(csv_file, columns=None):
+    """
+    读取数据集并按 schemas 转换列类型，columns 指定只读取的列。
+    同名 .parquet 存在且不早于CSV时读取Parquet（只解码所需的列），否则回退到CSV
+    """
+    name = dataset_name(csv_file)
+    parquet_file = parquet_path(csv_file)
+    if (pq is not None and os.path.exists(parquet_file)
+            and (not os.path.exists(csv_file) or os.path.getmtime(parquet_file) >= os.path.getmtime(csv_file))):
+        return apply_schema(pq.read_table(parquet_file, columns=columns).to_pandas(), name)
+
+    df = pd.read_csv(csv_file, usecols=columns, dtype=csv_dtypes(name, columns))
+    if columns is not None:
+        df = df[columns]
+    return apply_schema(df, name)
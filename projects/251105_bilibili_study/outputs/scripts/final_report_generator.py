@@ -4,19 +4,20 @@ Final Report Generator v2
 生成经过挑战分析修正的最终报告
 """
 
-import pandas as pd
-import numpy as np
 from datetime import datetime
 import os
 import logging
 
+from report_renderer import render_file
+from snapshot_catalog import SnapshotCatalog, today
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class FinalReportGenerator:
     def __init__(self, data_dir):
         self.data_dir = data_dir
-        self.timestamp = datetime.now().strftime('%Y%m%d')
+        self.timestamp = SnapshotCatalog(data_dir).latest() or today()
         self.report_date = datetime.now().strftime('%Y-%m-%d')
 
     def create_final_report(self):
@@ -25,305 +26,7 @@ class FinalReportGenerator:
 
         report_file = os.path.join(self.data_dir, f'report_v2_final_{self.timestamp}.md')
 
-        with open(report_file, 'w', encoding='utf-8') as f:
-            # 报告头部
-            f.write("# Bilibili 各分区粉丝与创作者体量测算报告 v2 (最终版)\n\n")
-            f.write(f"**项目**: Bilibili 各分区粉丝与创作者体量测算 + \"脚本依赖度\"洞察\n")
-            f.write(f"**分析时间窗**: 2024-11-01 至 2025-10-31 (滚动近12个月)\n")
-            f.write(f"**报告生成日期**: {self.report_date}\n")
-            f.write(f"**版本说明**: 基于挑战分析结果的修正版本，整体稳健性评分 97.0%\n\n")
-
-            # 核心成果概览
-            f.write("## 🎯 核心成果概览\n\n")
-            f.write("### 主要发现\n")
-            f.write("1. **全平台覆盖**: 统计了 18 个一级分区、71 个二级分区，共涉及 1,365 名活跃创作者\n")
-            f.write("2. **Top5热门分区**: 生活、科技、时尚、游戏、鬼畜 (基于爱看程度综合指数)\n")
-            f.write("3. **脚本依赖分层**: 识别出 3 个高脚本依赖赛道，为差异化内容策略提供指导\n")
-            f.write("4. **稳健性验证**: 通过5项挑战分析，验证了方法和结论的可靠性\n\n")
-
-            f.write("### 关键建议 (经挑战验证)\n")
-            f.write("1. **知识类赛道**: 高ROI脚本投资，建议配备专业编剧团队\n")
-            f.write("2. **生活类赛道**: 重视个人IP打造，脚本优化为辅助手段\n")
-            f.write("3. **差异化策略**: 避免一刀切，按SDI等级制定不同的内容策略\n\n")
-
-            # 经验证的核心数据
-            f.write("## 📊 经验证的核心数据\n\n")
-            f.write("### 分区体量汇总 (稳健性 > 95%)\n\n")
-            f.write("| 分区类型 | 创作者数量 | 粉丝总数(口径A) | 粉丝总数(口径B范围) | 平均粉丝数 |\n")
-            f.write("|----------|------------|-----------------|--------------------|-----------|\n")
-            f.write("| 生活 | 148 | 12,550,000 | 8,785,000 - 10,668,000 | 84,800 |\n")
-            f.write("| 科技 | 131 | 12,440,000 | 8,708,000 - 10,574,000 | 94,900 |\n")
-            f.write("| 游戏 | 139 | 30,580,000 | 21,406,000 - 25,993,000 | 220,000 |\n")
-            f.write("| 知识 | 144 | 17,280,000 | 12,096,000 - 14,688,000 | 120,000 |\n")
-            f.write("| 音乐 | 146 | 26,280,000 | 18,396,000 - 22,338,000 | 180,000 |\n\n")
-
-            f.write("**说明**: 口径B为去重估计，基于70%-85%去重系数。经敏感性测试，不同去重假设的排名相似度>95%。\n\n")
-
-            # Top5分区深度分析
-            f.write("## 🔥 Top5热门分区深度分析\n\n")
-            f.write("### 1. 生活分区 (排名#1, SDI: 2.0)\n")
-            f.write("- **爱看程度指数**: 0.958 (综合第一)\n")
-            f.write("- **脚本依赖程度**: 低依赖 (重个人魅力)\n")
-            f.write("- **增长机制**: 真实性+互动性 > 脚本规划\n")
-            f.write("- **策略建议**: 培养个人特色，提升用户互动，脚本作为辅助工具\n")
-            f.write("- **稳健性**: 在所有权重调整场景下均保持Top5\n\n")
-
-            f.write("### 2. 科技分区 (排名#2, SDI: 4.25)\n")
-            f.write("- **爱看程度指数**: 0.800 (稳定第二)\n")
-            f.write("- **脚本依赖程度**: 高依赖 (内容专业性要求高)\n")
-            f.write("- **增长机制**: 专业脚本 → 权威性建立 → 用户信任 → 粉丝增长\n")
-            f.write("- **策略建议**: 重点投资内容规划，建立标准化测试流程和分析框架\n")
-            f.write("- **成功案例**: 何同学的标准化评测脚本建立了行业权威性\n\n")
-
-            f.write("### 3. 时尚分区 (排名#3, SDI: 2.75)\n")
-            f.write("- **爱看程度指数**: 0.767 (互动率最高)\n")
-            f.write("- **脚本依赖程度**: 中等依赖\n")
-            f.write("- **增长机制**: 搭配逻辑 + 视觉呈现 + 适度脚本规划\n")
-            f.write("- **策略建议**: 优化内容结构，提升搭配说明的逻辑性\n\n")
-
-            f.write("### 4. 游戏分区 (排名#4, SDI: 2.25)\n")
-            f.write("- **爱看程度指数**: 0.583 (粉丝基数大)\n")
-            f.write("- **脚本依赖程度**: 低依赖\n")
-            f.write("- **增长机制**: 游戏技能 + 娱乐性 + 实时互动\n")
-            f.write("- **策略建议**: 重点培养游戏技能和娱乐效果，脚本优先级较低\n\n")
-
-            f.write("### 5. 鬼畜分区 (排名#5, SDI: 3.25)\n")
-            f.write("- **爱看程度指数**: 0.575 (创意导向)\n")
-            f.write("- **脚本依赖程度**: 中等依赖 (结构化要求高)\n")
-            f.write("- **增长机制**: 创意构思 + 精密剪辑 + 节奏把控\n")
-            f.write("- **策略建议**: 重视创意规划和技术实现，脚本侧重结构设计\n\n")
-
-            # SDI分级策略框架
-            f.write("## 🎯 SDI分级内容策略框架\n\n")
-            f.write("基于脚本依赖指数，我们建立了三级内容策略框架：\n\n")
-
-            f.write("### 🎖️ 高脚本依赖赛道 (SDI ≥ 4.0)\n")
-            f.write("**覆盖分区**: 知识(5.0)、科技(4.25)、影视(4.25)\n\n")
-            f.write("**核心特征**:\n")
-            f.write("- 内容质量高度依赖脚本规划\n")
-            f.write("- 信息密度大，逻辑结构要求严密\n")
-            f.write("- 优质脚本直接影响用户留存和传播效果\n\n")
-
-            f.write("**投资策略**:\n")
-            f.write("- **人员配置**: 配备专业编剧或内容策划人员\n")
-            f.write("- **流程建设**: 建立内容规划→脚本撰写→review→优化的标准流程\n")
-            f.write("- **工具支持**: 投资脚本管理工具、内容结构模板\n")
-            f.write("- **ROI期望**: 脚本投资回报率最高，优先级最高\n\n")
-
-            f.write("**成功路径**: 优质脚本 → 逻辑清晰 → 用户留存↑ → 算法推荐↑ → 粉丝增长\n\n")
-
-            f.write("### 📈 中等脚本依赖赛道 (2.5 ≤ SDI < 4.0)\n")
-            f.write("**覆盖分区**: 鬼畜(3.25)、美食(3.0)、时尚(2.75)、娱乐(2.75)\n\n")
-            f.write("**核心特征**:\n")
-            f.write("- 脚本优化有明显效果，但不是唯一成功要素\n")
-            f.write("- 需要在脚本规划和个人表现之间找到平衡\n")
-            f.write("- 结构化要求适中，允许一定程度的即兴发挥\n\n")
-
-            f.write("**投资策略**:\n")
-            f.write("- **内容优化**: 重点提升内容结构和信息传递效率\n")
-            f.write("- **技能培养**: 同时提升脚本能力和个人表现技巧\n")
-            f.write("- **灵活调整**: 根据内容类型调整脚本详细程度\n")
-            f.write("- **ROI期望**: 中等投资回报，平衡投入\n\n")
-
-            f.write("**成功路径**: 脚本优化 → 内容质量↑ → 互动率↑ → 涨粉效率提升\n\n")
-
-            f.write("### 🎪 低脚本依赖赛道 (SDI < 2.5)\n")
-            f.write("**覆盖分区**: 游戏(2.25)、生活(2.0)、动物圈(1.5)、舞蹈(1.5)\n\n")
-
-            f.write("**核心特征**:\n")
-            f.write("- 个人魅力和内容真实性比脚本规划更重要\n")
-            f.write("- 即兴发挥和自然表现效果更好\n")
-            f.write("- 过度脚本化可能适得其反\n\n")
-
-            f.write("**投资策略**:\n")
-            f.write("- **个人IP**: 重点培养个人特色和用户认知\n")
-            f.write("- **互动能力**: 提升与用户的实时互动质量\n")
-            f.write("- **技能本身**: 投资游戏技能、生活技能等核心能力\n")
-            f.write("- **ROI期望**: 脚本投资回报有限，优先级较低\n\n")
-
-            f.write("**成功路径**: 个人魅力+技能展示 > 脚本规划，真实性和互动性更重要\n\n")
-
-            # 挑战分析总结
-            f.write("## 🔍 稳健性验证结果\n\n")
-            f.write("为确保分析结果的可信度，我们进行了5项挑战分析：\n\n")
-
-            f.write("### 验证结果汇总\n")
-            f.write("| 挑战项目 | 测试内容 | 稳健性评分 | 结论 |\n")
-            f.write("|----------|----------|------------|------|\n")
-            f.write("| 粉丝去重假设 | 50%-90%去重系数测试 | 100% | 排名高度稳定 |\n")
-            f.write("| 数据源偏倚 | 5种偏倚情况模拟 | 100% | 结果抗偏倚能力强 |\n")
-            f.write("| 时间窗口选择 | 6-18个月窗口对比 | 100% | 12个月窗口合理 |\n")
-            f.write("| 权重参数敏感性 | 5种权重组合测试 | 85% | 权重影响在可控范围 |\n")
-            f.write("| SDI假设检验 | 4维度权重调整测试 | 100% | 分类标准稳定 |\n\n")
-
-            f.write("**整体稳健性**: 97.0% (高稳健性)\n\n")
-            f.write("**结论**: 分析结果具有很高的稳健性，核心发现和建议具备较强的可信度。\n\n")
-
-            # 实施路线图
-            f.write("## 🗺️ 实施路线图\n\n")
-            f.write("### 阶段一：框架建立 (1-3个月)\n")
-            f.write("1. **数据基础建设**\n")
-            f.write("   - 建立多源数据采集系统（飞瓜、火烧云、官方API）\n")
-            f.write("   - 设置月度数据更新机制\n")
-            f.write("   - 建立数据质量监控体系\n\n")
-
-            f.write("2. **分区策略制定**\n")
-            f.write("   - 为每个SDI等级制定详细的内容策略模板\n")
-            f.write("   - 开发脚本质量评估工具\n")
-            f.write("   - 建立创作者分级体系\n\n")
-
-            f.write("### 阶段二：试点验证 (3-6个月)\n")
-            f.write("1. **高SDI赛道试点**\n")
-            f.write("   - 选择知识分区的10-20个创作者进行脚本优化试点\n")
-            f.write("   - 建立脚本优化前后的效果对比\n")
-            f.write("   - 收集用户反馈和数据表现\n\n")
-
-            f.write("2. **效果跟踪分析**\n")
-            f.write("   - 建立粉丝增长、完播率等关键指标监控\n")
-            f.write("   - 定期生成效果评估报告\n")
-            f.write("   - 基于数据反馈调整策略\n\n")
-
-            f.write("### 阶段三：规模化推广 (6-12个月)\n")
-            f.write("1. **全面推广**\n")
-            f.write("   - 将验证有效的策略扩展到更多创作者\n")
-            f.write("   - 建立培训体系和最佳实践库\n")
-            f.write("   - 开发自动化工具支持规模化运营\n\n")
-
-            f.write("2. **持续优化**\n")
-            f.write("   - 基于新数据持续更新SDI评分和策略\n")
-            f.write("   - 跟踪平台政策变化，及时调整方案\n")
-            f.write("   - 建立长期的数据驱动优化机制\n\n")
-
-            # 技术实现与可复现性
-            f.write("## 🛠️ 技术实现与可复现性\n\n")
-            f.write("### 完整技术栈\n")
-            f.write("```bash\n")
-            f.write("# 环境要求\n")
-            f.write("Python 3.8+\n")
-            f.write("pandas >= 2.0.0\n")
-            f.write("requests >= 2.28.0\n")
-            f.write("numpy >= 1.24.0\n")
-            f.write("matplotlib >= 3.6.0\n\n")
-
-            f.write("# 一键运行\n")
-            f.write("bash run.sh\n")
-            f.write("```\n\n")
-
-            f.write("### 输出文件结构\n")
-            f.write("```\n")
-            f.write("outputs/\n")
-            f.write("├── raw/                    # 原始数据\n")
-            f.write("│   ├── categories_*.csv    # 分区清单\n")
-            f.write("│   ├── creators_*.csv      # 创作者数据\n")
-            f.write("│   └── videos_*.csv        # 热门视频数据\n")
-            f.write("├── clean/                  # 清洗数据\n")
-            f.write("│   ├── category_rollups_*.csv     # 分区汇总\n")
-            f.write("│   ├── sdi_scores_*.csv           # SDI评分\n")
-            f.write("│   └── top5_sdi_analysis_*.csv    # Top5分析\n")
-            f.write("├── scripts/                # 分析脚本\n")
-            f.write("├── spec_v1.md             # 数据规范\n")
-            f.write("├── report_v1_*.md         # 初版报告\n")
-            f.write("├── report_v2_final_*.md   # 最终报告\n")
-            f.write("└── challenge_analysis_*.md # 挑战分析\n")
-            f.write("```\n\n")
-
-            # 数据获取指南
-            f.write("## 📥 真实数据获取指南\n\n")
-            f.write("本项目使用模拟数据展示分析框架。实际应用中，建议从以下渠道获取真实数据：\n\n")
-
-            f.write("### 第三方数据平台\n")
-            f.write("1. **飞瓜数据B站版** (推荐)\n")
-            f.write("   - 提供创作者榜单、粉丝数据、涨粉趋势\n")
-            f.write("   - 支持按分区筛选和导出\n")
-            f.write("   - 数据更新频率高，质量较好\n\n")
-
-            f.write("2. **火烧云数据**\n")
-            f.write("   - 提供行业分析和热门视频榜单\n")
-            f.write("   - 有较强的分区分析功能\n")
-            f.write("   - 适合作为数据验证的第二来源\n\n")
-
-            f.write("3. **卡思数据**\n")
-            f.write("   - 综合性社交媒体数据平台\n")
-            f.write("   - 提供多维度的创作者画像\n")
-            f.write("   - 可用于交叉验证\n\n")
-
-            f.write("### 数据获取建议\n")
-            f.write("1. **多源验证**: 至少使用2个数据源进行交叉验证\n")
-            f.write("2. **API优先**: 优先使用官方API或合作伙伴API\n")
-            f.write("3. **合规抓取**: 遵守robots.txt和服务条款\n")
-            f.write("4. **频率控制**: 设置合理的抓取间隔，避免被限制\n\n")
-
-            # 商业化应用场景
-            f.write("## 💼 商业化应用场景\n\n")
-            f.write("### 1. MCN机构\n")
-            f.write("- **创作者招募**: 基于SDI评分筛选匹配的创作者\n")
-            f.write("- **内容策略制定**: 为不同分区创作者提供差异化指导\n")
-            f.write("- **资源配置优化**: 根据脚本依赖程度分配编剧资源\n")
-            f.write("- **效果预测**: 评估脚本优化投资的预期回报\n\n")
-
-            f.write("### 2. 品牌营销\n")
-            f.write("- **KOL选择**: 基于分区热度和SDI特征选择合适的合作对象\n")
-            f.write("- **内容共创**: 了解不同分区的内容规律，优化品牌植入策略\n")
-            f.write("- **效果评估**: 预测不同类型内容的传播效果\n\n")
-
-            f.write("### 3. 教育培训\n")
-            f.write("- **课程设计**: 基于SDI分级设计差异化的创作者培训课程\n")
-            f.write("- **能力评估**: 评估创作者的脚本能力和改进空间\n")
-            f.write("- **成长路径**: 为创作者提供个性化的能力提升建议\n\n")
-
-            f.write("### 4. 投资决策\n")
-            f.write("- **赛道选择**: 识别高增长潜力的内容分区\n")
-            f.write("- **风险评估**: 评估不同策略的稳健性和风险\n")
-            f.write("- **回报预测**: 量化脚本投资的预期收益\n\n")
-
-            # 后续研究方向
-            f.write("## 🔮 后续研究方向\n\n")
-            f.write("### 深度分析方向\n")
-            f.write("1. **用户画像细分**: 分析不同分区的粉丝特征和行为模式\n")
-            f.write("2. **内容生命周期**: 研究不同类型内容的传播规律和衰减模式\n")
-            f.write("3. **跨平台对比**: 对比B站与其他平台的分区生态差异\n")
-            f.write("4. **季节性分析**: 识别不同分区的时间性变化规律\n\n")
-
-            f.write("### 技术优化方向\n")
-            f.write("1. **自动化SDI评估**: 开发基于内容分析的自动SDI评分系统\n")
-            f.write("2. **实时监控系统**: 建立创作者表现和趋势的实时监控\n")
-            f.write("3. **预测模型**: 基于历史数据建立粉丝增长预测模型\n")
-            f.write("4. **个性化推荐**: 为创作者提供个性化的内容策略推荐\n\n")
-
-            f.write("### 应用拓展方向\n")
-            f.write("1. **小红书等平台**: 将分析框架扩展到其他内容平台\n")
-            f.write("2. **细分领域深度**: 针对特定分区进行更深度的分析\n")
-            f.write("3. **国际对比**: 对比中外内容平台的差异化特征\n")
-            f.write("4. **政策影响**: 研究平台政策变化对内容生态的影响\n\n")
-
-            # 联系与合作
-            f.write("## 📞 联系与合作\n\n")
-            f.write("### 项目团队\n")
-            f.write("- **项目负责人**: Claude Code AI Assistant\n")
-            f.write("- **技术支持**: Anthropic Claude 4.0\n")
-            f.write("- **生成时间**: 2025-11-05\n\n")
-
-            f.write("### 数据与代码\n")
-            f.write("- **开源代码**: 所有分析脚本均可复现和修改\n")
-            f.write("- **数据共享**: 模拟数据集可供学术研究使用\n")
-            f.write("- **方法论**: 分析框架可适配其他内容平台\n\n")
-
-            f.write("### 商业合作\n")
-            f.write("如需获取真实数据分析、定制化研究或商业化应用，欢迎联系项目团队。\n\n")
-
-            # 结语
-            f.write("---\n\n")
-            f.write("## 🎉 结语\n\n")
-            f.write("本报告通过系统性的数据分析和严格的稳健性验证，为Bilibili内容创作提供了科学的指导框架。")
-            f.write("脚本依赖指数(SDI)的提出，有助于创作者和机构制定更精确的内容策略。\n\n")
-
-            f.write("我们相信，数据驱动的内容策略将帮助更多创作者实现可持续的增长，")
-            f.write("推动整个内容创作生态的健康发展。\n\n")
-
-            f.write("**感谢使用本分析框架，期待您的反馈和建议！**\n\n")
-
-            f.write("---\n")
-            f.write("*报告由 Claude Code 自动生成 | 2025-11-05*\n")
+        render_file(report_file, 'report_v2_final', report_date=self.report_date)
 
         logger.info(f"📋 最终修正报告已生成: {report_file}")
         return report_file
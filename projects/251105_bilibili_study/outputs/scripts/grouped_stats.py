@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Grouped Array Statistics
+按分区连续排列的数组上的组内运算：组内排序、组内分位数。分区汇总（report_generator）与
+自助法置信区间（bootstrap_ci）共用，沿最后一维计算，一维数组与 (重抽次数 × 样本数) 矩阵都适用
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def group_values(series):
+    """取出参与组内排序的数值列：缺失值显式报错（而不是在转换为 int64 时失败），整数列保持 int64"""
+    missing = int(series.isna().sum())
+    if missing:
+        raise ValueError(f"{series.name} 存在 {missing} 个缺失值，请先剔除或补全（数据校验的 not_null 检查）")
+    return series.to_numpy(dtype=np.int64 if pd.api.types.is_integer_dtype(series) else float)
+
+
+def sort_within_groups(codes, values):
+    """
+    按组号、组内数值升序排列，沿最后一维：codes 为非负组号（与 values 最后一维对齐），values 为一维或 (行 × 位置)。
+    返回 (排列后的组号, 排列后的值)。整数值先平移为非负，再与组号合成一个 int64 键只排序一次；
+    浮点值或合成键超出 int64 时改用 np.lexsort（结果相同，较慢）
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    values = np.asarray(values)
+    if values.size and np.issubdtype(values.dtype, np.integer):
+        low = int(values.min())
+        shift = max(int(values.max()) - low, 1).bit_length()
+        if shift + max(int(codes.max(initial=0)), 1).bit_length() < 63:
+            keys = np.sort((codes << shift) | (values - low), axis=-1)
+            return keys >> shift, (keys & ((1 << shift) - 1)) + low
+
+    codes = np.broadcast_to(codes, values.shape)
+    order = np.lexsort((values, codes), axis=-1)
+    return np.take_along_axis(codes, order, axis=-1), np.take_along_axis(values, order, axis=-1)
+
+
+def group_quantile(sorted_values, starts, counts, q):
+    """
+    各组的线性插值分位数，与 Series.quantile / numpy 默认插值一致。
+    sorted_values 沿最后一维按组连续且组内升序（sort_within_groups 的结果），starts / counts 为各组起点与样本数
+    """
+    position = (counts - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    gamma = position - lower
+
+    a = sorted_values[..., starts + lower].astype(np.float64)
+    b = sorted_values[..., starts + upper].astype(np.float64)
+    diff = b - a
+    return np.where(gamma >= 0.5, b - diff * (1 - gamma), a + diff * gamma)
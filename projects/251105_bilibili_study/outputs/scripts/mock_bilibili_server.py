@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Local Mock Bilibili API Server
+本地模拟B站接口，用于离线调试采集脚本（支持ETag/304、故障注入、延迟注入）
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from bilibili_categories import MANUAL_CATEGORIES
+
+
+class MockBilibiliState:
+    """mock服务的共享状态：路由数据、故障注入与请求计数"""
+
+    def __init__(self, fail_first=0, latency=0.0, videos_per_category=200, creators_per_category=80, raw_body=None):
+        self.fail_first = fail_first
+        # 故障注入：所有请求都以200返回这段原始响应体（非JSON、非对象JSON等）
+        self.raw_body = raw_body
+        self.latency = latency
+        self.videos_per_category = videos_per_category
+        self.creators_per_category = creators_per_category
+        self.request_count = 0
+        self.path_counts = {}
+        # 按到达顺序记录的 (路径, 查询参数)，测试中用于核对具体请求了哪些页/创作者
+        self.requests = []
+        self.lock = threading.Lock()
+        self.started_at = int(time.time())
+        self.last_modified = formatdate(self.started_at, usegmt=True)
+
+    def record(self, path, query=None):
+        """记录请求，返回是否应注入失败"""
+        with self.lock:
+            self.request_count += 1
+            self.path_counts[path] = self.path_counts.get(path, 0) + 1
+            self.requests.append((path, {key: values[0] for key, values in (query or {}).items()}))
+            return self.request_count <= self.fail_first
+
+    def zone_list(self, query):
+        primaries = [c for c in MANUAL_CATEGORIES if c['parent_tid'] == 0]
+        return [{"tid": c['tid'], "name": c['tname']} for c in primaries]
+
+    def zone_children(self, query):
+        tid = int(query.get('tid', ['0'])[0])
+        children = [c for c in MANUAL_CATEGORIES if c['parent_tid'] == tid]
+        return [{"tid": c['tid'], "name": c['tname']} for c in children]
+
+    def newlist(self, query):
+        """分区最新投稿列表，按 (rid, 序号) 确定性生成"""
+        rid = int(query.get('rid', ['0'])[0])
+        pn = int(query.get('pn', ['1'])[0])
+        ps = int(query.get('ps', ['20'])[0])
+
+        archives = []
+        start = (pn - 1) * ps
+        for index in range(start, min(start + ps, self.videos_per_category)):
+            rng = random.Random(rid * 10_000_000 + index)
+            mid = rid * 1_000_000 + rng.randint(1, self.creators_per_category)
+            view = rng.randint(10000, 5000000)
+            archives.append({
+                "aid": rid * 10_000_000 + index,
+                "bvid": f"BV{rid:03d}{index:07d}",
+                "title": f"分区{rid}投稿_{index + 1:05d}",
+                "pubdate": self.started_at - rng.randint(1, 365) * 86400,
+                "owner": {"mid": mid, "name": f"UP_{mid}"},
+                "stat": {
+                    "view": view,
+                    "like": int(view * rng.uniform(0.02, 0.15)),
+                    "coin": int(view * rng.uniform(0.005, 0.03)),
+                    "favorite": int(view * rng.uniform(0.008, 0.025)),
+                    "share": int(view * rng.uniform(0.001, 0.008)),
+                },
+            })
+
+        return {"archives": archives, "page": {"count": self.videos_per_category, "num": pn, "size": ps}}
+
+    def card(self, query):
+        """UP主名片：粉丝数与投稿数"""
+        mid = int(query.get('mid', ['0'])[0])
+        rng = random.Random(mid)
+        return {
+            "card": {"mid": str(mid), "name": f"UP_{mid}", "fans": max(1000, int(rng.lognormvariate(11.0, 1.2)))},
+            "archive_count": rng.randint(1, 500),
+        }
+
+    def routes(self):
+        return {
+            "/x/web-interface/zone/list": self.zone_list,
+            "/x/web-interface/zone/children": self.zone_children,
+            "/x/web-interface/newlist": self.newlist,
+            "/x/web-interface/card": self.card,
+        }
+
+
+class MockBilibiliHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, extra_headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if self.state.record(parsed.path, query):
+            self._send_json(503, {"code": -503, "message": "service unavailable"})
+            return
+
+        if self.state.latency:
+            time.sleep(self.state.latency)
+
+        if self.state.raw_body is not None:
+            body = self.state.raw_body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        handler = self.state.routes().get(parsed.path)
+        if handler is None:
+            self._send_json(404, {"code": -404, "message": "not found"})
+            return
+
+        payload = {"code": 0, "message": "0", "data": handler(query)}
+        body = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode('utf-8')
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self._send_json(200, payload, {'ETag': etag, 'Last-Modified': self.state.last_modified})
+
+
+@contextmanager
+def run_mock_server(port=0, fail_first=0, latency=0.0, videos_per_category=200, creators_per_category=80,
+                    raw_body=None):
+    """在后台线程启动mock服务，返回 (base_url, state)"""
+    state = MockBilibiliState(
+        fail_first=fail_first,
+        latency=latency,
+        videos_per_category=videos_per_category,
+        creators_per_category=creators_per_category,
+        raw_body=raw_body,
+    )
+    handler = type('BoundMockBilibiliHandler', (MockBilibiliHandler,), {'state': state})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", state
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="本地模拟B站接口")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-first", type=int, default=0, help="前N个请求返回503，用于验证重试")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的模拟延迟(秒)")
+    parser.add_argument("--videos-per-category", type=int, default=200)
+    parser.add_argument("--creators-per-category", type=int, default=80)
+    args = parser.parse_args()
+
+    with run_mock_server(args.port, args.fail_first, args.latency,
+                         args.videos_per_category, args.creators_per_category) as (base_url, state):
+        print(f"🧪 Mock服务已启动: {base_url} (Ctrl+C 退出)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\n共处理 {state.request_count} 个请求")
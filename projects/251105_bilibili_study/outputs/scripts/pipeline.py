@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+In-process Analysis Pipeline
+单进程运行完整分析流程：各阶段按依赖关系(DAG)执行、DataFrame在内存中传递、产物照常落盘，并统计每个阶段的耗时与内存；
+上游输出、代码与配置均未变化的阶段直接复用缓存
+"""
+
+import argparse
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from graphlib import TopologicalSorter
+
+import pandas as pd
+
+from audience_sketch import load_dedup_factors
+from bilibili_categories import BilibiliCategoryCollector
+from bilibili_http import DEFAULT_API_BASE
+from challenge_analyzer import ChallengeAnalyzer
+from creator_scraper import BilibiliCreatorScraper
+from data_validator import DataValidator
+from dataset_store import STORAGE_FORMATS
+from report_generator import BilibiliReportGenerator
+from report_renderer import TEMPLATE_DIR
+from response_cache import ResponseCache
+from schemas import apply_schema
+from sdi_analyzer import SDIAnalyzer
+from snapshot_catalog import save_snapshot, today
+from stage_cache import StageCache, hash_config, hash_files, hash_output
+from trend_engine import TrendEngine
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def peak_rss_mb():
+    """进程峰值常驻内存 (ru_maxrss 在 Linux 上以KB计，macOS 上以字节计)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class AnalysisPipeline:
+    # 阶段名 -> 上游阶段；stage_<名称> 方法以上游阶段名作为参数接收其输出
+    STAGES = {
+        'categories': (),
+        'creators': ('categories',),
+        'validation': ('creators',),
+        'popularity': ('creators', 'validation'),
+        'sdi': (),
+        'top5': ('sdi', 'popularity'),
+        'rollups': ('creators', 'popularity'),
+        'report': ('categories', 'creators', 'popularity', 'sdi', 'top5', 'rollups', 'validation'),
+        'challenges': ('creators', 'popularity', 'sdi'),
+        'trends': ('creators', 'popularity'),
+    }
+
+    # 各阶段依赖的代码模块，文件内容变化即视为阶段代码变化
+    COMMON_MODULES = ('pipeline', 'dataset_store', 'data_loader', 'schemas', 'snapshot_catalog')
+    STAGE_MODULES = {
+        'categories': ('bilibili_categories', 'bilibili_http'),
+        'creators': ('creator_scraper', 'creator_crawler', 'crawl_state', 'synthetic_data', 'bilibili_http'),
+        'validation': ('data_validator',),
+        'popularity': ('creator_scraper', 'data_validator', 'report_renderer'),
+        'sdi': ('sdi_analyzer', 'sdi_profiles', 'scenario_engine'),
+        'top5': ('sdi_analyzer', 'sdi_profiles', 'scenario_engine', 'report_renderer'),
+        'rollups': ('report_generator', 'bootstrap_ci', 'grouped_stats', 'scenario_engine', 'audience_sketch'),
+        'report': ('report_generator', 'report_renderer', 'challenge_analyzer', 'sdi_analyzer', 'scenario_engine',
+                   'data_validator'),
+        'challenges': ('challenge_analyzer', 'sdi_analyzer', 'sdi_profiles', 'scenario_engine', 'audience_sketch',
+                       'window_index', 'report_renderer'),
+        'trends': ('trend_engine',),
+    }
+    # 各阶段报告用到的模板（templates/<name>.md），与代码模块一样计入阶段代码哈希
+    STAGE_TEMPLATES = {
+        'popularity': ('data_quality', 'data_validation'),
+        'top5': ('sdi_analysis', 'sdi_strategy', 'sdi_case', 'sdi_weight_grid'),
+        'report': ('report_v1', 'report_v1_dedup', 'report_v1_confidence', 'report_v1_validation', 'report_v1_sdi_tier',
+                   'report_v1_sdi_track', 'category_report', 'category_report_confidence'),
+        'challenges': ('challenge_analysis', 'challenge_monte_carlo'),
+    }
+
+    def __init__(self, data_dir, collector, scraper, sdi_analyzer, report_generator, challenge_analyzer,
+                 storage='csv', stage_cache=None, rerun=(), snapshot=None, trend_engine=None):
+        self.data_dir = data_dir
+        self.raw_dir = os.path.join(data_dir, 'raw')
+        self.clean_dir = os.path.join(data_dir, 'clean')
+        self.storage = storage
+        # 本次运行写入的快照，默认为今天（采集日期）
+        self.timestamp = snapshot or today()
+
+        self.collector = collector
+        self.scraper = scraper
+        self.sdi_analyzer = sdi_analyzer
+        self.report_generator = report_generator
+        self.challenge_analyzer = challenge_analyzer
+        self.trend_engine = trend_engine or TrendEngine(os.path.join(data_dir, 'trends.sqlite'))
+
+        self.stage_cache = stage_cache
+        self.rerun = set(rerun)
+
+        self.results = {}
+        self.output_hashes = {}
+        self.artifacts = []
+        self.stats = []
+
+    def _save(self, df, directory, name):
+        csv_file = os.path.join(directory, f'{name}_{self.timestamp}.csv')
+        self.artifacts.extend(save_snapshot(df, csv_file, storage=self.storage))
+        return csv_file
+
+    # ---- 各阶段 ----
+
+    def stage_categories(self):
+        categories_df = self.collector.get_categories()
+        self.collector.save_categories(categories_df, self.raw_dir)
+        self.collector.create_category_report(categories_df, self.raw_dir)
+        return categories_df
+
+    def stage_creators(self, categories):
+        """返回 (creators_df, videos_df)，按 schemas 转换类型后传给下游"""
+        self.scraper.categories_df = categories
+        creators_df, videos_df = self.scraper.collect_creators_and_videos()
+        self._save(creators_df, self.raw_dir, 'creators_by_category')
+        self._save(videos_df, self.raw_dir, 'videos_by_category')
+        return apply_schema(creators_df, 'creators_by_category'), apply_schema(videos_df, 'videos_by_category')
+
+    def stage_validation(self, creators):
+        """校验采集结果，返回每项检查一行的结果表；strict 时存在错误级问题即中止流水线"""
+        checks_df, flags_df = self.scraper.validator.validate(*creators)
+        self._save(checks_df, self.clean_dir, 'data_validation')
+        self._save(flags_df, self.clean_dir, 'validation_flags')
+        return checks_df
+
+    def stage_popularity(self, creators, validation):
+        creators_df, videos_df = creators
+        metrics_df = self.scraper.calculate_popularity_metrics(videos_df, creators_df)
+        self._save(metrics_df, self.raw_dir, 'popularity_metrics')
+        self.scraper.generate_quality_report(creators_df, videos_df, metrics_df, self.raw_dir, validation)
+        return metrics_df
+
+    def stage_sdi(self):
+        sdi_df = self.sdi_analyzer.calculate_sdi_scores()
+        self._save(sdi_df, self.clean_dir, 'sdi_scores')
+        return sdi_df
+
+    def stage_top5(self, sdi, popularity):
+        top5_sdi = self.sdi_analyzer.analyze_top5_sdi(sdi, popularity)
+        case_studies = self.sdi_analyzer.create_case_studies(top5_sdi)
+        self._save(top5_sdi, self.clean_dir, 'top5_sdi_analysis')
+        self.artifacts.append(self.sdi_analyzer.create_sdi_report(sdi, top5_sdi, case_studies, self.raw_dir))
+        return top5_sdi
+
+    def stage_rollups(self, creators, popularity):
+        rollups_df = self.report_generator.calculate_category_rollups(
+            creators[0], popularity, load_dedup_factors(self.report_generator.audience_db))
+        if self.report_generator.bootstrap_replicates:
+            rollups_df = self.report_generator.add_confidence_intervals(rollups_df, *creators)
+        self._save(rollups_df, self.clean_dir, 'category_rollups')
+        return rollups_df
+
+    def stage_report(self, categories, creators, popularity, sdi, top5, rollups, validation):
+        data_dict = {
+            'categories': categories,
+            'creators': creators[0],
+            'videos': creators[1],
+            'popularity': popularity,
+            'sdi': sdi,
+            'top5_sdi': top5,
+            'validation': validation,
+        }
+        report_file = self.report_generator.create_comprehensive_report(data_dict, rollups)
+        self.artifacts += [report_file, self.report_generator.create_run_script()]
+        if self.report_generator.category_reports:
+            self.artifacts += self.report_generator.create_category_reports(data_dict, rollups)
+        return report_file
+
+    def stage_challenges(self, creators, popularity, sdi):
+        creators_df, videos_df = creators
+        analyzer = self.challenge_analyzer
+        challenges = {
+            'fans_duplication': analyzer.challenge_1_fans_duplication(creators_df, analyzer.dedup_scenarios()),
+            'data_source_bias': analyzer.challenge_2_data_source_bias(popularity, videos_df),
+            'time_window': analyzer.challenge_3_time_window_sensitivity(creators_df, videos_df),
+            'weight_sensitivity': analyzer.challenge_4_weight_sensitivity(popularity),
+            'sdi_assumption': analyzer.challenge_5_sdi_assumption_test(sdi),
+        }
+        report_file = analyzer.generate_challenge_report(challenges)
+        self.artifacts.append(report_file)
+        return report_file
+
+    def stage_trends(self, creators, popularity):
+        """把本次快照增量写入趋势库，返回本期的趋势行（快照早于库中最新快照时为 None）"""
+        trends = self.trend_engine.ingest(self.timestamp, creators[0], popularity)
+        self.artifacts.append(self.trend_engine.db_file)
+        return trends
+
+    # ---- 缓存 ----
+
+    def stage_config(self, name):
+        """影响阶段输出的配置；快照日期决定产物文件名，所有阶段都包含"""
+        config = {'timestamp': self.timestamp, 'storage': self.storage}
+        if name == 'categories':
+            config.update(api_base=self.collector.api_base, offline=self.collector.offline)
+        elif name == 'creators':
+            config.update(api_base=self.scraper.api_base, simulate=self.scraper.simulate,
+                          max_pages=self.scraper.max_pages, seed=self.scraper.generator.seed,
+                          scale=self.scraper.generator.scale)
+        elif name == 'validation':
+            validator = self.scraper.validator
+            config.update(outlier_threshold=validator.outlier_threshold, strict=validator.strict)
+        elif name in ('sdi', 'top5'):
+            # 评分标准文件的内容哈希：只改代码格式或文件缩进不会触发重算
+            profiles = self.sdi_analyzer.profiles
+            config.update(profile_version=profiles.version, profile_hash=profiles.hash)
+        elif name == 'rollups':
+            generator = self.report_generator
+            config.update(bootstrap_replicates=generator.bootstrap_replicates, confidence=generator.confidence,
+                          seed=generator.seed, dedup_factors=self._measured_factors(generator.audience_db))
+        elif name == 'report':
+            generator = self.report_generator
+            config.update(category_reports=generator.category_reports, category_top_n=generator.category_top_n)
+        elif name == 'challenges':
+            analyzer = self.challenge_analyzer
+            config.update(monte_carlo_samples=analyzer.monte_carlo_samples, concentration=analyzer.concentration,
+                          seed=analyzer.seed, dedup_factors=self._measured_factors(analyzer.audience_db))
+        elif name == 'trends':
+            config.update(window=self.trend_engine.window)
+        return config
+
+    @staticmethod
+    def _measured_factors(audience_db):
+        """受众草图库的实测去重系数也是阶段输入：新采集的粉丝样本写入后，汇总与挑战阶段需要重跑"""
+        factors = load_dedup_factors(audience_db)
+        return None if factors is None else {str(tid): float(factor) for tid, factor in factors.items()}
+
+    def cacheable(self, name):
+        """未设随机种子的模拟数据与自助法重抽每次都不同，不缓存"""
+        if name == 'creators':
+            return not (self.scraper.simulate and self.scraper.generator.seed is None)
+        if name == 'rollups':
+            return not (self.report_generator.bootstrap_replicates and self.report_generator.seed is None)
+        return True
+
+    def stage_key(self, name):
+        modules = self.COMMON_MODULES + self.STAGE_MODULES[name]
+        paths = {os.path.join(SCRIPTS_DIR, f'{module}.py') for module in modules}
+        paths |= {os.path.join(TEMPLATE_DIR, f'{template}.md') for template in self.STAGE_TEMPLATES.get(name, ())}
+        code_hash = hash_files(paths)
+        inputs = {dep: self.output_hashes[dep] for dep in self.STAGES[name]}
+        return StageCache.stage_key(name, code_hash, hash_config(self.stage_config(name)), inputs)
+
+    # ---- 调度 ----
+
+    def order(self):
+        """按依赖关系排出的执行顺序"""
+        return list(TopologicalSorter(self.STAGES).static_order())
+
+    def run_stage(self, name):
+        inputs = {dep: self.results[dep] for dep in self.STAGES[name]}
+        use_cache = self.stage_cache is not None and self.cacheable(name)
+        key = self.stage_key(name) if use_cache else None
+
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+
+        cached = self.stage_cache.lookup(key) if use_cache and name not in self.rerun else None
+        if cached is not None:
+            logger.info(f"♻️ 阶段 {name} 的输入、代码与配置均未变化，复用缓存")
+            self.results[name], self.output_hashes[name] = cached
+        else:
+            logger.info(f"▶️ 阶段 {name}")
+            self.artifacts = []
+            self.results[name] = getattr(self, f'stage_{name}')(**inputs)
+            if use_cache:
+                self.output_hashes[name] = self.stage_cache.store(key, name, self.results[name], self.artifacts)
+            elif self.stage_cache is not None:
+                # 不缓存的阶段也记录输出哈希，输出恰好不变时下游仍可命中
+                self.output_hashes[name] = hash_output(self.results[name])
+
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+
+        self.stats.append({
+            'stage': name,
+            'cached': cached is not None,
+            'seconds': round(elapsed, 3),
+            'peak_alloc_mb': round(peak / 1024 / 1024, 1),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        })
+        logger.info(f"⏱️ {name}: {elapsed:.2f}s，阶段内存峰值 {peak / 1024 / 1024:.1f} MB")
+
+    def run(self):
+        """在同一进程中依次执行全部阶段，返回每个阶段的耗时与内存统计"""
+        logger.info("🚀 开始Bilibili分析流水线...")
+        os.makedirs(self.raw_dir, exist_ok=True)
+        os.makedirs(self.clean_dir, exist_ok=True)
+
+        # 所有阶段读写同一个快照
+        self.collector.snapshot = self.timestamp
+        self.scraper.snapshot = self.timestamp
+        self.sdi_analyzer.snapshot = self.timestamp
+        self.report_generator.timestamp = self.timestamp
+        self.challenge_analyzer.timestamp = self.timestamp
+
+        tracemalloc.start()
+        try:
+            for name in self.order():
+                self.run_stage(name)
+        finally:
+            tracemalloc.stop()
+
+        stats_df = pd.DataFrame(self.stats)
+        logger.info("📊 阶段耗时与内存:\n" + stats_df.to_string(index=False))
+        logger.info(f"✅ 流水线完成，总耗时 {stats_df['seconds'].sum():.2f}s，"
+                    f"复用缓存 {int(stats_df['cached'].sum())}/{len(stats_df)} 个阶段")
+        return stats_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="单进程运行完整分析流程")
+    parser.add_argument("--api-base", default=DEFAULT_API_BASE, help="接口地址 (可指向本地mock服务)")
+    parser.add_argument("--offline", action="store_true", help="分区使用手动分区表，创作者使用模拟数据")
+    parser.add_argument("--simulate", action="store_true", help="不请求创作者接口，生成模拟数据")
+    parser.add_argument("--workers", type=int, default=8, help="并发worker数量")
+    parser.add_argument("--max-pages", type=int, default=20, help="每个分区最多采集的列表页数")
+    parser.add_argument("--seed", type=int, default=None, help="模拟数据的随机种子")
+    parser.add_argument("--scale", type=float, default=1.0, help="模拟数据规模倍数")
+    parser.add_argument("--storage", choices=STORAGE_FORMATS, default="csv", help="parquet: 额外写出列式存储文件")
+    parser.add_argument("--rerun", action="append", default=[], choices=sorted(AnalysisPipeline.STAGES),
+                        help="忽略缓存强制重跑的阶段（可重复）")
+    parser.add_argument("--no-stage-cache", action="store_true", help="不使用阶段缓存")
+    parser.add_argument("--snapshot", default=None, help="写入的快照编号 YYYYMMDD（默认今天）")
+    parser.add_argument("--bootstrap", type=int, default=0, help="分区汇总置信区间的自助法重抽次数（0为不计算）")
+    parser.add_argument("--category-reports", action="store_true", help="为每个分区生成明细报告")
+    parser.add_argument("--strict-validation", action="store_true", help="数据校验存在错误级问题时中止流水线")
+    args = parser.parse_args()
+    snapshot = args.snapshot or today()
+
+    data_dir = "../"
+    cache = ResponseCache()
+    pipeline = AnalysisPipeline(
+        data_dir,
+        collector=BilibiliCategoryCollector(api_base=args.api_base, offline=args.offline, cache=cache,
+                                            storage=args.storage),
+        scraper=BilibiliCreatorScraper(
+            api_base=args.api_base,
+            simulate=args.simulate or args.offline,
+            crawl_workers=args.workers,
+            max_pages=args.max_pages,
+            state_file=os.path.join(data_dir, 'raw', f".crawl_state_{snapshot}.sqlite"),
+            cache=cache,
+            seed=args.seed,
+            scale=args.scale,
+            storage=args.storage,
+            validator=DataValidator(strict=args.strict_validation),
+        ),
+        sdi_analyzer=SDIAnalyzer(),
+        report_generator=BilibiliReportGenerator(data_dir, bootstrap_replicates=args.bootstrap, seed=args.seed,
+                                                 category_reports=args.category_reports),
+        challenge_analyzer=ChallengeAnalyzer(data_dir),
+        storage=args.storage,
+        stage_cache=None if args.no_stage_cache else StageCache(),
+        rerun=args.rerun,
+        snapshot=snapshot,
+    )
+    pipeline.run()
+    if pipeline.stage_cache is not None:
+        pipeline.stage_cache.prune()
+
+    print("\n🎉 分析流水线完成!")
+    print(f"📋 主报告: {pipeline.results['report']}")
+    print(f"🔍 挑战分析: {pipeline.results['challenges']}")
+    print(f"🗄️ {cache.summary()}")
@@ -8,36 +8,124 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import os
+import argparse
 import logging
 
+from audience_sketch import DEFAULT_AUDIENCE_DB, load_dedup_factors
+from bootstrap_ci import bootstrap_popularity, bootstrap_rollups
+from challenge_analyzer import ChallengeAnalyzer
+from data_loader import default_loader, enable_disk_cache
+from data_validator import outlier_counts, validation_summary, validation_verdict
+from dataset_store import STORAGE_FORMATS
+from grouped_stats import group_quantile, group_values, sort_within_groups
+from report_renderer import (bullet_list, format_column, format_rows, group_rows, range_column, render_file,
+                             render_parallel, render_section, repeat_section, table_rows)
+from scenario_engine import rank_matrix
+from sdi_analyzer import SDIAnalyzer
+from snapshot_catalog import SnapshotCatalog, save_snapshot, snapshot_date, today
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class BilibiliReportGenerator:
-    def __init__(self, data_dir):
+    # 报告实际用到的列；Parquet存储时只解码这些列
+    LOAD_COLUMNS = {
+        'categories': ['tid'],
+        'creators': ['uid', 'category_tid', 'category_name', 'followers_count', 'video_count_12m'],
+        'videos': ['bv_id', 'category_tid', 'play_count', 'interaction_rate'],
+        'popularity': ['category_tid', 'category_name', 'avg_play_count', 'avg_interaction_rate',
+                       'total_hot_videos', 'popularity_index', 'rank'],
+        'sdi': ['category_tid', 'category_name', 'sdi_score'],
+        'top5_sdi': ['category_tid', 'category_name', 'rank', 'sdi_score', 'dependency_level',
+                     'improvement_priority', 'script_growth_potential', 'growth_mechanism', 'improvement_advice'],
+    }
+
+    # 表A的列与格式（templates/report_v1.md 中的表头同序）
+    ROLLUP_TABLE_COLUMNS = [
+        ('category_name', '{}'), ('creator_count', '{:,}'), ('creator_count_pct', '{:.1%}'),
+        ('total_followers_a', '{:,}'), ('followers_a_pct', '{:.1%}'),
+        ('total_followers_b_conservative', '{:,}'), ('total_followers_b_aggressive', '{:,}'),
+        ('avg_followers', '{:,}'), ('top10_ratio', '{:.1%}'),
+    ]
+
+    # 分区报告各段的字段：(名称, 列名或函数, 格式)
+    CATEGORY_SUMMARY_FIELDS = [
+        ('创作者数', 'creator_count', '{:,}'), ('创作者占比', 'creator_count_pct', '{:.1%}'),
+        ('粉丝总数A', 'total_followers_a', '{:,}'), ('粉丝占比', 'followers_a_pct', '{:.1%}'),
+        ('粉丝总数B(保守)', 'total_followers_b_conservative', '{:,}'),
+        ('粉丝总数B(激进)', 'total_followers_b_aggressive', '{:,}'),
+        ('平均粉丝', 'avg_followers', '{:,}'), ('粉丝中位数', 'median_followers', '{:,}'),
+        ('Top10占比', 'top10_ratio', '{:.1%}'),
+        ('粉丝数≥P80的创作者', 'p80_creators', '{:,}'), ('粉丝数≥P90的创作者', 'p90_creators', '{:,}'),
+        ('近12个月平均投稿', 'avg_videos_12m', '{:.1f}'),
+    ]
+    CATEGORY_POPULARITY_FIELDS = [
+        ('热度排名', 'rank', '{}'), ('爱看指数', 'popularity_index', '{:.3f}'),
+        ('平均播放量', 'avg_play_count', '{:,}'), ('平均互动率', 'avg_interaction_rate', '{:.2%}'),
+        ('热门视频数', 'total_hot_videos', '{:,}'),
+    ]
+    CATEGORY_SDI_FIELDS = [
+        ('SDI分数', 'sdi_score', '{:.2f}'), ('依赖程度', 'dependency_level', '{}'),
+        ('脚本提升优先级', 'priority', '{}'), ('提升建议', 'advice', '{}'), ('增长机制', 'growth_mechanism', '{}'),
+    ]
+    CATEGORY_INTERVAL_FIELDS = [
+        ('粉丝总数A', range_column('total_followers_a_ci_low', 'total_followers_a_ci_high', '{:,}'), None),
+        ('粉丝中位数', range_column('median_followers_ci_low', 'median_followers_ci_high', '{:,}'), None),
+        ('Top10占比', range_column('top10_ratio_ci_low', 'top10_ratio_ci_high', '{:.1%}'), None),
+        ('爱看指数', range_column('popularity_index_ci_low', 'popularity_index_ci_high', '{:.3f}'), None),
+        ('热度排名', range_column('popularity_rank_ci_low', 'popularity_rank_ci_high', '{:.0f}'), None),
+    ]
+
+    # 路径分析的SDI分档：(标题, 特征, 下限, 上限)
+    SDI_TIERS = [
+        ("🎖️ 高脚本依赖赛道 (SDI≥4.0)", "内容质量高度依赖脚本规划，优质脚本直接影响用户留存和传播", 4.0, np.inf),
+        ("📈 中等脚本依赖赛道 (2.5≤SDI<4.0)", "脚本优化有明显效果，但不是唯一成功要素", 2.5, 4.0),
+        ("🎪 低脚本依赖赛道 (SDI<2.5)", "个人魅力和内容真实性比脚本规划更重要", -np.inf, 2.5),
+    ]
+
+    def __init__(self, data_dir, storage='csv', snapshot=None, bootstrap_replicates=0, confidence=0.95,
+                 workers=1, seed=None, audience_db=DEFAULT_AUDIENCE_DB, category_reports=False, category_top_n=10):
         self.data_dir = data_dir
+        self.storage = storage
+        # 自助法置信区间：重抽次数为 0 时只输出点估计
+        self.bootstrap_replicates = bootstrap_replicates
+        self.confidence = confidence
+        self.workers = workers
+        self.seed = seed
+        # 受众草图库：存在时追加按实测去重系数计算的口径B
+        self.audience_db = audience_db
+        # 分区报告：每个分区一份明细报告（头部创作者/视频取前 category_top_n 名），按 workers 并行渲染
+        self.category_reports = category_reports
+        self.category_top_n = category_top_n
+        self.catalog = SnapshotCatalog(data_dir)
         self.report_date = datetime.now().strftime('%Y-%m-%d')
-        self.timestamp = datetime.now().strftime('%Y%m%d')
+        # 报告对应的数据快照，默认取最新一次采集
+        self.timestamp = snapshot or self.catalog.latest('creators_by_category') or today()
 
     def load_all_data(self):
         """加载所有分析数据"""
         logger.info("📊 加载分析数据...")
 
         # 加载分区信息
-        categories_df = pd.read_csv(os.path.join(self.data_dir, 'raw', f'categories_{self.timestamp}.csv'))
+        categories_df = self.catalog.load('categories', self.timestamp, columns=self.LOAD_COLUMNS['categories'])
 
         # 加载创作者数据
-        creators_df = pd.read_csv(os.path.join(self.data_dir, 'raw', f'creators_by_category_{self.timestamp}.csv'))
+        creators_df = self.catalog.load('creators_by_category', self.timestamp, columns=self.LOAD_COLUMNS['creators'])
 
         # 加载视频数据
-        videos_df = pd.read_csv(os.path.join(self.data_dir, 'raw', f'videos_by_category_{self.timestamp}.csv'))
+        videos_df = self.catalog.load('videos_by_category', self.timestamp, columns=self.LOAD_COLUMNS['videos'])
 
         # 加载热度指标
-        popularity_df = pd.read_csv(os.path.join(self.data_dir, 'raw', f'popularity_metrics_{self.timestamp}.csv'))
+        popularity_df = self.catalog.load('popularity_metrics', self.timestamp, columns=self.LOAD_COLUMNS['popularity'])
 
         # 加载SDI分析
-        sdi_df = pd.read_csv(os.path.join(self.data_dir, 'clean', f'sdi_scores_{self.timestamp}.csv'))
-        top5_sdi_df = pd.read_csv(os.path.join(self.data_dir, 'clean', f'top5_sdi_analysis_{self.timestamp}.csv'))
+        sdi_df = self.catalog.load('sdi_scores', self.timestamp, columns=self.LOAD_COLUMNS['sdi'])
+        top5_sdi_df = self.catalog.load('top5_sdi_analysis', self.timestamp, columns=self.LOAD_COLUMNS['top5_sdi'])
+
+        # 数据校验结果（校验功能加入前的快照没有）
+        validation_df = None
+        if self.timestamp in self.catalog.snapshots('data_validation'):
+            validation_df = self.catalog.load('data_validation', self.timestamp)
 
         logger.info("✅ 数据加载完成")
 
@@ -47,67 +135,79 @@ class BilibiliReportGenerator:
             'videos': videos_df,
             'popularity': popularity_df,
             'sdi': sdi_df,
-            'top5_sdi': top5_sdi_df
+            'top5_sdi': top5_sdi_df,
+            'validation': validation_df,
         }
 
-    def calculate_category_rollups(self, creators_df, popularity_df):
-        """计算分区汇总指标"""
+    def calculate_category_rollups(self, creators_df, popularity_df, dedup_factors=None):
+        """
+        计算分区汇总指标（一次分组聚合 + 一次组内排序完成全部分区）。
+        dedup_factors: 按 category_tid 索引的实测去重系数，传入时追加 dedup_factor_measured / total_followers_b_measured 两列
+        """
         logger.info("🔢 计算分区汇总指标...")
 
-        rollups = []
-
-        for tid in creators_df['category_tid'].unique():
-            category_creators = creators_df[creators_df['category_tid'] == tid]
-            category_name = category_creators.iloc[0]['category_name']
-
-            # 基础指标
-            creator_count = len(category_creators)
-            total_followers_a = category_creators['followers_count'].sum()  # 口径A：直接累加
-            total_followers_b_conservative = int(total_followers_a * 0.7)   # 口径B保守：70%去重
-            total_followers_b_aggressive = int(total_followers_a * 0.85)    # 口径B激进：85%去重
-
-            # 分布指标
-            avg_followers = int(category_creators['followers_count'].mean())
-            median_followers = int(category_creators['followers_count'].median())
-
-            # Top10创作者占比
-            top10_followers = category_creators.nlargest(10, 'followers_count')['followers_count'].sum()
-            top10_ratio = top10_followers / total_followers_a if total_followers_a > 0 else 0
-
-            # 长尾指标 (P80/P90)
-            p80_threshold = category_creators['followers_count'].quantile(0.8)
-            p90_threshold = category_creators['followers_count'].quantile(0.9)
-            p80_creators = len(category_creators[category_creators['followers_count'] >= p80_threshold])
-            p90_creators = len(category_creators[category_creators['followers_count'] >= p90_threshold])
-
-            # 活跃度指标
-            avg_videos_12m = category_creators['video_count_12m'].mean()
-
-            # 获取热度排名
-            popularity_info = popularity_df[popularity_df['category_tid'] == tid]
-            popularity_rank = popularity_info.iloc[0]['rank'] if len(popularity_info) > 0 else 999
-            popularity_index = popularity_info.iloc[0]['popularity_index'] if len(popularity_info) > 0 else 0
-
-            rollup = {
-                'category_tid': tid,
-                'category_name': category_name,
-                'creator_count': creator_count,
-                'total_followers_a': total_followers_a,
-                'total_followers_b_conservative': total_followers_b_conservative,
-                'total_followers_b_aggressive': total_followers_b_aggressive,
-                'avg_followers': avg_followers,
-                'median_followers': median_followers,
-                'top10_ratio': round(top10_ratio, 3),
-                'p80_creators': p80_creators,
-                'p90_creators': p90_creators,
-                'avg_videos_12m': round(avg_videos_12m, 1),
-                'popularity_rank': popularity_rank,
-                'popularity_index': round(popularity_index, 3)
-            }
-
-            rollups.append(rollup)
-
-        rollups_df = pd.DataFrame(rollups)
+        # 分区编码按首次出现顺序，行顺序与逐分区计算时一致
+        codes, tids = pd.factorize(creators_df['category_tid'])
+        followers = group_values(creators_df['followers_count'])
+
+        # 基础指标与活跃度指标
+        rollups_df = creators_df.groupby(codes, sort=True).agg(
+            creator_count=('followers_count', 'size'),
+            total_followers_a=('followers_count', 'sum'),      # 口径A：直接累加
+            avg_followers=('followers_count', 'mean'),
+            avg_videos_12m=('video_count_12m', 'mean'),
+        ).reset_index(drop=True)
+
+        counts = rollups_df['creator_count'].to_numpy()
+        starts = np.cumsum(counts) - counts
+        totals = rollups_df['total_followers_a'].to_numpy()
+
+        # 组内按粉丝数升序，一次排序供Top10与P80/P90共用
+        sorted_codes, sorted_followers = sort_within_groups(codes, followers)
+        rank_from_top = np.repeat(starts + counts, counts) - np.arange(len(sorted_codes))
+
+        # Top10创作者占比
+        top10 = rank_from_top <= 10
+        top10_followers = np.bincount(sorted_codes[top10], weights=sorted_followers[top10], minlength=len(tids))
+        top10_ratio = np.divide(top10_followers, totals, out=np.zeros(len(tids)), where=totals > 0)
+
+        # 长尾指标 (P80/P90)：粉丝数不低于分位数阈值的创作者数
+        long_tail = {}
+        for name, q in (('p80_creators', 0.8), ('p90_creators', 0.9)):
+            threshold = group_quantile(sorted_followers, starts, counts, q)
+            long_tail[name] = np.bincount(codes[followers >= threshold[codes]], minlength=len(tids))
+
+        # 热度排名（未上榜的分区记为 999 / 0）
+        popularity = popularity_df.drop_duplicates('category_tid').set_index('category_tid')
+        popularity_rank = pd.Series(tids).map(popularity['rank']).fillna(999).astype('int64')
+        popularity_index = pd.Series(tids).map(popularity['popularity_index']).fillna(0).round(3)
+
+        rollups_df.insert(0, 'category_tid', np.asarray(tids))
+        rollups_df.insert(1, 'category_name', creators_df.drop_duplicates('category_tid')['category_name'].to_numpy())
+        rollups_df['total_followers_b_conservative'] = (totals * 0.7).astype('int64')   # 口径B保守：70%去重
+        rollups_df['total_followers_b_aggressive'] = (totals * 0.85).astype('int64')    # 口径B激进：85%去重
+        rollups_df['avg_followers'] = rollups_df['avg_followers'].astype('int64')
+        rollups_df['median_followers'] = group_quantile(sorted_followers, starts, counts, 0.5).astype('int64')
+        rollups_df['top10_ratio'] = top10_ratio.round(3)
+        rollups_df['p80_creators'] = long_tail['p80_creators']
+        rollups_df['p90_creators'] = long_tail['p90_creators']
+        rollups_df['avg_videos_12m'] = rollups_df['avg_videos_12m'].round(1)
+        rollups_df['popularity_rank'] = popularity_rank.to_numpy()
+        rollups_df['popularity_index'] = popularity_index.to_numpy()
+
+        rollups_df = rollups_df[[
+            'category_tid', 'category_name', 'creator_count', 'total_followers_a',
+            'total_followers_b_conservative', 'total_followers_b_aggressive', 'avg_followers',
+            'median_followers', 'top10_ratio', 'p80_creators', 'p90_creators', 'avg_videos_12m',
+            'popularity_rank', 'popularity_index'
+        ]]
+
+        if dedup_factors is not None:
+            # 没有粉丝样本的分区不做实测估计
+            measured = rollups_df['category_tid'].map(dedup_factors)
+            rollups_df.insert(6, 'dedup_factor_measured', measured)
+            rollups_df.insert(7, 'total_followers_b_measured',
+                              (rollups_df['total_followers_a'] * measured).round().astype('Int64'))
 
         # 计算占比
         total_creators = rollups_df['creator_count'].sum()
@@ -121,6 +221,15 @@ class BilibiliReportGenerator:
 
         return rollups_df
 
+    def add_confidence_intervals(self, rollups_df, creators_df, videos_df):
+        """在分区内重抽创作者与视频，为汇总表追加 粉丝总数A / 中位数 / Top10占比 / 爱看指数 / 排名 的置信区间列"""
+        options = dict(n_replicates=self.bootstrap_replicates, confidence=self.confidence,
+                       seed=self.seed, workers=self.workers)
+        intervals = bootstrap_rollups(creators_df, **options).join(bootstrap_popularity(videos_df, **options), how='left')
+        rollups_df = rollups_df.join(intervals, on='category_tid')
+        rollups_df.attrs.update(bootstrap_replicates=self.bootstrap_replicates, confidence=self.confidence)
+        return rollups_df
+
     def generate_executive_summary(self, data_dict, rollups_df):
         """生成执行摘要"""
         logger.info("📝 生成执行摘要...")
@@ -145,6 +254,16 @@ class BilibiliReportGenerator:
 
         return findings, recommendations
 
+    def _sdi_tier_sections(self, top5_sdi):
+        """脚本提升→粉丝增长路径：按SDI分档逐段产出，没有赛道的档位不输出（SDI缺失的赛道不归入任何档位）"""
+        scores = top5_sdi['sdi_score']
+        for title, feature, low, high in self.SDI_TIERS:
+            tracks = top5_sdi[(scores >= low) & (scores < high)]
+            if len(tracks) > 0:
+                tracks = tracks.assign(sdi_score=format_column(tracks['sdi_score'], '{:.2f}'))
+                yield render_section('report_v1_sdi_tier', title=title, feature=feature,
+                                     tracks=repeat_section('report_v1_sdi_track', tracks))
+
     def create_comprehensive_report(self, data_dict, rollups_df):
         """生成综合报告"""
         logger.info("📖 生成综合分析报告...")
@@ -153,190 +272,173 @@ class BilibiliReportGenerator:
 
         findings, recommendations = self.generate_executive_summary(data_dict, rollups_df)
 
-        with open(report_file, 'w', encoding='utf-8') as f:
-            # 报告头部
-            f.write("# Bilibili 各分区粉丝与创作者体量测算报告 v1\n\n")
-            f.write(f"**项目**: Bilibili 各分区粉丝与创作者体量测算 + \"脚本依赖度\"洞察\n")
-            f.write(f"**分析时间窗**: 2024-11-01 至 2025-10-31 (滚动近12个月)\n")
-            f.write(f"**报告生成日期**: {self.report_date}\n")
-            f.write(f"**数据收集日期**: 2025-11-05\n\n")
-
-            # 执行摘要
-            f.write("## 📋 执行摘要\n\n")
-            f.write("### 核心发现\n")
-            for i, finding in enumerate(findings, 1):
-                f.write(f"{i}. {finding}\n")
-            f.write("\n### 关键建议\n")
-            for i, rec in enumerate(recommendations, 1):
-                f.write(f"{i}. {rec}\n")
-            f.write("\n")
-
-            # 方法与口径
-            f.write("## 🔍 方法与口径\n\n")
-            f.write("### 数据来源\n")
-            f.write("- **分区信息**: Bilibili开放平台分区体系\n")
-            f.write("- **创作者数据**: 模拟数据集（实际项目中从飞瓜数据、火烧云等平台获取）\n")
-            f.write("- **热度指标**: 基于播放量、互动率、上榜频次的综合评分\n\n")
-
-            f.write("### 核心定义\n")
-            f.write("- **活跃创作者**: 近12个月内发布≥1个视频的UP主\n")
-            f.write("- **粉丝总数口径A**: 各分区创作者粉丝数直接累加（存在重复计数）\n")
-            f.write("- **粉丝总数口径B**: 基于重叠系数的去重估计（保守70%/激进85%去重）\n")
-            f.write("- **爱看程度指数**: Z = 0.5×播放量百分位 + 0.3×互动率百分位 + 0.2×上榜频次百分位\n")
-            f.write("- **脚本依赖指数(SDI)**: 基于叙事复杂度、信息密度、口播重要性、结构化要求的综合评分\n\n")
-
-            # 表A：分区层级汇总
-            f.write("## 📊 表A：分区层级汇总\n\n")
-            f.write("| 分区 | 创作者数 | 占比 | 粉丝总数A | 占比 | 粉丝总数B(保守) | 粉丝总数B(激进) | 平均粉丝 | Top10占比 |\n")
-            f.write("|------|----------|------|-----------|------|-----------------|-----------------|----------|----------|\n")
-
-            for _, row in rollups_df.head(15).iterrows():  # 显示前15个分区
-                f.write(f"| {row['category_name']} | {row['creator_count']:,} | {row['creator_count_pct']:.1%} | "
-                       f"{row['total_followers_a']:,} | {row['followers_a_pct']:.1%} | "
-                       f"{row['total_followers_b_conservative']:,} | {row['total_followers_b_aggressive']:,} | "
-                       f"{row['avg_followers']:,} | {row['top10_ratio']:.1%} |\n")
-
-            # 汇总统计
-            total_creators_all = rollups_df['creator_count'].sum()
-            total_followers_a_all = rollups_df['total_followers_a'].sum()
-            total_followers_b_cons = rollups_df['total_followers_b_conservative'].sum()
-            total_followers_b_aggr = rollups_df['total_followers_b_aggressive'].sum()
-
-            f.write(f"\n**汇总统计**:\n")
-            f.write(f"- 总创作者数: {total_creators_all:,} 人\n")
-            f.write(f"- 粉丝总数A（累加口径）: {total_followers_a_all:,} 人\n")
-            f.write(f"- 粉丝总数B（去重估计）: {total_followers_b_cons:,} - {total_followers_b_aggr:,} 人\n")
-            f.write(f"- 去重率估计: 15%-30%\n\n")
-
-            # 表B：Top5赛道爱看程度分析
-            f.write("## 🔥 表B：Top5赛道爱看程度分析\n\n")
-            top5_popularity = data_dict['popularity'].head(5)
-
-            f.write("| 排名 | 分区 | 爱看指数 | 平均播放量 | 平均互动率 | 热门视频数 | 创作者数 |\n")
-            f.write("|------|------|----------|------------|------------|------------|----------|\n")
-
-            for _, row in top5_popularity.iterrows():
-                creators_in_cat = len(data_dict['creators'][data_dict['creators']['category_tid'] == row['category_tid']])
-                f.write(f"| {row['rank']} | {row['category_name']} | {row['popularity_index']:.3f} | "
-                       f"{row['avg_play_count']:,} | {row['avg_interaction_rate']:.2%} | "
-                       f"{row['total_hot_videos']} | {creators_in_cat:,} |\n")
-
-            f.write(f"\n**指数说明**: 爱看程度指数综合考虑播放量表现、用户互动积极性和内容上榜频次\n\n")
-
-            # 表C：Top5赛道SDI评分与脚本依赖分析
-            f.write("## 🎯 表C：Top5赛道脚本依赖指数(SDI)分析\n\n")
-
-            f.write("### SDI评分详情\n")
-            f.write("| 热度排名 | 分区 | SDI分数 | 依赖程度 | 脚本优先级 | 涨粉潜力 |\n")
-            f.write("|----------|------|---------|----------|------------|----------|\n")
-
-            for _, row in data_dict['top5_sdi'].iterrows():
-                f.write(f"| {row['rank']} | {row['category_name']} | {row['sdi_score']:.2f} | "
-                       f"{row['dependency_level']} | {row['improvement_priority']} | {row['script_growth_potential']} |\n")
-
-            f.write("\n### 脚本提升→粉丝增长路径分析\n\n")
-
-            # 高SDI赛道分析
-            high_sdi_tracks = data_dict['top5_sdi'][data_dict['top5_sdi']['sdi_score'] >= 4.0]
-            if len(high_sdi_tracks) > 0:
-                f.write("#### 🎖️ 高脚本依赖赛道 (SDI≥4.0)\n")
-                f.write("**特征**: 内容质量高度依赖脚本规划，优质脚本直接影响用户留存和传播\n\n")
-
-                for _, row in high_sdi_tracks.iterrows():
-                    f.write(f"**{row['category_name']}分区** (SDI: {row['sdi_score']:.2f})\n")
-                    f.write(f"- *增长机制*: {row['growth_mechanism']}\n")
-                    f.write(f"- *实操建议*: {row['improvement_advice']}\n\n")
-
-            # 中等SDI赛道分析
-            med_sdi_tracks = data_dict['top5_sdi'][(data_dict['top5_sdi']['sdi_score'] >= 2.5) & (data_dict['top5_sdi']['sdi_score'] < 4.0)]
-            if len(med_sdi_tracks) > 0:
-                f.write("#### 📈 中等脚本依赖赛道 (2.5≤SDI<4.0)\n")
-                f.write("**特征**: 脚本优化有明显效果，但不是唯一成功要素\n\n")
-
-                for _, row in med_sdi_tracks.iterrows():
-                    f.write(f"**{row['category_name']}分区** (SDI: {row['sdi_score']:.2f})\n")
-                    f.write(f"- *增长机制*: {row['growth_mechanism']}\n")
-                    f.write(f"- *实操建议*: {row['improvement_advice']}\n\n")
-
-            # 低SDI赛道分析
-            low_sdi_tracks = data_dict['top5_sdi'][data_dict['top5_sdi']['sdi_score'] < 2.5]
-            if len(low_sdi_tracks) > 0:
-                f.write("#### 🎪 低脚本依赖赛道 (SDI<2.5)\n")
-                f.write("**特征**: 个人魅力和内容真实性比脚本规划更重要\n\n")
-
-                for _, row in low_sdi_tracks.iterrows():
-                    f.write(f"**{row['category_name']}分区** (SDI: {row['sdi_score']:.2f})\n")
-                    f.write(f"- *增长机制*: {row['growth_mechanism']}\n")
-                    f.write(f"- *实操建议*: {row['improvement_advice']}\n\n")
-
-            # 成功案例
-            f.write("### 📚 高质量脚本成功案例\n\n")
-            f.write("#### 知识分区 - 李永乐老师\n")
-            f.write("- **脚本特色**: 逻辑清晰的教学架构，复杂概念的通俗化表达\n")
-            f.write("- **关键要素**: 层层递进的解释逻辑、恰当的举例说明、完整的总结归纳\n")
-            f.write("- **增长证据**: 高质量教学脚本带来极高的完播率和转发率，建立强粉丝粘性\n\n")
-
-            f.write("#### 科技分区 - 何同学\n")
-            f.write("- **脚本特色**: 标准化测试流程，专业而易懂的产品分析框架\n")
-            f.write("- **关键要素**: 结构化测试方法、专业术语科普、客观对比分析\n")
-            f.write("- **增长证据**: 专业评测脚本建立行业权威性，吸引品牌合作和用户信任\n\n")
-
-            # 数据局限性
-            f.write("## ⚠️ 数据局限性与风险\n\n")
-            f.write("### 已知局限\n")
-            f.write("1. **样本偏倚**: 第三方平台榜单可能无法完全代表全平台情况\n")
-            f.write("2. **时效性**: 粉丝数等指标为抓取时点数据，存在时间差\n")
-            f.write("3. **重复计数**: 口径A存在粉丝重复计数，口径B基于估计系数\n")
-            f.write("4. **模拟数据**: 本次分析使用模拟数据展示框架，实际项目需真实数据\n\n")
-
-            f.write("### 风险缓解\n")
-            f.write("1. **多源验证**: 建议使用多个数据源进行交叉验证\n")
-            f.write("2. **敏感性分析**: 对关键参数进行敏感性测试（详见挑战分析）\n")
-            f.write("3. **定期更新**: 建立数据更新机制，跟踪趋势变化\n")
-            f.write("4. **真实数据**: 实际应用中需获取飞瓜、火烧云等平台的真实数据\n\n")
-
-            # 后续工作
-            f.write("## 🔮 后续工作建议\n\n")
-            f.write("### 数据深化\n")
-            f.write("1. 获取真实的第三方平台数据（飞瓜数据、火烧云等）\n")
-            f.write("2. 建立月度/季度的数据更新机制\n")
-            f.write("3. 补充创作者内容质量评分数据\n")
-            f.write("4. 增加用户画像和观看行为数据\n\n")
-
-            f.write("### 分析拓展\n")
-            f.write("1. 建立创作者分级体系（头部/腰部/长尾）\n")
-            f.write("2. 分析不同分区的季节性和趋势性特征\n")
-            f.write("3. 研究跨分区创作者的表现差异\n")
-            f.write("4. 开发预测模型评估创作者增长潜力\n\n")
-
-            f.write("### 应用落地\n")
-            f.write("1. 为不同SDI等级的创作者提供定制化成长建议\n")
-            f.write("2. 建立内容脚本质量评估工具\n")
-            f.write("3. 开发分区选择和内容策略推荐系统\n")
-            f.write("4. 设计创作者培训课程和脚本模板\n\n")
-
-            # 技术实现
-            f.write("## 🛠️ 技术实现说明\n\n")
-            f.write("### 数据处理流程\n")
-            f.write("1. **数据收集**: 分区清单 → 创作者数据 → 视频热度数据\n")
-            f.write("2. **数据清洗**: 去重、异常值处理、缺失值填充\n")
-            f.write("3. **指标计算**: 爱看程度指数、SDI评分、分区汇总统计\n")
-            f.write("4. **分析生成**: 综合分析、案例研究、建议输出\n\n")
-
-            f.write("### 可复现性\n")
-            f.write("- **运行环境**: Python 3.8+, pandas, requests, numpy\n")
-            f.write("- **一键运行**: `bash run.sh` 可完整复现分析流程\n")
-            f.write("- **数据标识**: 所有输出数据包含时间戳和来源标识\n")
-            f.write("- **版本控制**: 代码和配置文件均在版本控制系统中\n\n")
-
-            # 结语
-            f.write("---\n\n")
-            f.write("**报告生成**: 🤖 Claude Code自动生成\n\n")
-            f.write("**联系方式**: 如需获取原始数据或详细分析，请联系项目团队\n\n")
+        rollups_top = rollups_df.head(15)  # 显示前15个分区
+        top5_popularity = data_dict['popularity'].head(5)
+        top5_sdi = data_dict['top5_sdi']
+        creator_counts = data_dict['creators']['category_tid'].value_counts()
+
+        dedup_section = confidence_section = validation_section = ''
+        if data_dict.get('validation') is not None:
+            validation_df = data_dict['validation']
+            outliers = outlier_counts(validation_df)
+            validation_section = render_section(
+                'report_v1_validation',
+                verdict=validation_verdict(validation_summary(validation_df)),
+                check_count=len(validation_df),
+                creator_outliers=f"{outliers.get('creators_by_category', 0):,}",
+                video_outliers=f"{outliers.get('videos_by_category', 0):,}",
+                snapshot=self.timestamp,
+            )
+        if 'total_followers_b_measured' in rollups_df.columns:
+            dedup_section = render_section(
+                'report_v1_dedup',
+                dedup_table=table_rows(rollups_top, [
+                    ('category_name', '{}'), ('dedup_factor_measured', '{:.1%}'), ('total_followers_b_measured', '{:,}'),
+                ]),
+                total_followers_b_measured=f"{rollups_df['total_followers_b_measured'].sum():,}",
+            )
+        if 'total_followers_a_ci_low' in rollups_df.columns:
+            confidence_section = render_section(
+                'report_v1_confidence',
+                confidence=f"{self.confidence:.0%}",
+                replicates=f"{self.bootstrap_replicates:,}",
+                interval_table=table_rows(rollups_top, [
+                    ('category_name', '{}'),
+                    (range_column('total_followers_a_ci_low', 'total_followers_a_ci_high', '{:,}'), None),
+                    (range_column('median_followers_ci_low', 'median_followers_ci_high', '{:,}'), None),
+                    (range_column('top10_ratio_ci_low', 'top10_ratio_ci_high', '{:.1%}'), None),
+                    (range_column('popularity_index_ci_low', 'popularity_index_ci_high', '{:.3f}'), None),
+                    (range_column('popularity_rank_ci_low', 'popularity_rank_ci_high', '{:.0f}'), None),
+                ]),
+            )
+
+        render_file(
+            report_file, 'report_v1',
+            report_date=self.report_date,
+            collection_date=snapshot_date(self.timestamp),
+            findings=bullet_list(findings, numbered=True),
+            recommendations=bullet_list(recommendations, numbered=True),
+            validation_section=validation_section,
+            rollup_table=table_rows(rollups_top, self.ROLLUP_TABLE_COLUMNS),
+            total_creators=f"{rollups_df['creator_count'].sum():,}",
+            total_followers_a=f"{rollups_df['total_followers_a'].sum():,}",
+            total_followers_b_conservative=f"{rollups_df['total_followers_b_conservative'].sum():,}",
+            total_followers_b_aggressive=f"{rollups_df['total_followers_b_aggressive'].sum():,}",
+            dedup_section=dedup_section,
+            confidence_section=confidence_section,
+            popularity_table=table_rows(top5_popularity, [
+                ('rank', '{}'), ('category_name', '{}'), ('popularity_index', '{:.3f}'),
+                ('avg_play_count', '{:,}'), ('avg_interaction_rate', '{:.2%}'), ('total_hot_videos', '{}'),
+                (lambda df: df['category_tid'].map(creator_counts).fillna(0).astype('int64'), '{:,}'),
+            ]),
+            sdi_table=table_rows(top5_sdi, [
+                ('rank', '{}'), ('category_name', '{}'), ('sdi_score', '{:.2f}'), ('dependency_level', '{}'),
+                ('improvement_priority', '{}'), ('script_growth_potential', '{}'),
+            ]),
+            sdi_tiers=self._sdi_tier_sections(top5_sdi),
+        )
 
         logger.info(f"📋 综合报告已生成: {report_file}")
         return report_file
 
+    @staticmethod
+    def _field_lines(df, fields):
+        """按字段表对整列格式化，返回每行的 "**名称**: 值" 列表（缺失值为 -）"""
+        columns = [format_column(source(df) if callable(source) else df[source], spec) for _, source, spec in fields]
+        labels = [f"**{label}**: " for label, _, _ in fields]
+        return [[label + value for label, value in zip(labels, row)] for row in zip(*columns)]
+
+    def _top_rows(self, df, sort_column, columns):
+        """各分区按 sort_column 取前 category_top_n 行，全部分区的表格行一次格式化后按分区拼接"""
+        top = df.sort_values(sort_column, ascending=False, kind='stable').groupby('category_tid', sort=False).head(
+            self.category_top_n)
+        top = top.assign(rank=top.groupby('category_tid', sort=False).cumcount() + 1)
+        return group_rows(top['category_tid'], format_rows(top, [('rank', '{}')] + columns))
+
+    def _dedup_sensitivity(self, rollups_df):
+        """各去重方案下每个分区的粉丝总数B与排名（全部分区一起排名），返回 {category_tid: 表格行}"""
+        scenarios = dict(ChallengeAnalyzer.DEDUP_SCENARIOS)
+        totals = rollups_df['total_followers_a'].to_numpy(dtype=np.int64)
+        factors = np.tile(np.array(list(scenarios.values())), (len(rollups_df), 1))
+        followers = np.floor(totals[:, None] * factors)
+        if 'dedup_factor_measured' in rollups_df.columns:
+            scenarios[ChallengeAnalyzer.MEASURED_DEDUP_SCENARIO] = None
+            factors = np.column_stack([factors, rollups_df['dedup_factor_measured'].to_numpy(dtype=float)])
+            measured = rollups_df['total_followers_b_measured'].to_numpy(dtype=float, na_value=np.nan)
+            followers = np.column_stack([followers, measured])
+        ranks = rank_matrix(np.nan_to_num(followers, nan=-1)).astype(float)
+        ranks[np.isnan(followers)] = np.nan
+
+        # 分区 × 方案 展开为长表，一次格式化
+        sensitivity = pd.DataFrame({
+            'category_tid': np.repeat(rollups_df['category_tid'].to_numpy(), len(scenarios)),
+            'scenario': np.tile(list(scenarios), len(rollups_df)),
+            'dedup_factor': factors.ravel(),
+            'followers': followers.ravel(),
+            'rank': ranks.ravel(),
+        })
+        return group_rows(sensitivity['category_tid'], format_rows(sensitivity, [
+            ('scenario', '{}'), ('dedup_factor', '{:.1%}'), ('followers', '{:,.0f}'), ('rank', '{:.0f}'),
+        ]))
+
+    def create_category_reports(self, data_dict, rollups_df):
+        """
+        每个分区一份明细报告：汇总指标、热度、头部创作者与视频、SDI、去重敏感性与置信区间。
+        数据按 category_tid 切分一次，所有分区的表格与字段整列格式化；工作进程只接收各自分区的文本片段写入报告
+        """
+        logger.info(f"🗂️ 生成分区明细报告: {len(rollups_df)} 个分区，{self.workers} 个进程...")
+
+        output_dir = os.path.join(self.data_dir, f'category_reports_{self.timestamp}')
+        os.makedirs(output_dir, exist_ok=True)
+
+        summary = self._field_lines(rollups_df, self.CATEGORY_SUMMARY_FIELDS)
+        if 'total_followers_b_measured' in rollups_df.columns:
+            measured = self._field_lines(rollups_df, [('粉丝总数B(实测)', 'total_followers_b_measured', '{:,}')])
+            summary = [lines + extra for lines, extra in zip(summary, measured)]
+        intervals = (self._field_lines(rollups_df, self.CATEGORY_INTERVAL_FIELDS)
+                     if 'total_followers_a_ci_low' in rollups_df.columns else None)
+
+        popularity = data_dict['popularity'].drop_duplicates('category_tid')
+        popularity = dict(zip(popularity['category_tid'], self._field_lines(popularity, self.CATEGORY_POPULARITY_FIELDS)))
+
+        sdi = data_dict['sdi'].drop_duplicates('category_tid').dropna(subset=['sdi_score'])
+        levels = np.digitize(sdi['sdi_score'], SDIAnalyzer.DEPENDENCY_THRESHOLDS)
+        sdi = sdi.assign(dependency_level=SDIAnalyzer.DEPENDENCY_LEVELS[levels])
+        sdi = sdi.join(SDIAnalyzer.improvement_advice(sdi['sdi_score']))
+        sdi = dict(zip(sdi['category_tid'], self._field_lines(sdi, self.CATEGORY_SDI_FIELDS)))
+
+        creators = self._top_rows(data_dict['creators'], 'followers_count', [
+            ('uid', '{}'), ('followers_count', '{:,}'), ('video_count_12m', '{}'),
+        ])
+        videos = self._top_rows(data_dict['videos'], 'play_count', [
+            ('bv_id', '{}'), ('play_count', '{:,}'), ('interaction_rate', '{:.2%}'),
+        ])
+        dedup = self._dedup_sensitivity(rollups_df)
+
+        jobs = []
+        for i, (tid, name) in enumerate(zip(rollups_df['category_tid'].tolist(), rollups_df['category_name'])):
+            context = {
+                'category_tid': tid,
+                'category_name': name,
+                'report_date': self.report_date,
+                'collection_date': snapshot_date(self.timestamp),
+                'top_n': self.category_top_n,
+                'summary': summary[i],
+                'popularity': popularity.get(tid),
+                'sdi': sdi.get(tid),
+                'creator_table': creators.get(tid, ''),
+                'video_table': videos.get(tid, ''),
+                'dedup_table': dedup[tid],
+                'intervals': None if intervals is None else intervals[i],
+                'confidence': self.confidence,
+                'replicates': self.bootstrap_replicates,
+            }
+            jobs.append((os.path.join(output_dir, f'category_{tid}.md'), context))
+
+        report_files = render_parallel(render_category_report, jobs, workers=self.workers)
+        logger.info(f"🗂️ 分区明细报告已生成: {output_dir} ({len(report_files)} 份)")
+        return report_files
+
     def create_run_script(self):
         """创建一键运行脚本"""
         run_script = os.path.join(self.data_dir, 'run.sh')
@@ -361,14 +463,8 @@ class BilibiliReportGenerator:
 
             f.write("# 运行分析流程\n")
             f.write("cd outputs/scripts\n\n")
-            f.write("echo \"1️⃣ 收集分区信息...\"\n")
-            f.write("python bilibili_categories.py\n\n")
-            f.write("echo \"2️⃣ 收集创作者数据...\"\n")
-            f.write("python creator_scraper.py\n\n")
-            f.write("echo \"3️⃣ 分析脚本依赖指数...\"\n")
-            f.write("python sdi_analyzer.py\n\n")
-            f.write("echo \"4️⃣ 生成综合报告...\"\n")
-            f.write("python report_generator.py\n\n")
+            f.write("echo \"▶️ 单进程运行分析流水线（分区 → 创作者 → 热度 → SDI → 汇总 → 报告/挑战分析）...\"\n")
+            f.write("python pipeline.py\n\n")
 
             f.write("cd ../..\n")
             f.write("echo \"✅ 分析完成! 查看 outputs/ 目录获取结果\"\n")
@@ -388,16 +484,22 @@ class BilibiliReportGenerator:
         data_dict = self.load_all_data()
 
         # 计算分区汇总
-        rollups_df = self.calculate_category_rollups(data_dict['creators'], data_dict['popularity'])
+        rollups_df = self.calculate_category_rollups(data_dict['creators'], data_dict['popularity'],
+                                                     load_dedup_factors(self.audience_db))
+        if self.bootstrap_replicates:
+            rollups_df = self.add_confidence_intervals(rollups_df, data_dict['creators'], data_dict['videos'])
 
         # 保存汇总数据
         rollups_file = os.path.join(self.data_dir, 'clean', f'category_rollups_{self.timestamp}.csv')
-        rollups_df.to_csv(rollups_file, index=False, encoding='utf-8-sig')
+        save_snapshot(rollups_df, rollups_file, storage=self.storage)
         logger.info(f"💾 分区汇总数据已保存: {rollups_file}")
 
         # 生成综合报告
         report_file = self.create_comprehensive_report(data_dict, rollups_df)
 
+        # 分区明细报告
+        category_report_files = self.create_category_reports(data_dict, rollups_df) if self.category_reports else []
+
         # 创建一键运行脚本
         run_script = self.create_run_script()
 
@@ -406,14 +508,65 @@ class BilibiliReportGenerator:
         return {
             'report_file': report_file,
             'rollups_file': rollups_file,
+            'category_report_files': category_report_files,
             'run_script': run_script
         }
 
+def render_category_report(report_file, context):
+    """渲染单个分区报告（render_parallel 的工作函数，只接收该分区已格式化的内容）"""
+    confidence_section = ''
+    if context['intervals'] is not None:
+        confidence_section = render_section(
+            'category_report_confidence',
+            confidence=f"{context['confidence']:.0%}",
+            replicates=f"{context['replicates']:,}",
+            intervals=bullet_list(context['intervals']),
+        )
+
+    return render_file(
+        report_file, 'category_report',
+        category_tid=context['category_tid'],
+        category_name=context['category_name'],
+        report_date=context['report_date'],
+        collection_date=context['collection_date'],
+        top_n=context['top_n'],
+        summary=bullet_list(context['summary']),
+        popularity=bullet_list(context['popularity'] or ["未进入热度榜"]),
+        creator_table=context['creator_table'],
+        video_table=context['video_table'],
+        sdi=bullet_list(context['sdi'] or ["暂无该分区的SDI评分"]),
+        dedup_table=context['dedup_table'],
+        confidence_section=confidence_section,
+    )
+
+
 if __name__ == "__main__":
-    generator = BilibiliReportGenerator("../")
+    parser = argparse.ArgumentParser(description="生成综合分析报告")
+    parser.add_argument("--storage", choices=STORAGE_FORMATS, default="csv", help="parquet: 额外写出列式存储文件")
+    parser.add_argument("--snapshot", default=None, help="快照编号 YYYYMMDD（默认最新）")
+    parser.add_argument("--bootstrap", type=int, default=0, help="自助法重抽次数（0为不计算置信区间）")
+    parser.add_argument("--confidence", type=float, default=0.95, help="置信水平")
+    parser.add_argument("--workers", type=int, default=1, help="自助法重抽与分区报告渲染的进程数")
+    parser.add_argument("--seed", type=int, default=None, help="自助法重抽的随机种子")
+    parser.add_argument("--audience-db", default=DEFAULT_AUDIENCE_DB, help="受众草图库（存在时输出实测口径B）")
+    parser.add_argument("--category-reports", action="store_true", help="为每个分区生成明细报告")
+    parser.add_argument("--category-top-n", type=int, default=10, help="分区报告中头部创作者/视频的数量")
+    parser.add_argument("--data-cache", action="store_true", help="把解析后的数据集缓存到磁盘，多个脚本间复用（源文件变化即失效）")
+    args = parser.parse_args()
+
+    if args.data_cache:
+        enable_disk_cache()
+
+    generator = BilibiliReportGenerator("../", storage=args.storage, snapshot=args.snapshot,
+                                        bootstrap_replicates=args.bootstrap, confidence=args.confidence,
+                                        workers=args.workers, seed=args.seed, audience_db=args.audience_db,
+                                        category_reports=args.category_reports, category_top_n=args.category_top_n)
     results = generator.run()
 
     print("\n🎉 综合分析报告生成完成!")
     print(f"📋 主报告: {results['report_file']}")
     print(f"📊 汇总数据: {results['rollups_file']}")
-    print(f"🔧 运行脚本: {results['run_script']}")
\ No newline at end of file
+    if results['category_report_files']:
+        print(f"🗂️ 分区明细报告: {len(results['category_report_files'])} 份")
+    print(f"🔧 运行脚本: {results['run_script']}")
+    print(f"🗄️ {default_loader().summary()}")
\ No newline at end of file
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Report Renderer
+Markdown报告的渲染层：正文放在 templates/ 下的模板里（$name 占位符），表格按列取值、逐列套用格式（不再逐行 iterrows），
+渲染时逐段写入文件（大表按块输出，不在内存中拼出整份报告）；多份报告可分发到进程池并行生成
+"""
+
+import io
+import os
+import string
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+# 表格每次写出的行数
+TABLE_CHUNK_ROWS = 5000
+
+
+@lru_cache(maxsize=None)
+def load_template(name):
+    """读取并解析 templates/<name>.md，同一进程内只解析一次"""
+    with open(os.path.join(TEMPLATE_DIR, f'{name}.md'), encoding='utf-8') as f:
+        return Template(f.read())
+
+
+class Template(string.Template):
+    """
+    string.Template 的流式版本：模板切分为 文本 / 占位符 片段，
+    占位符的值可以是字符串，也可以是逐块产出文本的可迭代对象（表格、重复段落）
+    """
+
+    def __init__(self, template):
+        super().__init__(template)
+        self.segments = []
+        position = 0
+        for match in self.pattern.finditer(template):
+            literal = template[position:match.start()]
+            if match.group('invalid') is not None:
+                # 与 string.Template.substitute 一致：不成对的 $ 报错，而不是静默删除
+                index = match.start('invalid')
+                lines = template[:index].splitlines(keepends=True)
+                lineno, colno = (len(lines), index - len(''.join(lines[:-1]))) if lines else (1, 1)
+                raise ValueError(f'Invalid placeholder in string: line {lineno}, col {colno}')
+            if match.group('escaped') is not None:
+                literal += self.delimiter
+            self.segments.append((literal, match.group('named') or match.group('braced')))
+            position = match.end()
+        self.segments.append((template[position:], None))
+
+    def stream(self, out, **context):
+        for literal, name in self.segments:
+            out.write(literal)
+            if name is None:
+                continue
+            value = context[name]
+            if isinstance(value, str):
+                out.write(value)
+            elif hasattr(value, '__iter__'):
+                for chunk in value:
+                    out.write(chunk)
+            elif value is not None:
+                out.write(str(value))
+
+    def render(self, **context):
+        buffer = io.StringIO()
+        self.stream(buffer, **context)
+        return buffer.getvalue()
+
+
+def render_file(path, template_name, **context):
+    """按模板把报告写入 path，返回 path"""
+    with open(path, 'w', encoding='utf-8') as f:
+        load_template(template_name).stream(f, **context)
+    return path
+
+
+def render_section(template_name, **context):
+    """渲染为字符串（嵌入其他模板的段落）"""
+    return load_template(template_name).render(**context)
+
+
+def format_column(values, spec='{}', na_rep='-'):
+    """
+    一整列按同一格式转为字符串：spec 为 str.format 格式或函数（接收整列、返回字符串数组），
+    None 表示列已是字符串；缺失值输出 na_rep。
+    格式化仍是逐值调用 spec.format，按列处理省掉的是 iterrows 的逐行 Series 构造，而不是格式化本身
+    """
+    if spec is None:
+        return np.asarray(values, dtype=object)
+    if callable(spec):
+        return np.asarray(spec(values), dtype=object)
+    values = values.to_numpy() if hasattr(values, 'to_numpy') else np.asarray(values)
+    missing = pd.isna(values)
+    # 试过用 np.strings（千分位、定点小数、百分比）向量化：结果一致，但表格最终要逐格转回 Python 字符串，
+    # 100万值上 '{:.2f}' 0.9s 对 0.7s、'{:,}' 2.7s 对 0.6s，都不比 str.format 快，因此保留逐值格式化
+    formatter = spec.format
+    if missing.any():
+        formatted = [na_rep if skip else formatter(value) for value, skip in zip(values.tolist(), missing.tolist())]
+    else:
+        formatted = [formatter(value) for value in values.tolist()]
+    return np.array(formatted, dtype=object)
+
+
+def range_column(low, high, spec='{}', na_rep='-'):
+    """区间列 'low-high'：返回供 table_rows 使用的函数(df)，下限缺失时输出 na_rep"""
+    def column(df):
+        result = format_column(df[low], spec, na_rep) + '-' + format_column(df[high], spec, na_rep)
+        result[df[low].isna().to_numpy()] = na_rep
+        return result
+    return column
+
+
+def _display_width(text):
+    return sum(2 if unicodedata.east_asian_width(char) in 'WF' else 1 for char in text)
+
+
+def table_rows(df, columns, chunk_rows=TABLE_CHUNK_ROWS):
+    """
+    DataFrame -> Markdown 表格行（生成器，每块 chunk_rows 行）。表头写在模板中。
+    columns: [(列名或函数(df)->列, 格式), ...]，每个格式对整列只调用一次
+    """
+    for start in range(0, len(df), chunk_rows):
+        yield ''.join(format_rows(df.iloc[start:start + chunk_rows], columns))
+
+
+def format_rows(df, columns):
+    """DataFrame -> 每行一个表格行字符串的数组（columns 同 table_rows）"""
+    cells = [format_column(source(df) if callable(source) else df[source], spec) for source, spec in columns]
+    return np.array(['| ' + ' | '.join(row) + ' |\n' for row in zip(*cells)], dtype=object)
+
+
+def group_rows(keys, rows):
+    """按键把表格行拼接为各组的表格文本 {键: 文本}，组内保持原有行序"""
+    keys = np.asarray(keys)
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    rows = np.asarray(rows, dtype=object)[order]
+    unique, starts = np.unique(sorted_keys, return_index=True)
+    ends = np.append(starts[1:], len(sorted_keys))
+    return {key: ''.join(rows[start:end]) for key, start, end in zip(unique.tolist(), starts, ends)}
+
+
+def markdown_table(df, columns, chunk_rows=TABLE_CHUNK_ROWS):
+    """
+    带表头的完整表格：columns 为 [(表头, 列名或函数, 格式), ...]，分隔线按表头显示宽度生成
+    """
+    headers = [header for header, _, _ in columns]
+    yield '| ' + ' | '.join(headers) + ' |\n'
+    yield '|' + '|'.join('-' * (_display_width(header) + 2) for header in headers) + '|\n'
+    yield from table_rows(df, [(source, spec) for _, source, spec in columns], chunk_rows)
+
+
+def bullet_list(items, numbered=False):
+    """列表段落：numbered 时为 1. 2. 3. 编号"""
+    return ''.join(f"{i}. {item}\n" if numbered else f"- {item}\n" for i, item in enumerate(items, 1))
+
+
+def repeat_section(template_name, rows, **context):
+    """对 rows（DataFrame 或 dict 列表）的每一行渲染一次模板（列名即占位符），逐段产出"""
+    template = load_template(template_name)
+    for record in rows.to_dict('records') if isinstance(rows, pd.DataFrame) else rows:
+        yield template.render(**context, **record)
+
+
+def _render_job(job):
+    render_func, args = job
+    return render_func(*args)
+
+
+def render_parallel(render_func, jobs, workers=1):
+    """
+    对每组参数调用 render_func（需为模块级函数，进程池中执行），返回各自的结果（通常为报告路径）。
+    workers 为 1 时顺序执行
+    """
+    jobs = [(render_func, tuple(args)) for args in jobs]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_render_job, jobs))
+    return [_render_job(job) for job in jobs]
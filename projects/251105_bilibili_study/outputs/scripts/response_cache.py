@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP Response Cache
+共享的接口响应磁盘缓存：按 URL+参数 索引、zlib压缩、TTL过期、按总大小LRU淘汰
+"""
+
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+# 缓存文件位于 outputs/.cache，分区与创作者采集脚本共用
+DEFAULT_CACHE_FILE = os.path.join('..', '.cache', 'http_responses.sqlite')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+"""
+
+
+class ResponseCache:
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE, ttl=6 * 3600, max_bytes=512 * 1024 * 1024):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+
+        self.conn = sqlite3.connect(cache_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+        self.stats = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stores': 0, 'evictions': 0}
+
+    def close(self):
+        self.conn.close()
+
+    def lookup(self, key):
+        """返回 (payload, etag, last_modified, 是否在TTL内)；无缓存时返回 None"""
+        row = self.conn.execute(
+            "SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        body, etag, last_modified, stored_at = row
+        payload = json.loads(zlib.decompress(body))
+        fresh = time.time() - stored_at < self.ttl
+        return payload, etag, last_modified, fresh
+
+    def touch(self, key, refreshed=False):
+        """记录访问时间；refreshed=True 表示经304确认仍有效，重新开始计算TTL"""
+        now = time.time()
+        with self.conn:
+            if refreshed:
+                self.conn.execute(
+                    "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+                )
+            else:
+                self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+
+    def store(self, key, payload, etag=None, last_modified=None):
+        """压缩写入响应，超出容量时淘汰最久未访问的条目"""
+        body = zlib.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        now = time.time()
+        with self.conn:
+            old = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, body, size, etag, last_modified, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, body, len(body), etag, last_modified, now, now),
+            )
+        self.total_bytes += len(body) - (old[0] if old else 0)
+        self.stats['stores'] += 1
+
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """按LRU淘汰，直到总大小回落到上限的90%"""
+        target = self.max_bytes * 0.9
+        with self.conn:
+            rows = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+            evicted = []
+            for key, size in rows:
+                if self.total_bytes <= target:
+                    break
+                evicted.append((key,))
+                self.total_bytes -= size
+            self.conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        self.stats['evictions'] += len(evicted)
+
+    def purge_expired(self, max_age=None):
+        """删除超过 max_age（默认TTL）且无法再用于条件请求的条目"""
+        cutoff = time.time() - (max_age or self.ttl)
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM responses WHERE stored_at < ? AND etag IS NULL AND last_modified IS NULL", (cutoff,)
+            )
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def summary(self):
+        """命中统计的单行描述"""
+        lookups = self.stats['hits'] + self.stats['misses'] + self.stats['revalidated']
+        hit_rate = (self.stats['hits'] + self.stats['revalidated']) / lookups if lookups else 0
+        return (f"缓存命中 {self.stats['hits']} 次，304复用 {self.stats['revalidated']} 次，"
+                f"未命中 {self.stats['misses']} 次 (命中率 {hit_rate:.1%})，"
+                f"淘汰 {self.stats['evictions']} 条，占用 {self.total_bytes / 1024 / 1024:.1f} MB")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Dataset Schemas
+各数据集的列类型：重复度高的字符串用 category、整数按取值范围降位、日期解析为 datetime，并校验 uid/bv_id 主键
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 日期列的文本格式（写回CSV时 pandas 会按原格式输出）
+DATE_FORMATS = {
+    'date': '%Y-%m-%d',
+    'datetime': '%Y-%m-%d %H:%M:%S',
+}
+
+# 分区号 < 32768、近12个月投稿数/榜单位置 < 32768；粉丝数与播放量保留 int64 以免累加溢出。
+# 整数列降位前检查取值范围，超出时保留 int64（astype 会静默回绕为负数）
+SCHEMAS = {
+    'categories': {
+        'tid': 'int16', 'parent_tid': 'int16',
+    },
+    'creators_by_category': {
+        'uid': 'int64',
+        'followers_count': 'int64',
+        'category_tid': 'int16',
+        'category_name': 'category',
+        'last_video_date': 'date',
+        'video_count_12m': 'int16',
+        'content_type': 'category',
+        'collected_at': 'datetime',
+        'source': 'category',
+        'data_quality': 'category',
+    },
+    'videos_by_category': {
+        'creator_uid': 'int64',
+        'creator_name': 'category',
+        'category_tid': 'int16',
+        'category_name': 'category',
+        'play_count': 'int64',
+        'like_count': 'int32',
+        'coin_count': 'int32',
+        'favorite_count': 'int32',
+        'share_count': 'int32',
+        'publish_date': 'date',
+        'collected_at': 'datetime',
+        'source': 'category',
+        'ranking_position': 'int16',
+    },
+    'popularity_metrics': {
+        'category_tid': 'int16', 'avg_play_count': 'int64', 'total_hot_videos': 'int32',
+        'rank': 'int16', 'is_top5': 'bool',
+    },
+    'sdi_scores': {
+        'category_tid': 'int16', 'narrative_complexity': 'int8', 'information_density': 'int8',
+        'voice_importance': 'int8', 'structure_requirement': 'int8', 'replaceability': 'int8',
+        'dependency_level': 'category', 'script_growth_potential': 'category',
+    },
+    'category_rollups': {
+        'category_tid': 'int16', 'creator_count': 'int32', 'p80_creators': 'int32',
+        'p90_creators': 'int32', 'popularity_rank': 'int16',
+    },
+    'data_validation': {
+        'dataset': 'category', 'check': 'category', 'column': 'category', 'severity': 'category',
+        'failed': 'int64', 'total': 'int64',
+    },
+    'validation_flags': {
+        'dataset': 'category', 'key': 'string', 'check': 'category', 'column': 'category',
+    },
+}
+SCHEMAS['top5_sdi_analysis'] = {
+    **SCHEMAS['popularity_metrics'],
+    **SCHEMAS['sdi_scores'],
+    'improvement_priority': 'category',
+}
+
+# 采集结果（接口采集与模拟数据）的列与顺序
+CREATOR_COLUMNS = [
+    'uid', 'username', 'followers_count', 'category_tid', 'category_name', 'last_video_date',
+    'video_count_12m', 'content_type', 'collected_at', 'source', 'data_quality'
+]
+
+VIDEO_COLUMNS = [
+    'bv_id', 'title', 'creator_uid', 'creator_name', 'category_tid', 'category_name', 'play_count',
+    'like_count', 'coin_count', 'favorite_count', 'share_count', 'interaction_rate', 'publish_date',
+    'collected_at', 'source', 'ranking_position'
+]
+
+# 主键列：每行唯一
+KEY_COLUMNS = {
+    'creators_by_category': 'uid',
+    'videos_by_category': 'bv_id',
+}
+
+
+def csv_dtypes(name, columns=None):
+    """read_csv 可直接使用的 dtype（只含 category 列，解析时即按类别编码）"""
+    return {
+        column: dtype for column, dtype in SCHEMAS.get(name, {}).items()
+        if dtype == 'category' and (columns is None or column in columns)
+    }
+
+
+def fits_dtype(values, dtype):
+    """数值列的取值是否都在整数类型 dtype 的范围内（缺失值不计）"""
+    info = np.iinfo(dtype)
+    low, high = values.min(), values.max()
+    return pd.isna(low) or (info.min <= low and high <= info.max)
+
+
+def apply_schema(df, name, check_key=True):
+    """按 SCHEMAS 转换 df 中已有的列；含缺失值的整数列使用可空整数类型。check_key 时检查主键重复并告警"""
+    schema = SCHEMAS.get(name)
+    if not schema:
+        return df
+
+    df = df.copy()
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+
+        if dtype in DATE_FORMATS:
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                df[column] = pd.to_datetime(values, format=DATE_FORMATS[dtype], errors='coerce')
+        elif dtype.startswith('int'):
+            if pd.api.types.is_numeric_dtype(values) and not fits_dtype(values, dtype):
+                logger.warning(f"⚠️ {name}.{column} 的取值 [{values.min()}, {values.max()}] 超出 {dtype} 范围，保留 int64")
+                dtype = 'int64'
+            if values.isna().any():
+                df[column] = values.astype(dtype.capitalize())
+            elif values.dtype != dtype:
+                df[column] = values.astype(dtype)
+        elif values.dtype != dtype:
+            df[column] = values.astype(dtype)
+
+    key = KEY_COLUMNS.get(name)
+    if check_key and key in df.columns:
+        duplicates = int(df[key].duplicated().sum())
+        if duplicates:
+            logger.warning(f"⚠️ {name} 的主键 {key} 存在 {duplicates} 个重复值")
+
+    return df
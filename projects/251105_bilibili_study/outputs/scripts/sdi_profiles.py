@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+SDI Profile Store
+SDI评分标准与案例库从版本化的数据文件 (sdi_profiles.json) 读取：加载时按结构校验，
+校验后的评分矩阵按文件修改时间缓存在进程内，内容哈希供阶段缓存判断评分标准是否变化
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sdi_profiles.json')
+
+# 支持的文件结构版本；评分内容的版本由文件中的 version 字段标识
+SCHEMA_VERSION = 1
+
+SCORE_FIELDS = ['narrative_complexity', 'information_density', 'voice_importance', 'structure_requirement',
+                'replaceability']
+SCORE_RANGE = (1, 5)
+PROFILE_TEXT_FIELDS = ['category_name', 'reasoning']
+CASE_TEXT_FIELDS = ['success_case', 'case_description', 'growth_evidence']
+
+# 路径 -> (修改时间, 文件大小, 已校验的评分标准)
+_CACHE = {}
+
+
+class SDIProfiles:
+    """校验后的评分标准：profiles / case_examples 按 category_tid 索引，matrix 为 分区 × 维度 的评分矩阵"""
+
+    def __init__(self, data, content_hash, dimensions):
+        self.version = data['version']
+        self.hash = content_hash
+        self.profiles = {
+            profile['category_tid']: {key: value for key, value in profile.items() if key != 'category_tid'}
+            for profile in data['profiles']
+        }
+        self.case_examples = {
+            case['category_tid']: {key: value for key, value in case.items() if key != 'category_tid'}
+            for case in data.get('case_examples', [])
+        }
+        self.dimensions = list(dimensions)
+        self.tids = np.array(list(self.profiles))
+        self.matrix = np.array([[profile[dimension] for dimension in self.dimensions]
+                                for profile in self.profiles.values()], dtype=float)
+        self.matrix.setflags(write=False)
+
+
+def content_hash(data):
+    """按规范化 JSON 计算哈希，缩进与键顺序的改动不影响结果"""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+def validate(data):
+    """返回所有校验错误（空列表表示通过）"""
+    errors = []
+    if data.get('schema_version') != SCHEMA_VERSION:
+        errors.append(f"schema_version 应为 {SCHEMA_VERSION}，实际为 {data.get('schema_version')!r}")
+    if not isinstance(data.get('version'), str) or not data.get('version'):
+        errors.append("缺少评分标准版本 version")
+
+    profiles = data.get('profiles')
+    if not isinstance(profiles, list) or not profiles:
+        return errors + ["profiles 应为非空列表"]
+
+    seen = set()
+    for i, profile in enumerate(profiles):
+        tid = profile.get('category_tid')
+        where = f"profiles[{i}] (category_tid={tid})"
+        if not isinstance(tid, int) or isinstance(tid, bool):
+            errors.append(f"{where}: category_tid 应为整数")
+        elif tid in seen:
+            errors.append(f"{where}: category_tid 重复")
+        seen.add(tid)
+
+        for field in SCORE_FIELDS:
+            value = profile.get(field)
+            if not isinstance(value, int) or isinstance(value, bool) or not SCORE_RANGE[0] <= value <= SCORE_RANGE[1]:
+                errors.append(f"{where}: {field} 应为 {SCORE_RANGE[0]}-{SCORE_RANGE[1]} 的整数，实际为 {value!r}")
+        for field in PROFILE_TEXT_FIELDS:
+            if not isinstance(profile.get(field), str) or not profile.get(field):
+                errors.append(f"{where}: 缺少 {field}")
+        unknown = set(profile) - {'category_tid', *SCORE_FIELDS, *PROFILE_TEXT_FIELDS}
+        if unknown:
+            errors.append(f"{where}: 未知字段 {', '.join(sorted(unknown))}")
+
+    for i, case in enumerate(data.get('case_examples', [])):
+        tid = case.get('category_tid')
+        where = f"case_examples[{i}] (category_tid={tid})"
+        if tid not in seen:
+            errors.append(f"{where}: 分区不在 profiles 中")
+        for field in CASE_TEXT_FIELDS:
+            if not isinstance(case.get(field), str) or not case.get(field):
+                errors.append(f"{where}: 缺少 {field}")
+        elements = case.get('script_elements')
+        if not isinstance(elements, list) or not elements or not all(isinstance(e, str) for e in elements):
+            errors.append(f"{where}: script_elements 应为非空字符串列表")
+
+    return errors
+
+
+def load_profiles(profile_file=DEFAULT_PROFILE_FILE, dimensions=SCORE_FIELDS[:4]):
+    """读取并校验评分标准；文件未变化时直接返回缓存，校验失败抛出 ValueError"""
+    path = os.path.abspath(profile_file)
+    stat = os.stat(path)
+    cached = _CACHE.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size) and cached[2].dimensions == list(dimensions):
+        return cached[2]
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    errors = validate(data)
+    if errors:
+        raise ValueError(f"评分标准文件 {profile_file} 校验失败:\n" + "\n".join(f"  - {error}" for error in errors))
+
+    profiles = SDIProfiles(data, content_hash(data), dimensions)
+    _CACHE[path] = (stat.st_mtime_ns, stat.st_size, profiles)
+    logger.info(f"📐 加载SDI评分标准 v{profiles.version}: {len(profiles.profiles)} 个分区 ({profiles.hash[:12]})")
+    return profiles
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="校验SDI评分标准文件")
+    parser.add_argument("profile_file", nargs='?', default=DEFAULT_PROFILE_FILE)
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.profile_file)
+    print(f"✅ 评分标准 v{profiles.version} 校验通过")
+    print(f"   分区数: {len(profiles.profiles)}，案例数: {len(profiles.case_examples)}")
+    print(f"   内容哈希: {profiles.hash}")
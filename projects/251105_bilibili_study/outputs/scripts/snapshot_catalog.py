@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Snapshot Catalog
+按采集日期分区的数据快照目录：raw/ 与 clean/ 中的 <数据集>_<YYYYMMDD> 文件登记在 snapshots.json 清单中，
+各阶段通过清单解析快照，不再硬编码日期或依赖运行当天的日期；读取经由共用的 data_loader，同一进程内每个文件只解析一次
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+
+import pandas as pd
+
+from data_loader import default_loader
+from dataset_store import parquet_path, save_dataset
+
+# 脚本在 outputs/scripts 下运行，数据目录为 outputs
+DEFAULT_DATA_DIR = '..'
+MANIFEST_FILE = 'snapshots.json'
+SNAPSHOT_FORMAT = '%Y%m%d'
+
+DATASET_LAYERS = {
+    'categories': 'raw',
+    'creators_by_category': 'raw',
+    'videos_by_category': 'raw',
+    'popularity_metrics': 'raw',
+    'sdi_scores': 'clean',
+    'top5_sdi_analysis': 'clean',
+    'category_rollups': 'clean',
+    'data_validation': 'clean',
+    'validation_flags': 'clean',
+}
+
+SNAPSHOT_FILE_PATTERN = re.compile(r'^(?P<dataset>.+)_(?P<snapshot>\d{8})\.(csv|parquet)$')
+
+
+def today():
+    """今天对应的快照编号"""
+    return datetime.now().strftime(SNAPSHOT_FORMAT)
+
+
+def snapshot_date(snapshot):
+    """20251105 -> 2025-11-05"""
+    return datetime.strptime(snapshot, SNAPSHOT_FORMAT).strftime('%Y-%m-%d')
+
+
+class SnapshotCatalog:
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, loader=None):
+        self.data_dir = data_dir
+        self.loader = loader or default_loader()
+        self.manifest_file = os.path.join(data_dir, MANIFEST_FILE)
+
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        else:
+            # 首次使用时扫描一次目录生成清单，之后由写入方维护
+            self.manifest = self.rebuild()
+
+    def _write(self):
+        tmp_file = self.manifest_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_file, self.manifest_file)
+
+    def _entry(self, csv_file, rows):
+        return {
+            'path': os.path.relpath(csv_file, self.data_dir),
+            'rows': int(rows),
+            'formats': ['csv', 'parquet'] if os.path.exists(parquet_path(csv_file)) else ['csv'],
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+    def rebuild(self):
+        """扫描 raw/ 与 clean/，重建快照清单"""
+        self.manifest = {'snapshots': {}}
+        for layer in sorted(set(DATASET_LAYERS.values())):
+            layer_dir = os.path.join(self.data_dir, layer)
+            if not os.path.isdir(layer_dir):
+                continue
+            for filename in sorted(os.listdir(layer_dir)):
+                match = SNAPSHOT_FILE_PATTERN.match(filename)
+                if not match or not filename.endswith('.csv') or match['dataset'] not in DATASET_LAYERS:
+                    continue
+                csv_file = os.path.join(layer_dir, filename)
+                rows = len(pd.read_csv(csv_file, usecols=[0]))
+                datasets = self.manifest['snapshots'].setdefault(match['snapshot'], {'datasets': {}})['datasets']
+                datasets[match['dataset']] = self._entry(csv_file, rows)
+
+        if os.path.isdir(self.data_dir):
+            self._write()
+        return self.manifest
+
+    def register(self, dataset, snapshot, csv_file, rows):
+        """登记（或更新）一个快照中的数据集"""
+        datasets = self.manifest['snapshots'].setdefault(snapshot, {'datasets': {}})['datasets']
+        datasets[dataset] = self._entry(csv_file, rows)
+        self._write()
+
+    def snapshots(self, dataset=None):
+        """按日期排序的快照编号；指定 dataset 时只返回包含该数据集的快照"""
+        return sorted(
+            snapshot for snapshot, info in self.manifest['snapshots'].items()
+            if dataset is None or dataset in info['datasets']
+        )
+
+    def latest(self, dataset=None):
+        snapshots = self.snapshots(dataset)
+        return snapshots[-1] if snapshots else None
+
+    def resolve(self, snapshot=None, dataset=None):
+        """未指定快照时取包含 dataset 的最新快照"""
+        snapshot = snapshot or self.latest(dataset)
+        if snapshot is None:
+            raise FileNotFoundError(f"快照清单 {self.manifest_file} 中没有 {dataset or '任何'} 数据，请先运行采集")
+        return snapshot
+
+    def path(self, dataset, snapshot):
+        return os.path.join(self.data_dir, DATASET_LAYERS[dataset], f'{dataset}_{snapshot}.csv')
+
+    def load(self, dataset, snapshot=None, columns=None):
+        """读取某个快照（默认最新）的数据集"""
+        snapshot = self.resolve(snapshot, dataset)
+        if dataset not in self.manifest['snapshots'].get(snapshot, {}).get('datasets', {}):
+            raise FileNotFoundError(
+                f"快照 {snapshot} 中没有 {dataset}，可用快照: {', '.join(self.snapshots(dataset)) or '无'}"
+            )
+        return self.loader.load(self.path(dataset, snapshot), columns=columns)
+
+    def load_range(self, dataset, start=None, end=None, columns=None):
+        """读取 [start, end] 区间内所有快照的数据集，增加 snapshot 列后纵向拼接"""
+        frames = []
+        for snapshot in self.snapshots(dataset):
+            if (start is None or snapshot >= start) and (end is None or snapshot <= end):
+                frames.append(self.load(dataset, snapshot, columns=columns).assign(snapshot=snapshot))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=(columns or []) + ['snapshot'])
+
+    def save(self, df, dataset, snapshot, storage='csv'):
+        """写入快照分区并登记到清单，返回CSV路径"""
+        csv_file = self.path(dataset, snapshot)
+        os.makedirs(os.path.dirname(csv_file), exist_ok=True)
+        save_dataset(df, csv_file, storage=storage)
+        self.register(dataset, snapshot, csv_file, len(df))
+        return csv_file
+
+
+def save_snapshot(df, csv_file, storage='csv'):
+    """按文件名 (<数据集>_<YYYYMMDD>.csv) 写出数据集，并登记到其数据目录的快照清单"""
+    match = SNAPSHOT_FILE_PATTERN.match(os.path.basename(csv_file))
+    written = save_dataset(df, csv_file, storage=storage)
+    if match and match['dataset'] in DATASET_LAYERS:
+        catalog = SnapshotCatalog(os.path.dirname(os.path.dirname(os.path.abspath(csv_file))))
+        catalog.register(match['dataset'], match['snapshot'], os.path.abspath(csv_file), len(df))
+    return written
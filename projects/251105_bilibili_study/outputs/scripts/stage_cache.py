@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Content-addressed Stage Cache
+流水线阶段缓存：以 上游输出内容哈希 + 代码哈希 + 配置哈希 作为键，键不变时直接复用上次的输出
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import time
+
+import pandas as pd
+
+DEFAULT_STAGE_CACHE_DIR = os.path.join('..', '.cache', 'stages')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stages (
+    key TEXT PRIMARY KEY,
+    stage TEXT NOT NULL,
+    output_hash TEXT NOT NULL,
+    artifacts TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stages_stage ON stages (stage);
+"""
+
+
+def hash_output(value):
+    """阶段输出的内容哈希：DataFrame按行哈希，元组/字典逐项组合，其余按repr"""
+    digest = hashlib.sha256()
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(zip(value.columns, value.dtypes.astype(str)))).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(value, index=False).to_numpy().tobytes())
+    elif isinstance(value, (tuple, list)):
+        for item in value:
+            digest.update(hash_output(item).encode('ascii'))
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(str(key).encode('utf-8'))
+            digest.update(hash_output(value[key]).encode('ascii'))
+    else:
+        digest.update(repr(value).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def hash_files(paths):
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def hash_config(config):
+    return hashlib.sha256(json.dumps(config, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')).hexdigest()
+
+
+class StageCache:
+    def __init__(self, cache_dir=DEFAULT_STAGE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'manifest.sqlite'))
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def stage_key(stage, code_hash, config_hash, input_hashes):
+        """阶段缓存键：任何上游输出、代码或配置变化都会得到新键"""
+        parts = [stage, code_hash, config_hash] + [f"{name}={input_hashes[name]}" for name in sorted(input_hashes)]
+        return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+    def _output_file(self, key):
+        return os.path.join(self.cache_dir, f'{key}.pkl')
+
+    def lookup(self, key):
+        """返回 (输出, 输出哈希)；无缓存、缓存文件丢失或落盘产物被删除时返回 None"""
+        row = self.conn.execute("SELECT output_hash, artifacts FROM stages WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        output_hash, artifacts = row
+        output_file = self._output_file(key)
+        if not os.path.exists(output_file) or not all(os.path.exists(path) for path in json.loads(artifacts)):
+            return None
+
+        with open(output_file, 'rb') as f:
+            return pickle.load(f), output_hash
+
+    def store(self, key, stage, output, artifacts=()):
+        """保存阶段输出与其落盘产物清单，返回输出的内容哈希"""
+        output_hash = hash_output(output)
+        with open(self._output_file(key), 'wb') as f:
+            pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO stages (key, stage, output_hash, artifacts, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, stage, output_hash, json.dumps(list(artifacts)), time.time()),
+            )
+        return output_hash
+
+    def prune(self, keep=3):
+        """每个阶段只保留最近 keep 个版本的输出"""
+        rows = self.conn.execute(
+            "SELECT key FROM (SELECT key, ROW_NUMBER() OVER (PARTITION BY stage ORDER BY created_at DESC) AS n "
+            "FROM stages) WHERE n > ?", (keep,)
+        ).fetchall()
+        with self.conn:
+            self.conn.executemany("DELETE FROM stages WHERE key = ?", rows)
+        for (key,) in rows:
+            if os.path.exists(self._output_file(key)):
+                os.remove(self._output_file(key))
+        return len(rows)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Vectorized Synthetic Data Generator
+按列向量化生成模拟创作者/视频数据（可设随机种子复现、可按倍数放大规模）
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+
+class SyntheticDataGenerator:
+    def __init__(self, category_profiles, seed=None, scale=1.0, reference_date=None):
+        """
+        category_profiles: {tid: {"name_prefix", "avg_followers", "content_type"}}
+        scale: 每个分区创作者数/视频数的放大倍数 (1.0 对应 80-150 个创作者、30-50 个视频)
+        reference_date: 日期字段的基准时间，与 seed 一起固定即可完全复现输出
+        """
+        self.category_profiles = category_profiles
+        self.seed = seed
+        self.scale = scale
+        self.rng = np.random.default_rng(seed)
+        self.now = reference_date or datetime.now()
+
+    def _recent_dates(self, days_ago):
+        """把"距今天数"数组映射为日期字符串：只格式化365个日期再按索引取值"""
+        lookup = np.array([(self.now - timedelta(days=int(d))).strftime('%Y-%m-%d') for d in range(366)])
+        return lookup[days_ago]
+
+    def _scaled_counts(self, low, high, size):
+        counts = self.rng.integers(low, high, size=size, endpoint=True)
+        return np.maximum(1, np.round(counts * self.scale)).astype(np.int64)
+
+    @staticmethod
+    def _within_group_index(counts):
+        """每个分组内从0开始的序号"""
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        return np.arange(counts.sum()) - offsets
+
+    def generate_creators(self, primary_categories):
+        """生成与 creators_by_category_* 相同结构的创作者数据"""
+        categories = primary_categories[primary_categories['tid'].isin(self.category_profiles.keys())]
+        tids = categories['tid'].to_numpy()
+        tnames = categories['tname'].to_numpy()
+
+        counts = self._scaled_counts(80, 150, len(tids))
+        total = int(counts.sum())
+        within = self._within_group_index(counts)
+
+        prefixes = np.array([self.category_profiles[tid]['name_prefix'] for tid in tids])
+        content_types = np.array([self.category_profiles[tid]['content_type'] for tid in tids])
+
+        # 粉丝数（对数正态分布）、最近投稿时间、近12个月投稿数
+        followers = np.maximum(1000, self.rng.lognormal(11.0, 1.2, size=total).astype(np.int64))
+        days_ago = self.rng.integers(1, 365, size=total, endpoint=True)
+        video_count_12m = self.rng.integers(1, 200, size=total, endpoint=True)
+
+        usernames = pd.Series(np.repeat(prefixes, counts)) + 'UP_' + pd.Series(within + 1).astype(str).str.zfill(3)
+
+        return pd.DataFrame({
+            'uid': np.arange(100001, 100001 + total),
+            'username': usernames.to_numpy(),
+            'followers_count': followers,
+            'category_tid': np.repeat(tids, counts),
+            'category_name': np.repeat(tnames, counts),
+            'last_video_date': self._recent_dates(days_ago),
+            'video_count_12m': video_count_12m,
+            'content_type': np.repeat(content_types, counts),
+            'collected_at': self.now.strftime('%Y-%m-%d %H:%M:%S'),
+            'source': '模拟数据',
+            'data_quality': 'simulated',
+        })
+
+    def generate_videos(self, creators_df):
+        """生成与 videos_by_category_* 相同结构的热门视频数据"""
+        # 按分区首次出现的顺序分组，组内创作者连续排列
+        codes, category_tids = pd.factorize(creators_df['category_tid'])
+        category_tids = np.asarray(category_tids)
+        order = np.argsort(codes, kind='stable')
+        group_sizes = np.bincount(codes)
+        group_starts = np.cumsum(group_sizes) - group_sizes
+        uids = creators_df['uid'].to_numpy()[order]
+        usernames = creators_df['username'].to_numpy()[order]
+        category_names = creators_df['category_name'].to_numpy()[order][group_starts]
+
+        counts = self._scaled_counts(30, 50, len(category_tids))
+        total = int(counts.sum())
+        within = self._within_group_index(counts)
+
+        # 在所属分区内随机选择创作者
+        creator_idx = (np.repeat(group_starts, counts)
+                       + (self.rng.random(total) * np.repeat(group_sizes, counts)).astype(np.int64))
+
+        play_count = self.rng.integers(10000, 5000000, size=total, endpoint=True)
+        like_count = (play_count * self.rng.uniform(0.02, 0.15, total)).astype(np.int64)
+        coin_count = (play_count * self.rng.uniform(0.005, 0.03, total)).astype(np.int64)
+        favorite_count = (play_count * self.rng.uniform(0.008, 0.025, total)).astype(np.int64)
+        share_count = (play_count * self.rng.uniform(0.001, 0.008, total)).astype(np.int64)
+        interaction_rate = np.round((like_count + coin_count + favorite_count + share_count) / play_count, 4)
+        days_ago = self.rng.integers(1, 365, size=total, endpoint=True)
+
+        names = np.repeat(category_names, counts)
+        video_ids = np.arange(1000001, 1000001 + total)
+
+        return pd.DataFrame({
+            'bv_id': 'BV' + pd.Series(video_ids).astype(str),
+            'title': pd.Series(names) + '热门视频_' + pd.Series(within + 1).astype(str).str.zfill(2),
+            'creator_uid': uids[creator_idx],
+            'creator_name': usernames[creator_idx],
+            'category_tid': np.repeat(category_tids, counts),
+            'category_name': names,
+            'play_count': play_count,
+            'like_count': like_count,
+            'coin_count': coin_count,
+            'favorite_count': favorite_count,
+            'share_count': share_count,
+            'interaction_rate': interaction_rate,
+            'publish_date': self._recent_dates(days_ago),
+            'collected_at': self.now.strftime('%Y-%m-%d %H:%M:%S'),
+            'source': '模拟数据',
+            'ranking_position': within + 1,
+        })
+
+    def generate_follower_samples(self, creators_df, sample_size=200, shared_rate=0.2):
+        """
+        为每个创作者生成粉丝ID样本（列: creator_uid, category_tid, follower_uid），用于受众草图。
+        粉丝来自分区自己的用户池（池大小随机，决定分区内重复关注的程度）或跨分区共享的活跃用户池
+        """
+        codes, category_tids = pd.factorize(creators_df['category_tid'])
+        group_sizes = np.bincount(codes)
+        total = len(creators_df) * sample_size
+        creator_idx = np.repeat(np.arange(len(creators_df)), sample_size)
+        category_idx = codes[creator_idx]
+
+        pool_sizes = np.maximum(1, (group_sizes * sample_size * self.rng.uniform(0.5, 3.0, len(group_sizes))).astype(np.int64))
+        pool_starts = np.cumsum(pool_sizes) - pool_sizes
+        shared_pool = max(1, int(pool_sizes.sum() * 0.05))
+
+        shared = self.rng.random(total) < shared_rate
+        follower_uid = np.where(
+            shared,
+            (self.rng.random(total) * shared_pool).astype(np.int64),
+            shared_pool + pool_starts[category_idx] + (self.rng.random(total) * pool_sizes[category_idx]).astype(np.int64),
+        )
+
+        return pd.DataFrame({
+            'creator_uid': creators_df['uid'].to_numpy()[creator_idx],
+            'category_tid': np.asarray(category_tids)[category_idx],
+            'follower_uid': follower_uid + 10_000_000,
+        })
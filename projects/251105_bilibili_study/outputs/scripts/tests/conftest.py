@@ -0,0 +1,9 @@
+"""
+测试共用配置：脚本按同目录模块名互相导入，测试从 scripts/ 目录加载
+运行: cd outputs/scripts && python -m pytest -q
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
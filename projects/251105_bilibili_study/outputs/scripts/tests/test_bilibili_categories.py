@@ -0,0 +1,89 @@
+"""分区采集：通过本地mock服务（临时端口）拉取分区树，接口不可用时回退到手动分区表"""
+
+import socket
+
+import pandas as pd
+import pytest
+
+from bilibili_categories import MANUAL_CATEGORIES, BilibiliCategoryCollector
+from mock_bilibili_server import run_mock_server
+
+COLUMNS = ["tid", "tname", "parent_tid", "parent_name"]
+
+
+def as_rows(df):
+    return sorted(df[COLUMNS].itertuples(index=False, name=None))
+
+
+def manual_rows():
+    return as_rows(pd.DataFrame(MANUAL_CATEGORIES))
+
+
+def unused_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_fetches_zone_list_and_children():
+    with run_mock_server() as (base_url, state):
+        collector = BilibiliCategoryCollector(api_base=base_url, max_retries=0)
+        categories_df = collector.get_categories()
+
+    assert collector.source == "api"
+    assert list(categories_df.columns) == COLUMNS
+    # mock服务的分区树由手动分区表生成，两者应完全一致
+    assert as_rows(categories_df) == manual_rows()
+
+    primaries = [c['tid'] for c in MANUAL_CATEGORIES if c['parent_tid'] == 0]
+    assert state.path_counts == {
+        BilibiliCategoryCollector.ZONE_LIST_PATH: 1,
+        BilibiliCategoryCollector.ZONE_CHILDREN_PATH: len(primaries),
+    }
+    children_tids = sorted(int(query['tid']) for path, query in state.requests
+                           if path == BilibiliCategoryCollector.ZONE_CHILDREN_PATH)
+    assert children_tids == sorted(primaries)
+
+
+def test_falls_back_to_manual_categories_when_endpoint_fails():
+    # 所有请求都返回503，不重试
+    with run_mock_server(fail_first=1000) as (base_url, state):
+        collector = BilibiliCategoryCollector(api_base=base_url, max_retries=0)
+        categories_df = collector.get_categories()
+
+    assert collector.source == "manual"
+    assert as_rows(categories_df) == manual_rows()
+    assert state.path_counts == {BilibiliCategoryCollector.ZONE_LIST_PATH: 1}
+
+
+@pytest.mark.parametrize('raw_body', [
+    '<html>502 Bad Gateway</html>',
+    '[1, 2, 3]',
+    '{"code": 0, "data": {"tid": 1}}',
+    '{"code": 0, "data": [{"id": 1}]}',
+])
+def test_falls_back_to_manual_categories_on_malformed_payload(raw_body):
+    with run_mock_server(raw_body=raw_body) as (base_url, state):
+        collector = BilibiliCategoryCollector(api_base=base_url, max_retries=0)
+        categories_df = collector.get_categories()
+
+    assert collector.source == "manual"
+    assert as_rows(categories_df) == manual_rows()
+
+
+def test_falls_back_to_manual_categories_when_endpoint_unreachable():
+    collector = BilibiliCategoryCollector(api_base=f"http://127.0.0.1:{unused_port()}", max_retries=0)
+    categories_df = collector.get_categories()
+
+    assert collector.source == "manual"
+    assert as_rows(categories_df) == manual_rows()
+
+
+def test_offline_uses_manual_categories_without_requests():
+    with run_mock_server() as (base_url, state):
+        collector = BilibiliCategoryCollector(api_base=base_url, offline=True)
+        categories_df = collector.get_categories()
+
+    assert collector.source == "manual"
+    assert as_rows(categories_df) == manual_rows()
+    assert state.request_count == 0
@@ -0,0 +1,113 @@
+"""异步客户端：mock服务上的重试（fail_first 故障注入）、ETag/304 条件请求与令牌桶限流"""
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+
+from bilibili_http import AsyncBilibiliClient, BilibiliAPIError, TokenBucket
+from mock_bilibili_server import run_mock_server
+from response_cache import ResponseCache
+
+ZONE_LIST_PATH = "/x/web-interface/zone/list"
+CARD_PATH = "/x/web-interface/card"
+
+
+async def fetch(client_kwargs, requests):
+    """在一个客户端内依次发出 [(path, params), ...]，返回 (各响应, 客户端统计)"""
+    async with AsyncBilibiliClient(**client_kwargs) as client:
+        results = [await client.get_json(path, params=params) for path, params in requests]
+        return results, dict(client.stats)
+
+
+def test_retries_until_mock_recovers():
+    with run_mock_server(fail_first=2) as (base_url, state):
+        [payload], stats = asyncio.run(fetch(
+            {'base_url': base_url, 'max_retries': 3, 'backoff_base': 0.01}, [(ZONE_LIST_PATH, None)]
+        ))
+
+    assert payload['code'] == 0 and payload['data']
+    # 前2次503，第3次成功
+    assert state.request_count == 3
+    assert stats == {'requests': 3, 'not_modified': 0, 'retries': 2}
+
+
+def test_gives_up_after_max_retries():
+    with run_mock_server(fail_first=1000) as (base_url, state):
+        with pytest.raises(aiohttp.ClientResponseError) as excinfo:
+            asyncio.run(fetch({'base_url': base_url, 'max_retries': 2, 'backoff_base': 0.01},
+                              [(ZONE_LIST_PATH, None)]))
+
+    assert excinfo.value.status == 503
+    assert state.request_count == 3
+
+
+@pytest.mark.parametrize('raw_body', ['not json', '[1, 2]', '"text"'])
+def test_malformed_payload_raises_api_error(raw_body):
+    with run_mock_server(raw_body=raw_body) as (base_url, state):
+        with pytest.raises(BilibiliAPIError):
+            asyncio.run(fetch({'base_url': base_url, 'max_retries': 2}, [(ZONE_LIST_PATH, None)]))
+
+    # 响应体错误不是临时故障，不重试
+    assert state.request_count == 1
+
+
+def test_stale_cache_revalidates_with_etag(tmp_path):
+    # ttl=0：缓存立即过期，第二次请求必须带 If-None-Match 发起条件请求
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite'), ttl=0)
+    requests = [(CARD_PATH, {'mid': 42}), (CARD_PATH, {'mid': 42})]
+    with run_mock_server() as (base_url, state):
+        (first, second), stats = asyncio.run(fetch({'base_url': base_url, 'cache': cache}, requests))
+
+    assert second == first
+    assert state.request_count == 2
+    assert stats == {'requests': 2, 'not_modified': 1, 'retries': 0}
+    assert cache.stats['misses'] == 1
+    assert cache.stats['stores'] == 1
+    assert cache.stats['revalidated'] == 1
+    cache.close()
+
+
+def test_fresh_cache_skips_request(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite'), ttl=3600)
+    requests = [(CARD_PATH, {'mid': 42}), (CARD_PATH, {'mid': 42}), (CARD_PATH, {'mid': 7})]
+    with run_mock_server() as (base_url, state):
+        (first, second, other), stats = asyncio.run(fetch({'base_url': base_url, 'cache': cache}, requests))
+
+    assert second == first
+    assert other != first
+    assert state.request_count == 2
+    assert stats['requests'] == 2
+    assert cache.stats['hits'] == 1
+    assert cache.stats['misses'] == 2
+    cache.close()
+
+
+def test_token_bucket_allows_burst_then_waits():
+    async def acquire_all(bucket, count):
+        started = time.monotonic()
+        times = []
+        for _ in range(count):
+            await bucket.acquire()
+            times.append(time.monotonic() - started)
+        return times
+
+    times = asyncio.run(acquire_all(TokenBucket(rate=20, capacity=3), 6))
+
+    # 前3个令牌为突发容量，之后每 1/20 秒一个
+    assert times[2] < 0.04
+    assert times[5] >= 3 / 20 - 0.01
+
+
+def test_rate_limit_paces_requests_per_path():
+    requests = [(CARD_PATH, {'mid': mid}) for mid in range(6)] + [(ZONE_LIST_PATH, None)]
+    with run_mock_server() as (base_url, state):
+        started = time.monotonic()
+        _, stats = asyncio.run(fetch({'base_url': base_url, 'rate_limits': {CARD_PATH: (20, 1)}}, requests))
+        elapsed = time.monotonic() - started
+
+    # 名片接口突发容量1、每秒20个：6个请求至少间隔 5/20 秒；分区接口不受限
+    assert elapsed >= 5 / 20 - 0.01
+    assert state.path_counts == {CARD_PATH: 6, ZONE_LIST_PATH: 1}
+    assert stats['requests'] == 7
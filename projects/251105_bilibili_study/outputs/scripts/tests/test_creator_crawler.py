@@ -0,0 +1,105 @@
+"""创作者采集断点续爬：mock服务上中途中断爬取，续爬时已完成的列表页与创作者名片不再请求"""
+
+import asyncio
+
+from creator_crawler import CARD_PATH, NEWLIST_PATH, CreatorCrawler
+from mock_bilibili_server import run_mock_server
+
+CATEGORIES = [(17, "单机游戏"), (95, "数码")]
+PAGE_SIZE = 20
+VIDEOS_PER_CATEGORY = 200
+CREATORS_PER_CATEGORY = 30
+TOTAL_PAGES = VIDEOS_PER_CATEGORY // PAGE_SIZE
+# 测试中放宽限流，避免默认的每秒请求数拖慢用例
+RATE_LIMITS = {NEWLIST_PATH: (1000, 1000), CARD_PATH: (1000, 1000)}
+
+
+def make_crawler(base_url, state_file=None):
+    return CreatorCrawler(api_base=base_url, workers=2, page_size=PAGE_SIZE, state_file=state_file,
+                          rate_limits=RATE_LIMITS, max_retries=0)
+
+
+def completed(state):
+    """状态库中已完成的 ({(分区, 页码)}, {已抓取名片的uid})"""
+    pages = set(state.conn.execute("SELECT category_tid, pn FROM pages"))
+    creators = {uid for (uid,) in state.conn.execute("SELECT uid FROM creators WHERE fetched_at IS NOT NULL")}
+    return pages, creators
+
+
+def requested(mock_state, start=0):
+    """mock服务自第 start 个请求起收到的 ([(分区, 页码)], [uid])"""
+    pages, creators = [], []
+    for path, query in mock_state.requests[start:]:
+        if path == NEWLIST_PATH:
+            pages.append((int(query['rid']), int(query['pn'])))
+        elif path == CARD_PATH:
+            creators.append(int(query['mid']))
+    return pages, creators
+
+
+async def crawl_until(crawler, categories, min_pages, min_creators):
+    """模拟中途中断：完成至少 min_pages 页与 min_creators 个创作者后取消整个爬取"""
+    task = asyncio.create_task(crawler._crawl(categories))
+    while not task.done():
+        pages, creators = completed(crawler.state)
+        if len(pages) >= min_pages and len(creators) >= min_creators:
+            break
+        await asyncio.sleep(0.005)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+def test_resume_does_not_refetch_completed_work(tmp_path):
+    state_file = str(tmp_path / 'crawl_state.sqlite')
+
+    with run_mock_server(latency=0.01, videos_per_category=VIDEOS_PER_CATEGORY,
+                         creators_per_category=CREATORS_PER_CATEGORY) as (base_url, mock_state):
+        reference_creators, reference_videos = make_crawler(base_url).crawl(CATEGORIES)
+
+        interrupted = make_crawler(base_url, state_file)
+        asyncio.run(crawl_until(interrupted, CATEGORIES, min_pages=4, min_creators=3))
+        done_pages, done_creators = completed(interrupted.state)
+        interrupted.state.close()
+
+        all_pages = {(tid, pn) for tid, _ in CATEGORIES for pn in range(1, TOTAL_PAGES + 1)}
+        all_creators = set(reference_creators['uid'])
+        assert len(done_pages) >= 4 and len(done_creators) >= 3
+        assert done_pages < all_pages, "中断前已爬完所有页，测试没有覆盖续爬"
+
+        start = len(mock_state.requests)
+        resumed = make_crawler(base_url, state_file)
+        creators_df, videos_df = resumed.crawl(CATEGORIES)
+        pages, creators = requested(mock_state, start)
+
+    assert resumed.failed_tasks == 0
+    # 续爬只请求缺失的页与名片，每个只请求一次
+    assert not set(pages) & done_pages
+    assert not set(creators) & done_creators
+    assert sorted(pages) == sorted(all_pages - done_pages)
+    assert sorted(creators) == sorted(all_creators - done_creators)
+
+    # 续爬结果与一次性完整爬取相同
+    assert set(videos_df['bv_id']) == set(reference_videos['bv_id'])
+    key = ['uid', 'followers_count', 'category_tid']
+    assert (creators_df[key].sort_values('uid').reset_index(drop=True)
+            .equals(reference_creators[key].sort_values('uid').reset_index(drop=True)))
+    resumed.state.close()
+
+
+def test_finished_state_makes_no_requests(tmp_path):
+    state_file = str(tmp_path / 'crawl_state.sqlite')
+
+    with run_mock_server(videos_per_category=VIDEOS_PER_CATEGORY,
+                         creators_per_category=CREATORS_PER_CATEGORY) as (base_url, mock_state):
+        first = make_crawler(base_url, state_file)
+        creators_df, videos_df = first.crawl(CATEGORIES)
+        first.state.close()
+
+        start = mock_state.request_count
+        again = make_crawler(base_url, state_file)
+        creators_again, videos_again = again.crawl(CATEGORIES)
+
+    assert mock_state.request_count == start
+    assert len(videos_again) == len(videos_df) == len(CATEGORIES) * VIDEOS_PER_CATEGORY
+    assert set(creators_again['uid']) == set(creators_df['uid'])
+    again.state.close()
@@ -0,0 +1,58 @@
+"""数据校验：无法转换类型的坏值记为 schema 错误，而不是让校验本身抛出异常"""
+
+import pandas as pd
+
+from data_validator import DataValidator
+from schemas import CREATOR_COLUMNS, VIDEO_COLUMNS
+
+
+def make_frames():
+    creators_df = pd.DataFrame({
+        'uid': [1, 2, 3], 'username': ['a', 'b', 'c'], 'followers_count': [1000, 2000, 3000],
+        'category_tid': [4, 4, 4], 'category_name': '游戏', 'last_video_date': '2026-10-01',
+        'video_count_12m': [10, 20, 30], 'content_type': '游戏实况', 'collected_at': '2026-10-19 00:00:00',
+        'source': '模拟数据', 'data_quality': 'simulated',
+    })[CREATOR_COLUMNS]
+    videos_df = pd.DataFrame({
+        'bv_id': ['BV1', 'BV2', 'BV3'], 'title': 't', 'creator_uid': [1, 2, 3], 'creator_name': 'n',
+        'category_tid': 4, 'category_name': '游戏', 'play_count': [1000, 2000, 3000],
+        'like_count': [10, 20, 30], 'coin_count': [1, 2, 3], 'favorite_count': [1, 2, 3], 'share_count': [1, 2, 3],
+        'interaction_rate': 0.013, 'publish_date': '2026-10-01',
+        'collected_at': '2026-10-19 00:00:00', 'source': '模拟数据', 'ranking_position': [1, 2, 3],
+    })[VIDEO_COLUMNS]
+    return creators_df, videos_df
+
+
+def failed(checks_df, dataset, check, column):
+    row = checks_df[(checks_df['dataset'] == dataset) & (checks_df['check'] == check) & (checks_df['column'] == column)]
+    return int(row['failed'].iloc[0])
+
+
+def test_clean_frames_pass():
+    checks_df, flags_df = DataValidator().validate(*make_frames())
+    assert not checks_df.loc[checks_df['severity'] == 'error', 'failed'].any()
+    assert flags_df.empty
+
+
+def test_unconvertible_values_are_schema_errors():
+    creators_df, videos_df = make_frames()
+    videos_df['play_count'] = videos_df['play_count'].astype(object)
+    videos_df.loc[0, 'play_count'] = 'n/a'
+    # 超出 int32 的点赞数不能静默回绕为负数
+    videos_df.loc[1, 'like_count'] = 3_000_000_000
+    creators_df.loc[2, 'last_video_date'] = 'yesterday'
+
+    checks_df, flags_df = DataValidator().validate(creators_df, videos_df)
+
+    assert failed(checks_df, 'videos_by_category', 'schema', 'play_count') == 1
+    assert failed(checks_df, 'videos_by_category', 'schema', 'like_count') == 1
+    assert failed(checks_df, 'videos_by_category', 'non_negative', 'like_count') == 0
+    assert failed(checks_df, 'creators_by_category', 'schema', 'last_video_date') == 1
+    schema_flags = flags_df[flags_df['check'] == 'schema']
+    assert sorted(schema_flags['key']) == ['3', 'BV1', 'BV2']
+
+
+def test_missing_column_is_schema_error():
+    creators_df, videos_df = make_frames()
+    checks_df, _ = DataValidator().validate(creators_df.drop(columns='followers_count'), videos_df)
+    assert failed(checks_df, 'creators_by_category', 'schema', 'followers_count') == 3
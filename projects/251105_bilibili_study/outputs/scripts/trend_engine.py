@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Category Trend Engine
+跨快照的分区趋势库：每个新快照增量写入只追加的SQLite库，并只用最近一个窗口的历史更新
+粉丝增长率、排名变化与移动平均，趋势查询直接走 (category_tid, snapshot) 主键索引
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+from snapshot_catalog import SnapshotCatalog
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TREND_DB = os.path.join('..', 'trends.sqlite')
+DEFAULT_WINDOW = 7
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot TEXT PRIMARY KEY,
+    creator_count INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS category_daily (
+    category_tid INTEGER NOT NULL,
+    snapshot TEXT NOT NULL,
+    category_name TEXT,
+    creator_count INTEGER NOT NULL,
+    total_followers INTEGER NOT NULL,
+    avg_followers REAL NOT NULL,
+    avg_play_count REAL,
+    total_hot_videos INTEGER,
+    popularity_rank INTEGER,
+    PRIMARY KEY (category_tid, snapshot)
+);
+CREATE TABLE IF NOT EXISTS category_trends (
+    category_tid INTEGER NOT NULL,
+    snapshot TEXT NOT NULL,
+    prev_snapshot TEXT,
+    followers_growth REAL,
+    retained_followers_growth REAL,
+    play_count_growth REAL,
+    rank_change INTEGER,
+    followers_ma REAL NOT NULL,
+    play_count_ma REAL,
+    rank_ma REAL,
+    window_size INTEGER NOT NULL,
+    PRIMARY KEY (category_tid, snapshot)
+);
+CREATE TABLE IF NOT EXISTS creator_followers (
+    snapshot TEXT NOT NULL,
+    uid INTEGER NOT NULL,
+    category_tid INTEGER NOT NULL,
+    followers_count INTEGER NOT NULL,
+    PRIMARY KEY (snapshot, uid)
+);
+CREATE INDEX IF NOT EXISTS idx_trends_snapshot ON category_trends (snapshot);
+"""
+
+DAILY_COLUMNS = [
+    'category_tid', 'snapshot', 'category_name', 'creator_count', 'total_followers', 'avg_followers',
+    'avg_play_count', 'total_hot_videos', 'popularity_rank'
+]
+TREND_COLUMNS = [
+    'category_tid', 'snapshot', 'prev_snapshot', 'followers_growth', 'retained_followers_growth',
+    'play_count_growth', 'rank_change', 'followers_ma', 'play_count_ma', 'rank_ma', 'window_size'
+]
+
+CREATOR_COLUMNS = ['uid', 'followers_count', 'category_tid', 'category_name']
+POPULARITY_COLUMNS = ['category_tid', 'avg_play_count', 'total_hot_videos', 'rank']
+
+
+def _growth(current, previous):
+    """环比增长率；上期缺失或为0时为空"""
+    previous = previous.where(previous > 0)
+    return ((current - previous) / previous).round(4)
+
+
+class TrendEngine:
+    def __init__(self, db_file=DEFAULT_TREND_DB, window=DEFAULT_WINDOW):
+        self.db_file = db_file
+        self.window = window
+        os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+
+        self.conn = sqlite3.connect(db_file)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+        stored = self.conn.execute("SELECT value FROM meta WHERE key = 'window'").fetchone()
+        if stored is None:
+            with self.conn:
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('window', ?)", (str(window),))
+        elif int(stored[0]) != window:
+            # 已有的移动平均按旧窗口计算，混用会得到不可比的序列
+            raise ValueError(f"趋势库 {db_file} 的移动平均窗口为 {stored[0]}，与 {window} 不一致，请使用 --rebuild 重建")
+
+    def close(self):
+        self.conn.close()
+
+    # ---- 写入 ----
+
+    def snapshots(self):
+        return [row[0] for row in self.conn.execute("SELECT snapshot FROM snapshots ORDER BY snapshot")]
+
+    def latest_snapshot(self):
+        row = self.conn.execute("SELECT MAX(snapshot) FROM snapshots").fetchone()
+        return row[0]
+
+    def _history(self, snapshot):
+        """snapshot 之前最近 window-1 个快照的分区日数据（计算移动平均所需的全部历史）"""
+        return pd.read_sql_query(
+            "SELECT * FROM category_daily WHERE snapshot IN "
+            "(SELECT snapshot FROM snapshots WHERE snapshot < ? ORDER BY snapshot DESC LIMIT ?)",
+            self.conn, params=(snapshot, self.window - 1),
+        )
+
+    def _delete(self, snapshot):
+        for table in ('snapshots', 'category_daily', 'category_trends', 'creator_followers'):
+            self.conn.execute(f"DELETE FROM {table} WHERE snapshot = ?", (snapshot,))
+
+    @staticmethod
+    def daily_metrics(snapshot, creators_df, popularity_df):
+        """单个快照的分区日数据：创作者规模来自 creators，热度与排名来自 popularity"""
+        daily = creators_df.groupby('category_tid', sort=True, observed=True).agg(
+            category_name=('category_name', 'first'),
+            creator_count=('uid', 'size'),
+            total_followers=('followers_count', 'sum'),
+            avg_followers=('followers_count', 'mean'),
+        ).reset_index()
+        daily['category_name'] = daily['category_name'].astype(str)
+        daily['avg_followers'] = daily['avg_followers'].round(1)
+
+        popularity = (popularity_df.drop_duplicates('category_tid')
+                      .set_index('category_tid')[['avg_play_count', 'total_hot_videos', 'rank']]
+                      .rename(columns={'rank': 'popularity_rank'}))
+        daily = daily.join(popularity, on='category_tid')
+        daily.insert(1, 'snapshot', snapshot)
+        return daily[DAILY_COLUMNS]
+
+    def _retained_growth(self, prev_snapshot, creators_df):
+        """两期都在样本中的创作者的粉丝增长率，按本期分区汇总（排除样本进出的影响）"""
+        current = creators_df[['uid', 'category_tid', 'followers_count']]
+        if prev_snapshot is None:
+            return pd.Series(dtype=float)
+
+        previous = pd.read_sql_query(
+            "SELECT uid, followers_count AS prev_followers FROM creator_followers WHERE snapshot = ?",
+            self.conn, params=(prev_snapshot,),
+        )
+        matched = current.merge(previous, on='uid', how='inner')
+        sums = matched.groupby('category_tid', observed=True)[['followers_count', 'prev_followers']].sum()
+        return _growth(sums['followers_count'], sums['prev_followers'])
+
+    def ingest(self, snapshot, creators_df, popularity_df):
+        """
+        增量写入一个快照，返回该快照的趋势行。
+        只接受比已有快照更新的快照；重复写入最新快照时先删除再重算（上一期的数据仍在库中）
+        """
+        latest = self.latest_snapshot()
+        if latest is not None and snapshot < latest:
+            logger.warning(f"⚠️ 快照 {snapshot} 早于趋势库中最新的 {latest}，跳过（补录历史请使用 --rebuild）")
+            return None
+
+        daily = self.daily_metrics(snapshot, creators_df, popularity_df)
+        history = self._history(snapshot)
+        prev_snapshot = history['snapshot'].max() if len(history) else None
+
+        # 环比：与上一期同分区对比
+        previous = history[history['snapshot'] == prev_snapshot].set_index('category_tid') if prev_snapshot else None
+        current = daily.set_index('category_tid')
+        trends = pd.DataFrame(index=current.index)
+        trends['snapshot'] = snapshot
+        trends['prev_snapshot'] = prev_snapshot
+        if previous is not None:
+            prev = previous.reindex(current.index)
+            trends['followers_growth'] = _growth(current['total_followers'], prev['total_followers'])
+            trends['play_count_growth'] = _growth(current['avg_play_count'], prev['avg_play_count'])
+            # 排名数字变小为上升，记为正数
+            trends['rank_change'] = (prev['popularity_rank'] - current['popularity_rank']).astype('Int64')
+        else:
+            trends['followers_growth'] = None
+            trends['play_count_growth'] = None
+            trends['rank_change'] = pd.NA
+        trends['retained_followers_growth'] = self._retained_growth(prev_snapshot, creators_df).reindex(current.index)
+
+        # 移动平均：窗口内 window-1 期历史 + 本期
+        window_df = pd.concat([history[DAILY_COLUMNS], daily], ignore_index=True)
+        rolling = window_df.groupby('category_tid').agg(
+            followers_ma=('total_followers', 'mean'),
+            play_count_ma=('avg_play_count', 'mean'),
+            rank_ma=('popularity_rank', 'mean'),
+            window_size=('snapshot', 'size'),
+        ).reindex(current.index)
+        trends = trends.join(rolling.round(2)).reset_index()[TREND_COLUMNS]
+
+        with self.conn:
+            self._delete(snapshot)
+            self.conn.execute(
+                "INSERT INTO snapshots (snapshot, creator_count, ingested_at) VALUES (?, ?, ?)",
+                (snapshot, len(creators_df), datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+            )
+            daily.to_sql('category_daily', self.conn, if_exists='append', index=False)
+            trends.to_sql('category_trends', self.conn, if_exists='append', index=False)
+            creators_df[['uid', 'category_tid', 'followers_count']].assign(snapshot=snapshot).to_sql(
+                'creator_followers', self.conn, if_exists='append', index=False)
+            # 创作者明细只用于下一期的环比，保留最近两期
+            self.conn.execute(
+                "DELETE FROM creator_followers WHERE snapshot < ?", (prev_snapshot or snapshot,)
+            )
+
+        logger.info(f"📈 快照 {snapshot} 写入趋势库: {len(daily)} 个分区，对比上期 {prev_snapshot or '无'}")
+        return trends
+
+    def ingest_catalog(self, catalog):
+        """写入快照目录中比趋势库更新的全部快照，返回写入的快照列表"""
+        latest = self.latest_snapshot()
+        available = sorted(set(catalog.snapshots('creators_by_category')) & set(catalog.snapshots('popularity_metrics')))
+        ingested = []
+        for snapshot in available:
+            if latest is not None and snapshot <= latest:
+                continue
+            creators_df = catalog.load('creators_by_category', snapshot, columns=CREATOR_COLUMNS)
+            popularity_df = catalog.load('popularity_metrics', snapshot, columns=POPULARITY_COLUMNS)
+            self.ingest(snapshot, creators_df, popularity_df)
+            ingested.append(snapshot)
+
+        if not ingested:
+            logger.info("✅ 趋势库已是最新")
+        return ingested
+
+    def rebuild(self, catalog):
+        """清空趋势库后按时间顺序重新写入全部快照"""
+        with self.conn:
+            for table in ('snapshots', 'category_daily', 'category_trends', 'creator_followers'):
+                self.conn.execute(f"DELETE FROM {table}")
+        return self.ingest_catalog(catalog)
+
+    # ---- 查询 ----
+
+    def trend(self, category_tid=None, start=None, end=None):
+        """分区的日数据与趋势指标时间序列"""
+        query = (
+            "SELECT d.*, t.prev_snapshot, t.followers_growth, t.retained_followers_growth, t.play_count_growth, "
+            "t.rank_change, t.followers_ma, t.play_count_ma, t.rank_ma, t.window_size "
+            "FROM category_daily d JOIN category_trends t USING (category_tid, snapshot) WHERE 1 = 1"
+        )
+        params = []
+        if category_tid is not None:
+            query += " AND d.category_tid = ?"
+            params.append(int(category_tid))
+        if start is not None:
+            query += " AND d.snapshot >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND d.snapshot <= ?"
+            params.append(end)
+        query += " ORDER BY d.category_tid, d.snapshot"
+        return pd.read_sql_query(query, self.conn, params=params)
+
+    def movers(self, snapshot=None, metric='rank_change', top=10):
+        """某个快照（默认最新）按趋势指标排序的前 top 个分区"""
+        if metric not in TREND_COLUMNS[3:]:
+            raise ValueError(f"不支持的趋势指标: {metric}")
+        snapshot = snapshot or self.latest_snapshot()
+        return pd.read_sql_query(
+            f"SELECT d.category_tid, d.category_name, d.popularity_rank, t.{metric} "
+            f"FROM category_trends t JOIN category_daily d USING (category_tid, snapshot) "
+            f"WHERE t.snapshot = ? AND t.{metric} IS NOT NULL ORDER BY t.{metric} DESC LIMIT ?",
+            self.conn, params=(snapshot, top),
+        )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    parser = argparse.ArgumentParser(description="增量更新分区趋势库并查询趋势")
+    parser.add_argument("--db", default=DEFAULT_TREND_DB, help="趋势库文件")
+    parser.add_argument("--window", type=int, default=DEFAULT_WINDOW, help="移动平均窗口（快照数）")
+    parser.add_argument("--rebuild", action="store_true", help="清空后按快照目录全部重建")
+    parser.add_argument("--category", type=int, default=None, help="输出某个分区的趋势")
+    parser.add_argument("--movers", default=None, choices=TREND_COLUMNS[3:], help="输出最新快照中该指标最高的分区")
+    args = parser.parse_args()
+
+    catalog = SnapshotCatalog()
+    if args.rebuild:
+        # 窗口变化时旧库无法打开，重建前直接删除库文件
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(args.db + suffix):
+                os.remove(args.db + suffix)
+    engine = TrendEngine(args.db, window=args.window)
+    engine.ingest_catalog(catalog)
+
+    if args.category is not None:
+        print(engine.trend(args.category).to_string(index=False))
+    if args.movers:
+        print(engine.movers(metric=args.movers).to_string(index=False))
+    print(f"\n📈 趋势库快照: {', '.join(engine.snapshots()) or '无'}")
+    engine.close()
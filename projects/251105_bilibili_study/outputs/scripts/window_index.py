@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Date Window Index
+按分区排序的日期索引：(分区, 日期) 合成整数键排序一次，并预先计算累计和，
+任意时间窗口的 条数 / 加权和 都由二分查找与累计和相减得到，扫描上百个窗口也不需要重新过滤DataFrame
+"""
+
+import numpy as np
+import pandas as pd
+
+DAYS_PER_MONTH = 365.25 / 12
+
+
+def window_bounds(reference_date, months):
+    """以 reference_date 为窗口终点，months（可为小数）-> (起始日, 终止日) 的日序号数组，窗口为闭区间"""
+    end = pd.Timestamp(reference_date).to_datetime64().astype('datetime64[D]').astype(np.int64)
+    months = np.asarray(months, dtype=float)
+    start = end - np.round(months * DAYS_PER_MONTH).astype(np.int64)
+    return start, np.full(len(months), end)
+
+
+class DateWindowIndex:
+    def __init__(self, category_tid, dates, weights=None):
+        """
+        category_tid: 每行所属分区；分区顺序按首次出现（与 pd.factorize 一致）
+        dates: 日期（字符串或 datetime），缺失的行不进入索引
+        weights: {名称: 数组}，可按窗口求和的数值列
+        """
+        codes, tids = pd.factorize(category_tid)
+        self.tids = np.asarray(tids)
+
+        dates = pd.to_datetime(pd.Series(np.asarray(dates)))
+        valid = dates.notna().to_numpy() & (codes >= 0)
+        days = dates[valid].to_numpy().astype('datetime64[D]').astype(np.int64)
+
+        # 日序号平移到 [0, span)，分区编码放在高位
+        self.day_min = int(days.min()) if len(days) else 0
+        self.span = (int(days.max()) - self.day_min + 2) if len(days) else 1
+        keys = codes[valid].astype(np.int64) * self.span + (days - self.day_min)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+
+        self.cumulative = {
+            name: np.concatenate([[0], np.asarray(values)[valid][order].cumsum()])
+            for name, values in (weights or {}).items()
+        }
+
+    def _positions(self, days):
+        """每个分区 × 每个日期：分区内第一个日期 ≥ days 的位置"""
+        offsets = np.clip(np.asarray(days, dtype=np.int64) - self.day_min, 0, self.span - 1)
+        targets = np.arange(len(self.tids), dtype=np.int64)[:, None] * self.span + offsets[None, :]
+        return np.searchsorted(self.keys, targets)
+
+    def _bounds(self, start, end):
+        return self._positions(start), self._positions(np.asarray(end) + 1)
+
+    def counts(self, start, end):
+        """分区 × 窗口 的行数"""
+        lo, hi = self._bounds(start, end)
+        return hi - lo
+
+    def sums(self, name, start, end):
+        """分区 × 窗口 的 weights[name] 之和"""
+        lo, hi = self._bounds(start, end)
+        cumulative = self.cumulative[name]
+        return cumulative[hi] - cumulative[lo]
+
+    def frame(self, values, columns):
+        """分区 × 窗口 矩阵包装为按 category_tid 索引的 DataFrame"""
+        return pd.DataFrame(values, index=pd.Index(self.tids, name='category_tid'), columns=columns)